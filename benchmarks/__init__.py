@@ -0,0 +1 @@
+"""Benchmarks for service hot paths."""
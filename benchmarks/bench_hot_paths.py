@@ -0,0 +1,389 @@
+"""
+Microbenchmarks for the service's per-request hot paths.
+
+Each benchmark times one small operation many times and reports the median
+time per call. The medians are compared against ``benchmarks/baselines.json``;
+a benchmark whose median exceeds its baseline by more than its threshold
+(a ratio, e.g. 1.5 allows a 50% slowdown) counts as a regression and the run
+exits with status 1.
+
+Covered paths:
+
+- ``_raw_json_to_content`` for a user prompt and a full agent turn
+- ``get_model_messages_by_thread`` at several history sizes
+- ``create_messages_batch`` for one agent turn
+- ``_prepare_agent_messages`` for one agent turn
+- ``verify_thread_access`` reading the thread and answered by the owner cache
+- ``db_to_api_message`` / ``db_to_api_thread``
+- building and encoding the detail response of a 1000-message thread
+- ``AgentResponseChunk`` serialization as written by the stream endpoint
+- ``parse_event_chunk`` decoding as done by the API client
+
+Baselines depend on the machine; record them with ``--update-baseline`` on
+the machine that runs the comparison.
+
+Usage:
+    python -m benchmarks.bench_hot_paths [--update-baseline] [--only PREFIX]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import UUID, uuid4
+
+# Point the service at a throwaway database before any service module is imported
+_bench_dir = tempfile.mkdtemp(prefix="bench-hot-paths-")
+os.environ["DB_PATH"] = os.path.join(_bench_dir, "bench.db")
+os.environ["ARCHIVE_DB_PATH"] = os.path.join(_bench_dir, "bench_archive.db")
+os.environ["MODE"] = "bench"
+# The agent modules build their provider model on import; no request is ever sent
+os.environ.setdefault("OPENAI_API_KEY", "bench-key")
+
+from pydantic_ai.messages import (  # noqa: E402
+    ModelMessage,
+    ModelMessagesTypeAdapter,
+    ModelRequest,
+    ModelResponse,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+from src.service.api.agent.operations import _prepare_agent_messages  # noqa: E402
+from src.service.core.responses import THREAD_DETAIL  # noqa: E402
+from src.service.core.utils import (  # noqa: E402
+    _raw_json_to_content,
+    db_to_api_message,
+    db_to_api_thread,
+    db_to_api_thread_detail,
+    verify_thread_access,
+)
+from src.service.db.base import AsyncSessionLocal, archive_engine, engine, init_db  # noqa: E402
+from src.service.db.database import (  # noqa: E402
+    create_messages_batch,
+    create_thread,
+    get_messages_by_thread,
+    get_model_messages_by_thread,
+    get_thread,
+)
+from src.service.models.api import AgentType, MessageCreate, MessageRole, ThreadCreate  # noqa: E402
+from src.service.models.api.stream_models import (  # noqa: E402
+    AgentResponseChunk,
+    DoneChunk,
+    MessageCompleteChunk,
+    MessageCreatedChunk,
+    MessageStartedChunk,
+    StreamMessageInfo,
+    TextDeltaChunk,
+    parse_event_chunk,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+# Allowed slowdown for benchmarks without their own threshold in the baseline file
+DEFAULT_THRESHOLD = 1.5
+
+# History sizes (in stored messages) for the history loading benchmark
+HISTORY_SIZES = (10, 100, 1000)
+
+# Target wall time of one sample; calls per sample are calibrated to reach it
+SAMPLE_SECONDS = 0.02
+
+
+@dataclass
+class Result:
+    """
+    Timing of one benchmark.
+
+    Attributes:
+        name: Benchmark name, the key in the baseline file
+        median: Median seconds per call
+        stdev: Standard deviation of the per-call samples
+        calls: Calls timed in total
+    """
+    name: str
+    median: float
+    stdev: float
+    calls: int
+
+
+def _agent_turn(prompt: str) -> List[ModelMessage]:
+    """One agent turn as the service stores it: prompt, tool call, tool return, answer."""
+    output = {"support_advice": "Your balance is $123.45.", "block_card": False, "risk_level": 1}
+    return [
+        ModelRequest(parts=[UserPromptPart(content=prompt)]),
+        ModelResponse(parts=[ToolCallPart("get_balance", {"include_pending": True}, tool_call_id="call_1")]),
+        ModelRequest(parts=[ToolReturnPart("get_balance", 123.45, tool_call_id="call_1")]),
+        ModelResponse(parts=[
+            TextPart("Let me check that for you."),
+            ToolCallPart("final_result", output, tool_call_id="call_2"),
+        ]),
+        ModelRequest(parts=[ToolReturnPart("final_result", "Final result processed.", tool_call_id="call_2")]),
+    ]
+
+
+def _stream_chunks(message_id: UUID) -> List[AgentResponseChunk]:
+    """The chunks of a short streamed answer, in the order the endpoint sends them."""
+    chunks: List[AgentResponseChunk] = [
+        MessageCreatedChunk(message=StreamMessageInfo(id=uuid4(), role=MessageRole.USER)),
+        MessageStartedChunk(message_id=message_id),
+    ]
+    chunks.extend(TextDeltaChunk(message_id=message_id, token=f"word{index} ") for index in range(40))
+    chunks.extend([MessageCompleteChunk(message_id=message_id), DoneChunk()])
+    return chunks
+
+
+def _measure(name: str, operation: Callable[[], None], repeat: int) -> Result:
+    """Time a synchronous operation, calibrating calls per sample to ``SAMPLE_SECONDS``."""
+    operation()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        if time.perf_counter() - start >= SAMPLE_SECONDS or number >= 1 << 20:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        samples.append((time.perf_counter() - start) / number)
+    return Result(name, statistics.median(samples), statistics.pstdev(samples), number * repeat)
+
+
+async def _measure_async(name: str, operation: Callable[[], Awaitable[None]], repeat: int) -> Result:
+    """Time an async operation, calibrating calls per sample to ``SAMPLE_SECONDS``."""
+    await operation()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            await operation()
+        if time.perf_counter() - start >= SAMPLE_SECONDS or number >= 1 << 16:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            await operation()
+        samples.append((time.perf_counter() - start) / number)
+    return Result(name, statistics.median(samples), statistics.pstdev(samples), number * repeat)
+
+
+async def _populate_thread(messages: int) -> UUID:
+    """Create a thread holding about ``messages`` stored messages of complete agent turns."""
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            thread = await create_thread(db, ThreadCreate(user_id=uuid4(), agent_type=AgentType.BANK_SUPPORT))
+            thread_id = UUID(str(thread.id))
+            batch: List[MessageCreate] = []
+            for turn in range(-(-messages // 5)):
+                batch.extend(await _prepare_agent_messages(thread_id, _agent_turn(f"Question number {turn}")))
+                if len(batch) >= 500:
+                    await create_messages_batch(db, thread_id, batch)
+                    batch = []
+            if batch:
+                await create_messages_batch(db, thread_id, batch)
+    return thread_id
+
+
+async def run_benchmarks(repeat: int, only: Optional[str]) -> List[Result]:
+    """
+    Run every benchmark whose name starts with ``only``.
+
+    Args:
+        repeat: Samples per benchmark
+        only: Name prefix to select benchmarks, or None for all
+
+    Returns:
+        Results in the order the benchmarks ran
+    """
+    await init_db()
+    results: List[Result] = []
+
+    def selected(name: str) -> bool:
+        return only is None or name.startswith(only)
+
+    def add(result: Result) -> None:
+        results.append(result)
+        print(f"{result.name:<40} {result.median * 1e6:12.2f}us  ±{result.stdev * 1e6:9.2f}us  ({result.calls:,} calls)")
+
+    turn = _agent_turn("My card was stolen yesterday, please block it")
+    prompt_json = ModelMessagesTypeAdapter.dump_json(turn[:1]).decode()
+    turn_json = ModelMessagesTypeAdapter.dump_json(turn).decode()
+
+    if selected("raw_json_to_content.prompt"):
+        add(_measure("raw_json_to_content.prompt", lambda: _raw_json_to_content(prompt_json), repeat))
+    if selected("raw_json_to_content.turn"):
+        add(_measure("raw_json_to_content.turn", lambda: _raw_json_to_content(turn_json), repeat))
+
+    thread_ids = {size: await _populate_thread(size) for size in HISTORY_SIZES}
+    for size, thread_id in thread_ids.items():
+        name = f"get_model_messages_by_thread.{size}"
+        if not selected(name):
+            continue
+
+        async def load_history(thread_id: UUID = thread_id) -> None:
+            async with AsyncSessionLocal() as db:
+                await get_model_messages_by_thread(db, thread_id)
+
+        add(await _measure_async(name, load_history, repeat))
+
+    thread_id = thread_ids[HISTORY_SIZES[0]]
+    if selected("create_messages_batch.turn"):
+        async def save_turn() -> None:
+            batch = await _prepare_agent_messages(thread_id, turn)
+            async with AsyncSessionLocal() as db:
+                async with db.begin():
+                    await create_messages_batch(db, thread_id, batch)
+
+        add(await _measure_async("create_messages_batch.turn", save_turn, repeat))
+
+    if selected("prepare_agent_messages.turn"):
+        async def prepare_turn() -> None:
+            await _prepare_agent_messages(thread_id, turn, assistant_message_id=uuid4())
+
+        add(await _measure_async("prepare_agent_messages.turn", prepare_turn, repeat))
+
+    async with AsyncSessionLocal() as db:
+        stored = list(await get_messages_by_thread(db, thread_id))
+        thread = await get_thread(db, thread_id)
+    # The access check at the start of every agent turn, in the session that then loads the history
+    for name, cached in (("verify_thread_access.db", False), ("verify_thread_access.cached", True)):
+        if not selected(name):
+            continue
+
+        async def verify(cached: bool = cached) -> None:
+            async with AsyncSessionLocal() as db:
+                await verify_thread_access(db, thread_id, thread.user_id, cached=cached)
+
+        add(await _measure_async(name, verify, repeat))
+    if selected("db_to_api_message"):
+        add(_measure("db_to_api_message", lambda: [db_to_api_message(message) for message in stored[:5]], repeat))
+    if selected("db_to_api_thread"):
+        add(_measure("db_to_api_thread", lambda: db_to_api_thread(thread), repeat))
+
+    # The GET /threads/{thread_id} response of the largest thread: rows to models, models to bytes
+    large_thread_id = thread_ids[HISTORY_SIZES[-1]]
+    async with AsyncSessionLocal() as db:
+        large_stored = list(await get_messages_by_thread(db, large_thread_id))
+        large_thread = await get_thread(db, large_thread_id)
+    detail = db_to_api_thread_detail(large_thread, large_stored)
+    if selected(f"thread_detail.build.{HISTORY_SIZES[-1]}"):
+        add(_measure(
+            f"thread_detail.build.{HISTORY_SIZES[-1]}",
+            lambda: db_to_api_thread_detail(large_thread, large_stored),
+            repeat
+        ))
+    if selected(f"thread_detail.encode.{HISTORY_SIZES[-1]}"):
+        add(_measure(f"thread_detail.encode.{HISTORY_SIZES[-1]}", lambda: THREAD_DETAIL.dump_json(detail), repeat))
+
+    chunks = _stream_chunks(uuid4())
+    lines = [f"{chunk.model_dump_json()}\n" for chunk in chunks]
+    if selected("stream_chunks.serialize"):
+        add(_measure("stream_chunks.serialize", lambda: [f"{chunk.model_dump_json()}\n" for chunk in chunks], repeat))
+    if selected("stream_chunks.parse"):
+        add(_measure("stream_chunks.parse", lambda: [parse_event_chunk(json.loads(line)) for line in lines], repeat))
+
+    await engine.dispose()
+    await archive_engine.dispose()
+    return results
+
+
+def load_baselines(path: str = BASELINE_PATH) -> Dict[str, Dict[str, float]]:
+    """Load stored baselines keyed by benchmark name; empty if there is no file yet."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)["benchmarks"]
+
+
+def save_baselines(results: List[Result], path: str = BASELINE_PATH) -> None:
+    """
+    Store the results as the new baselines.
+
+    Thresholds already in the file are kept; new benchmarks get ``DEFAULT_THRESHOLD``.
+    Baselines of benchmarks that did not run are kept as they were.
+
+    Args:
+        results: Results to store
+        path: Baseline file
+    """
+    baselines = load_baselines(path)
+    for result in results:
+        threshold = baselines.get(result.name, {}).get("threshold", DEFAULT_THRESHOLD)
+        baselines[result.name] = {"median_us": round(result.median * 1e6, 3), "threshold": threshold}
+    with open(path, "w") as file:
+        json.dump({"benchmarks": dict(sorted(baselines.items()))}, file, indent=2)
+        file.write("\n")
+
+
+def find_regressions(results: List[Result], baselines: Dict[str, Dict[str, float]]) -> List[str]:
+    """
+    Compare results against their baselines.
+
+    Args:
+        results: Measured results
+        baselines: Stored baselines keyed by benchmark name
+
+    Returns:
+        A description of every benchmark slower than its baseline times its threshold
+    """
+    regressions = []
+    for result in results:
+        baseline = baselines.get(result.name)
+        if baseline is None:
+            continue
+        ratio = result.median * 1e6 / baseline["median_us"]
+        if ratio > baseline.get("threshold", DEFAULT_THRESHOLD):
+            regressions.append(
+                f"{result.name}: {result.median * 1e6:.2f}us is {ratio:.2f}x the baseline "
+                f"{baseline['median_us']:.2f}us (threshold {baseline.get('threshold', DEFAULT_THRESHOLD):.2f}x)"
+            )
+    return regressions
+
+
+def main() -> None:
+    """Parse arguments, run the benchmarks and compare them against the baselines."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=15, help="Samples per benchmark")
+    parser.add_argument("--only", default=None, help="Only run benchmarks whose name starts with this prefix")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baselines")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(args.repeat, args.only))
+
+    if args.update_baseline:
+        save_baselines(results, args.baseline)
+        print(f"\nBaselines written to {args.baseline}")
+        return
+
+    baselines = load_baselines(args.baseline)
+    missing = [result.name for result in results if result.name not in baselines]
+    if missing:
+        print(f"\nNo baseline for: {', '.join(missing)}")
+    regressions = find_regressions(results, baselines)
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
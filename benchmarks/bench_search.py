@@ -0,0 +1,186 @@
+"""
+Benchmark for full-text search over conversation history.
+
+Populates a throwaway database with synthetic conversations (1M messages by
+default), then measures:
+
+- bulk index build throughput
+- incremental indexing cost of one agent turn through ``create_messages_batch``
+- user-scoped search latency for common, rare and prefix queries
+
+Usage:
+    python -m benchmarks.bench_search [--messages 1000000] [--users 1000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import Callable, Awaitable, List
+from uuid import UUID, uuid4
+
+# Point the service at a throwaway database before any service module is imported
+_bench_dir = tempfile.mkdtemp(prefix="bench-search-")
+os.environ["DB_PATH"] = os.path.join(_bench_dir, "bench.db")
+os.environ["ARCHIVE_DB_PATH"] = os.path.join(_bench_dir, "bench_archive.db")
+os.environ["MODE"] = "bench"
+
+from sqlalchemy import text  # noqa: E402
+from pydantic_ai.messages import ModelMessagesTypeAdapter, ModelRequest, UserPromptPart  # noqa: E402
+
+from src.service.db.base import AsyncSessionLocal, archive_engine, engine, init_db  # noqa: E402
+from src.service.db.database import create_messages_batch  # noqa: E402
+from src.service.db.search import SEARCH_TABLE, _scope_key, search_messages  # noqa: E402
+from src.service.models.api import MessageCreate, MessageRole  # noqa: E402
+
+VOCABULARY = (
+    "balance account card transfer payment deposit withdrawal statement travel abroad "
+    "notify bank fraud stolen lost blocked pending transaction salary grocery restaurant "
+    "refund dispute charge limit overdraft savings loan mortgage interest fee branch "
+    "online mobile app password login verify identity address phone email help please"
+).split()
+RARE_WORDS = ["zanzibar", "quokka", "xylophone", "marzipan", "kerfuffle"]
+
+
+def _sentence(rng: random.Random) -> str:
+    """Generate a short synthetic customer or agent utterance."""
+    words = rng.choices(VOCABULARY, k=rng.randint(6, 24))
+    if rng.random() < 0.001:
+        words.append(rng.choice(RARE_WORDS))
+    return " ".join(words)
+
+
+def _raw_json(content: str) -> str:
+    """Serialize a user prompt the way the service stores it."""
+    return json.dumps([{
+        "parts": [{"content": content, "timestamp": "2025-01-01T00:00:00Z", "part_kind": "user-prompt"}],
+        "instructions": None,
+        "kind": "request",
+    }])
+
+
+def populate(db_path: str, messages: int, users: int, messages_per_thread: int, seed: int) -> List[UUID]:
+    """Bulk-load threads, messages and index rows; returns the user IDs."""
+    rng = random.Random(seed)
+    user_ids = [uuid4() for _ in range(users)]
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous=OFF")
+
+    threads, rows, documents = [], [], []
+    index_seconds = 0.0
+    for i in range(messages):
+        if i % messages_per_thread == 0:
+            thread_id, user_id = str(uuid4()), rng.choice(user_ids)
+            threads.append((thread_id, str(user_id), "bank_support"))
+        content = _sentence(rng)
+        message_id = str(uuid4())
+        rows.append((message_id, thread_id, "user", _raw_json(content)))
+        documents.append((content, _scope_key("u", user_id), _scope_key("t", thread_id), message_id, thread_id))
+
+        if len(rows) >= 50_000 or i == messages - 1:
+            conn.executemany("INSERT INTO threads (id, user_id, agent_type) VALUES (?, ?, ?)", threads)
+            conn.executemany("INSERT INTO messages (id, thread_id, role, raw_json_text) VALUES (?, ?, ?, ?)", rows)
+            start = time.perf_counter()
+            conn.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (content, user_key, thread_key, message_id, thread_id) "
+                "VALUES (?, ?, ?, ?, ?)",
+                documents,
+            )
+            index_seconds += time.perf_counter() - start
+            conn.commit()
+            threads, rows, documents = [], [], []
+            print(f"  loaded {i + 1:,} messages", end="\r")
+
+    conn.close()
+    print(f"\nBulk index build: {messages / index_seconds:,.0f} messages/s ({index_seconds:.1f}s total)")
+    return user_ids
+
+
+def _report(name: str, samples: List[float]) -> None:
+    """Print latency percentiles for a list of durations in seconds."""
+    ordered = sorted(samples)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"{name:<32} p50 {statistics.median(ordered) * 1000:8.2f}ms"
+        f"   p95 {p95 * 1000:8.2f}ms   max {ordered[-1] * 1000:8.2f}ms"
+    )
+
+
+async def _measure(iterations: int, operation: Callable[[int], Awaitable[None]]) -> List[float]:
+    """Time an async operation over several iterations."""
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await operation(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run the benchmark."""
+    await init_db()
+    await engine.dispose()
+    await archive_engine.dispose()
+
+    print(f"Populating {args.messages:,} messages for {args.users:,} users...")
+    user_ids = populate(os.environ["DB_PATH"], args.messages, args.users, args.messages_per_thread, args.seed)
+    rng = random.Random(args.seed + 1)
+
+    async with AsyncSessionLocal() as db:
+        thread_ids = [
+            row[0] for row in (await db.execute(
+                text("SELECT id FROM threads LIMIT :n"), {"n": args.iterations}
+            )).all()
+        ]
+
+    async def turn(i: int) -> None:
+        thread_id = UUID(thread_ids[i % len(thread_ids)])
+        batch = [
+            MessageCreate(
+                thread_id=thread_id,
+                role=MessageRole.USER,
+                raw_json=ModelMessagesTypeAdapter.dump_json([ModelRequest(parts=[UserPromptPart(content=_sentence(rng))])]),
+            )
+            for _ in range(3)
+        ]
+        async with AsyncSessionLocal() as db:
+            async with db.begin():
+                await create_messages_batch(db, thread_id, batch)
+
+    _report("create_messages_batch (3 msgs)", await _measure(args.iterations, turn))
+
+    async def search(query: str) -> Callable[[int], Awaitable[None]]:
+        async def operation(i: int) -> None:
+            async with AsyncSessionLocal() as db:
+                await search_messages(db, rng.choice(user_ids), query)
+        return operation
+
+    for name, query in (
+        ("search common term", "balance"),
+        ("search two terms", "stolen card"),
+        ("search prefix", "mortg"),
+        ("search rare term", "zanzibar"),
+    ):
+        _report(name, await _measure(args.iterations, await search(query)))
+
+    await engine.dispose()
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1_000_000, help="Number of messages to generate")
+    parser.add_argument("--users", type=int, default=1_000, help="Number of distinct users")
+    parser.add_argument("--messages-per-thread", type=int, default=20, help="Messages per thread")
+    parser.add_argument("--iterations", type=int, default=200, help="Samples per measurement")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Streaming load generator for the agent API.
+
+Opens concurrent ``/agent/stream`` sessions through ``ApiClient`` and raises
+the concurrency in steps. Each session belongs to one of the test threads and
+sends queries back to back until its step ends. Per step it reports:
+
+- time to first chunk (any chunk) and to the first token, p50/p95/p99
+- gaps between consecutive chunks of a stream, p50/p95/p99
+- streams and chunks per second
+- error rate, by status code or exception type
+- server CPU, from the ``process`` entry of the health endpoint
+
+Run it against one local worker on the mock model to find where that worker
+saturates: throughput stops growing while latency keeps rising. For example::
+
+    MOCK_MODEL_ENABLED=true uvicorn src.service.main:app --workers 1
+    python -m benchmarks.load_stream --steps 1,2,4,8,16,32 --threads 32
+
+Turns on the same thread are serialized, so with more sessions than threads
+some streams fail with 409; use at least as many threads as sessions to
+measure the worker rather than the thread locks.
+
+Usage:
+    python -m benchmarks.load_stream [--url URL] [--steps 1,2,4] [--threads 8]
+                                     [--step-seconds 20] [--query TEXT]
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+from src.client.api_client import ApiClient
+from src.client._env import API_BASE_URL, API_KEY
+from src.service.models.api import AgentType
+from src.service.models.api.stream_models import ErrorChunk, TextDeltaChunk
+
+# Users owning the test threads; threads are spread over them round-robin
+USER_COUNT = 4
+
+
+@dataclass
+class StepStats:
+    """
+    Measurements of one concurrency step.
+
+    Attributes:
+        concurrency: Concurrent stream sessions
+        seconds: Wall time of the step
+        first_chunk: Seconds until the first chunk of each successful stream
+        first_token: Seconds until the first token of each successful stream
+        gaps: Seconds between consecutive chunks of all streams
+        chunks: Chunks received
+        streams: Streams completed without error
+        errors: Failed streams by status code or exception type
+        cpu: Server CPU seconds per wall second, or None without a reading
+    """
+    concurrency: int
+    seconds: float = 0.0
+    first_chunk: List[float] = field(default_factory=list)
+    first_token: List[float] = field(default_factory=list)
+    gaps: List[float] = field(default_factory=list)
+    chunks: int = 0
+    streams: int = 0
+    errors: Counter = field(default_factory=Counter)
+    cpu: Optional[float] = None
+
+    @property
+    def error_rate(self) -> float:
+        """Share of streams that failed."""
+        total = self.streams + sum(self.errors.values())
+        return sum(self.errors.values()) / total if total else 0.0
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of the samples; 0 if there are none."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def _error_kind(error: BaseException) -> str:
+    """Short label for a failed stream: the HTTP status code or the exception type."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return str(error.response.status_code)
+    return type(error).__name__
+
+
+async def _stream_once(client: ApiClient, thread_id: Any, email: str, query: str, stats: StepStats) -> None:
+    """Run one stream and record its latencies, or its error."""
+    start = previous = time.perf_counter()
+    first_chunk = first_token = None
+    gaps: List[float] = []
+    chunks = 0
+    try:
+        async for chunk in client.stream_agent_query(thread_id, query, email):
+            now = time.perf_counter()
+            if first_chunk is None:
+                first_chunk = now - start
+            else:
+                gaps.append(now - previous)
+            if first_token is None and isinstance(chunk, TextDeltaChunk):
+                first_token = now - start
+            previous = now
+            chunks += 1
+            if isinstance(chunk, ErrorChunk):
+                raise RuntimeError(chunk.error_type)
+    except Exception as e:
+        stats.errors[_error_kind(e)] += 1
+        stats.chunks += chunks
+        return
+
+    stats.streams += 1
+    stats.chunks += chunks
+    stats.gaps.extend(gaps)
+    if first_chunk is not None:
+        stats.first_chunk.append(first_chunk)
+    if first_token is not None:
+        stats.first_token.append(first_token)
+
+
+async def _session(
+    client: ApiClient,
+    thread: Any,
+    email: str,
+    query: str,
+    deadline: float,
+    stats: StepStats
+) -> None:
+    """Send queries on one thread back to back until the deadline."""
+    while time.perf_counter() < deadline:
+        await _stream_once(client, thread.id, email, query, stats)
+
+
+async def _cpu_seconds(client: ApiClient) -> Optional[float]:
+    """Server CPU seconds used so far, or None if the health endpoint is unavailable."""
+    try:
+        return float((await client.get_health())["process"]["cpu_seconds"])
+    except Exception:
+        return None
+
+
+async def run_step(
+    client: ApiClient,
+    threads: List[Any],
+    emails: Dict[Any, str],
+    concurrency: int,
+    seconds: float,
+    query: str
+) -> StepStats:
+    """
+    Run one step of concurrent stream sessions.
+
+    Args:
+        client: API client
+        threads: Test threads; session ``i`` uses thread ``i % len(threads)``
+        emails: Owner of each thread by thread ID
+        concurrency: Concurrent sessions
+        seconds: Duration of the step
+        query: Query every stream sends
+
+    Returns:
+        The step's measurements
+    """
+    stats = StepStats(concurrency=concurrency)
+    cpu_before = await _cpu_seconds(client)
+    start = time.perf_counter()
+    deadline = start + seconds
+    await asyncio.gather(*(
+        _session(client, threads[i % len(threads)], emails[threads[i % len(threads)].id], query, deadline, stats)
+        for i in range(concurrency)
+    ))
+    stats.seconds = time.perf_counter() - start
+    cpu_after = await _cpu_seconds(client)
+    if cpu_before is not None and cpu_after is not None:
+        stats.cpu = (cpu_after - cpu_before) / stats.seconds
+    return stats
+
+
+def _latency(samples: Sequence[float]) -> str:
+    """p50/p95/p99 of the samples in milliseconds."""
+    return "/".join(f"{percentile(samples, fraction) * 1000:.0f}" for fraction in (0.50, 0.95, 0.99))
+
+
+def print_header() -> None:
+    """Print the column headers of the step report."""
+    print(
+        f"{'conc':>5} {'first chunk ms':>16} {'first token ms':>16} {'chunk gap ms':>14} "
+        f"{'streams/s':>10} {'chunks/s':>10} {'errors':>8} {'cpu':>6}  error kinds"
+    )
+
+
+def print_step(stats: StepStats) -> None:
+    """Print one line of the step report; latencies are p50/p95/p99."""
+    cpu = f"{stats.cpu * 100:5.0f}%" if stats.cpu is not None else f"{'n/a':>6}"
+    kinds = ", ".join(f"{kind}: {count}" for kind, count in stats.errors.most_common())
+    print(
+        f"{stats.concurrency:>5} {_latency(stats.first_chunk):>16} {_latency(stats.first_token):>16} "
+        f"{_latency(stats.gaps):>14} {stats.streams / stats.seconds:>10.1f} {stats.chunks / stats.seconds:>10.0f} "
+        f"{stats.error_rate * 100:>7.1f}% {cpu}  {kinds}"
+    )
+
+
+def saturation_step(steps: List[StepStats], min_gain: float = 0.05) -> Optional[StepStats]:
+    """
+    Find the step after which more concurrency stopped paying off.
+
+    Args:
+        steps: Steps in order of increasing concurrency
+        min_gain: Smallest relative throughput gain that still counts as scaling
+
+    Returns:
+        The last step whose successor gained less than ``min_gain`` streams per
+        second or raised the error rate, or None if throughput kept scaling
+    """
+    for current, following in zip(steps, steps[1:]):
+        current_rate = current.streams / current.seconds
+        following_rate = following.streams / following.seconds
+        if following_rate < current_rate * (1 + min_gain) or following.error_rate > current.error_rate + 0.01:
+            return current
+    return None
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Create the test threads and run every step."""
+    client = ApiClient(base_url=args.url, api_key=args.api_key)
+    if not await client.check_health():
+        raise SystemExit(f"API at {args.url} is not healthy")
+
+    health = await client.get_health()
+    print(f"Server pid {health.get('process', {}).get('pid', '?')}, agents: {health.get('agents', {})}")
+
+    threads, emails = [], {}
+    for i in range(args.threads):
+        email = f"load-test-{i % USER_COUNT}@example.com"
+        thread = await client.create_thread(AgentType.BANK_SUPPORT.value, email)
+        threads.append(thread)
+        emails[thread.id] = email
+    print(f"Created {len(threads)} threads; {args.step_seconds:.0f}s per step\n")
+
+    print_header()
+    steps = []
+    for concurrency in args.steps:
+        stats = await run_step(client, threads, emails, concurrency, args.step_seconds, args.query)
+        print_step(stats)
+        steps.append(stats)
+
+    saturated = saturation_step(steps)
+    if saturated is None:
+        print("\nThroughput kept scaling; raise the concurrency to find the saturation point")
+    else:
+        print(
+            f"\nSaturation at about {saturated.concurrency} concurrent streams "
+            f"({saturated.streams / saturated.seconds:.1f} streams/s)"
+        )
+
+
+def main() -> None:
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=API_BASE_URL, help="Base URL of the API")
+    parser.add_argument("--api-key", default=API_KEY, help="API key")
+    parser.add_argument(
+        "--steps",
+        type=lambda value: [int(step) for step in value.split(",")],
+        default=[1, 2, 4, 8, 16, 32],
+        help="Comma-separated concurrency levels",
+    )
+    parser.add_argument("--threads", type=int, default=32, help="Threads to spread the sessions over")
+    parser.add_argument("--step-seconds", type=float, default=20.0, help="Duration of each step")
+    parser.add_argument("--query", default="What is my balance?", help="Query every stream sends")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
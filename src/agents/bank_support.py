@@ -9,6 +9,7 @@ from typing import List, Dict, Any, Annotated
 from typing_extensions import TypedDict, NotRequired
 
 from src.agents.deps import SupportDependencies
+from src.common.tools import read_only
 
 
 # TypedDict for streaming structured output
@@ -40,7 +41,8 @@ support_agent = Agent(
 )
 
 
-@support_agent.system_prompt
+# Dynamic, so the prompt layout can tell per-customer data from the static instructions
+@support_agent.system_prompt(dynamic=True)
 async def add_customer_info(ctx: RunContext[SupportDependencies]) -> str:
     """Add customer information to the system prompt."""
     customer_name = await ctx.deps.db.customer_name(id=ctx.deps.customer_id)
@@ -48,6 +50,7 @@ async def add_customer_info(ctx: RunContext[SupportDependencies]) -> str:
 
 
 @support_agent.tool
+@read_only
 async def get_balance(
     ctx: RunContext[SupportDependencies], include_pending: bool = True
 ) -> float:
@@ -64,6 +67,7 @@ async def get_balance(
 
 
 @support_agent.tool
+@read_only
 async def get_recent_transactions(
     ctx: RunContext[SupportDependencies], limit: int = 5
 ) -> List[Dict[str, Any]]:
@@ -1,5 +1,13 @@
-from dataclasses import dataclass
-from typing import List, Dict, Any
+import asyncio
+import copy
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
+
+from src.common.stats import HitRateStats
 
 # Simulate a database connection
 class DatabaseConn:
@@ -32,8 +40,151 @@ class DatabaseConn:
         return True
 
 
+# Seconds each read stays cached; methods not listed here are never cached
+DEFAULT_CACHE_TTLS: Dict[str, float] = {
+    "customer_name": 3600.0,
+    "customer_balance": 30.0,
+    "recent_transactions": 30.0,
+}
+
+# Cached reads dropped for the customer after each write
+CACHE_INVALIDATIONS: Dict[str, Tuple[str, ...]] = {
+    "block_card": ("customer_balance", "recent_transactions"),
+}
+
+# Cached reads are keyed by customer id, method name and sorted keyword arguments
+CacheKey = Tuple[int, str, Tuple[Tuple[str, Any], ...]]
+
+
+@dataclass
+class DatabaseCache:
+    """
+    LRU store of cached customer data shared by ``CachingDatabaseConn`` instances.
+
+    Use one store per request to deduplicate reads within a turn, or one
+    long-lived store to share data across the turns of each customer.
+
+    Attributes:
+        max_entries: Maximum cached reads before the least recently used is dropped
+        stats: Hit-rate counters
+    """
+    max_entries: int = 10_000
+    stats: HitRateStats = field(default_factory=HitRateStats)
+    _entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = field(default_factory=OrderedDict, repr=False)
+
+    def get(self, key: CacheKey) -> Tuple[bool, Any]:
+        """Return ``(found, value)`` for a key, dropping it if expired."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            entry = None
+        if entry is None:
+            self.stats.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return True, entry[1]
+
+    def set(self, key: CacheKey, value: Any, ttl_seconds: float) -> None:
+        """Store a value for ``ttl_seconds``."""
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        self.stats.stores += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, customer_id: int, methods: Tuple[str, ...]) -> None:
+        """Drop the cached results of the given methods for a customer."""
+        stale = [key for key in self._entries if key[0] == customer_id and key[1] in methods]
+        for key in stale:
+            del self._entries[key]
+        self.stats.invalidations += len(stale)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachingDatabaseConn(DatabaseConn):
+    """
+    Memoizing wrapper around a ``DatabaseConn`` backend.
+
+    Reads are cached per customer and argument set with a per-method TTL;
+    writes go straight to the backend and invalidate the reads they affect.
+    Tools and system prompts use it exactly like the backend.
+    """
+
+    def __init__(
+        self,
+        backend: DatabaseConn,
+        cache: Optional[DatabaseCache] = None,
+        ttls: Optional[Dict[str, float]] = None
+    ):
+        self.backend = backend
+        self.cache = cache if cache is not None else DatabaseCache()
+        self.ttls = DEFAULT_CACHE_TTLS if ttls is None else ttls
+
+    async def _cached(self, method: str, id: int, **kwargs: Any) -> Any:
+        """Serve a read from the cache or fetch and store it."""
+        ttl = self.ttls.get(method)
+        if not ttl:
+            return await getattr(self.backend, method)(id=id, **kwargs)
+
+        key = (id, method, tuple(sorted(kwargs.items())))
+        found, value = self.cache.get(key)
+        if not found:
+            value = await getattr(self.backend, method)(id=id, **kwargs)
+            self.cache.set(key, value, ttl)
+        # Callers must not be able to mutate the cached copy
+        return copy.deepcopy(value)
+
+    async def customer_name(self, id: int) -> str:
+        """Get the customer's name, cached."""
+        name: str = await self._cached("customer_name", id)
+        return name
+
+    async def customer_balance(self, id: int, include_pending: bool = True) -> float:
+        """Get the customer's balance, cached."""
+        balance: float = await self._cached("customer_balance", id, include_pending=include_pending)
+        return balance
+
+    async def recent_transactions(self, id: int, limit: int = 5) -> List[Dict[str, Any]]:
+        """Get the customer's recent transactions, cached."""
+        transactions: List[Dict[str, Any]] = await self._cached("recent_transactions", id, limit=limit)
+        return transactions
+
+    async def block_card(self, id: int) -> bool:
+        """Block the customer's card and drop the cached data it affects."""
+        try:
+            return await self.backend.block_card(id=id)
+        finally:
+            self.cache.invalidate(id, CACHE_INVALIDATIONS["block_card"])
+
+
 @dataclass
 class SupportDependencies:
     """Dependencies for the bank support agent."""
     customer_id: int
-    db: DatabaseConn
\ No newline at end of file
+    db: DatabaseConn
+
+    async def cache_fingerprint(self) -> str:
+        """Fingerprint the customer data the agent's prompt and tools can read."""
+        data = [
+            self.customer_id,
+            await self.db.customer_name(id=self.customer_id),
+            await self.db.customer_balance(id=self.customer_id, include_pending=True),
+            await self.db.customer_balance(id=self.customer_id, include_pending=False),
+            await self.db.recent_transactions(id=self.customer_id),
+        ]
+        return hashlib.sha256(json.dumps(data, default=str).encode("utf-8")).hexdigest()
+
+    async def prefetch(self) -> None:
+        """Load the customer profile into a caching connection before the agent asks for it."""
+        if not isinstance(self.db, CachingDatabaseConn):
+            return
+        await asyncio.gather(
+            self.db.customer_name(id=self.customer_id),
+            self.db.customer_balance(id=self.customer_id),
+            self.db.recent_transactions(id=self.customer_id),
+        )
\ No newline at end of file
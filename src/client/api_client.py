@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 import uuid
-from typing import AsyncGenerator, Dict, List
+from typing import Any, AsyncGenerator, Callable, Dict, List, Tuple, TypeVar, cast
 from uuid import UUID
 import httpx
 
@@ -12,6 +12,7 @@ from src.service.models.api.agent_models import AgentResponse
 from src.service.models.api.stream_models import AgentResponseChunk, parse_event_chunk
 from src.service.models.api.thread_models import ThreadResponse, ThreadDetailResponse
 
+T = TypeVar("T")
 
 class ApiClient:
     """Client for communicating with the backend API."""
@@ -23,6 +24,8 @@ class ApiClient:
             "Content-Type": "application/json",
             "X-API-Key": api_key,
         }
+        # Last response of each conditional GET by URL and user: (ETag, parsed body)
+        self._etag_cache: Dict[Tuple[str, str], Tuple[str, Any]] = {}
         
     def _generate_uuid_from_google_id(self, google_user_id: str) -> UUID:
         namespace_uuid = UUID("00000000-0000-0000-0000-000000000000")
@@ -45,6 +48,38 @@ class ApiClient:
             headers["X-User-ID"] = self._get_user_id(email)
         return headers
     
+    async def _get_conditional(self, url: str, user_email: str, parse: Callable[[Any], T]) -> T:
+        """
+        GET a resource, reusing the cached copy when the server answers 304.
+        
+        Args:
+            url: URL of the resource
+            user_email: Email of the user the request is made for
+            parse: Builds the result from the JSON body
+            
+        Returns:
+            The parsed body of the response, or the cached one if it is still current
+        """
+        headers = self._get_headers(user_email)
+        key = (url, headers["X-User-ID"])
+        cached = self._etag_cache.get(key)
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+
+        async with httpx.AsyncClient() as client:
+            response = await client.get(url, headers=headers)
+        if response.status_code == httpx.codes.NOT_MODIFIED and cached is not None:
+            return cast(T, cached[1])
+        response.raise_for_status()
+
+        result = parse(response.json())
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache[key] = (etag, result)
+        else:
+            self._etag_cache.pop(key, None)
+        return result
+    
     async def create_thread(self, agent_type: str, user_email: str) -> ThreadResponse:
         """
         Create a new conversation thread.
@@ -77,34 +112,35 @@ class ApiClient:
         """
         Get all threads for the current user.
         
+        Sends the ETag of the last list, so an unchanged list is not transferred again.
+        
         Returns:
             List of thread data objects
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/api/v1/threads",
-                headers=self._get_headers(user_email)
-            )
-            response.raise_for_status()
-            return [ThreadResponse.model_validate(thread) for thread in response.json()]
+        threads = await self._get_conditional(
+            f"{self.base_url}/api/v1/threads",
+            user_email,
+            lambda body: [ThreadResponse.model_validate(thread) for thread in body]
+        )
+        return list(threads)
     
     async def get_thread(self, thread_id: UUID, user_email: str) -> ThreadDetailResponse:
         """
         Get a specific thread with its messages.
         
+        Sends the ETag of the last copy, so an unchanged thread is not transferred again.
+        
         Args:
             thread_id: UUID of the thread to retrieve
             
         Returns:
             Thread data with messages
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/api/v1/threads/{thread_id}",
-                headers=self._get_headers(user_email)
-            )
-            response.raise_for_status()
-            return ThreadDetailResponse.model_validate(response.json())
+        return await self._get_conditional(
+            f"{self.base_url}/api/v1/threads/{thread_id}",
+            user_email,
+            ThreadDetailResponse.model_validate
+        )
     
     async def query_agent(self, thread_id: UUID, query: str, user_email: str) -> AgentResponse:
         """
@@ -200,3 +236,24 @@ class ApiClient:
                 # Any exception (connection error, timeout) means API is not healthy
                 return False
 
+    async def get_health(self, timeout: float = 10.0) -> Dict[str, Any]:
+        """
+        Get the full health report of the API server.
+        
+        Args:
+            timeout: Request timeout in seconds
+            
+        Returns:
+            The health report, including the worker's CPU time under "process"
+            
+        Raises:
+            HTTPStatusError: If the API returns an error status code
+        """
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                f"{self.base_url}/api/v1/health",
+                headers=self._get_headers(None),
+                timeout=timeout
+            )
+            response.raise_for_status()
+            return dict(response.json())
@@ -27,6 +27,7 @@ from src.agents.bank_support import SupportOutput
 # Import stream models
 from src.service.models.api.stream_models import (
     TextDeltaChunk,
+    ToolStartedChunk,
     DoneChunk,
     ErrorChunk,
 )
@@ -176,6 +177,10 @@ async def stream_agent_response(thread_id: uuid.UUID, query: str) -> None:
                     # Update the same container with the growing response
                     message_container.markdown(response_json)
                 
+                elif isinstance(chunk, ToolStartedChunk):
+                    # Show what the agent is doing until the answer starts
+                    message_container.markdown(f"_Calling {chunk.tool_name}..._")
+                
                 elif isinstance(chunk, DoneChunk):
                     # Add the assistant's response to our messages array
                     assistant_msg = UIMessage(role="assistant", content=str(response_json))
@@ -0,0 +1 @@
+"""Building blocks shared by the agents and the service."""
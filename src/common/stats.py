@@ -0,0 +1,46 @@
+"""Counters shared by the agents and the service."""
+
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass
+class HitRateStats:
+    """
+    Hit/miss counters for a cache.
+
+    Attributes:
+        hits: Lookups answered from the cache
+        misses: Lookups that had to go to the source
+        stores: Entries written to the cache
+        evictions: Entries dropped because the cache was full
+        expirations: Entries dropped because their TTL had passed
+        invalidations: Entries dropped because the underlying data changed
+        uncacheable: Results that were not stored because of the caching policy
+    """
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    uncacheable: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered from the cache, or 0.0 when nothing was looked up."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        """Export the counters and hit rate as a flat dictionary."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "uncacheable": self.uncacheable,
+        }
@@ -0,0 +1,29 @@
+"""Markers for agent tools, read by the service when it handles their calls."""
+
+from typing import Any, Callable, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_READ_ONLY_ATTRIBUTE = "__read_only_tool__"
+
+
+def read_only(function: F) -> F:
+    """
+    Mark a tool as only reading data covered by the dependencies' cache fingerprint.
+
+    A run whose tool calls are all read-only may be answered from the response
+    cache. Apply it below the agent's ``tool`` decorator.
+
+    Args:
+        function: The tool function
+
+    Returns:
+        The same function
+    """
+    setattr(function, _READ_ONLY_ATTRIBUTE, True)
+    return function
+
+
+def is_read_only(function: Callable[..., Any]) -> bool:
+    """Whether a tool function was marked with ``read_only``."""
+    return getattr(function, _READ_ONLY_ATTRIBUTE, False) is True
@@ -1,9 +1,17 @@
 
+import argparse
 import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
+
 from dotenv import load_dotenv
+from pydantic_ai.models import infer_model
 
 from src.agents.bank_support import support_agent
 from src.agents.deps import SupportDependencies, DatabaseConn
+from src.service.core.metrics import percentile
+from src.service.core.rate_limits import RateLimitedModel, RateScheduler, model_key
 
 # Load environment variables from .env file
 load_dotenv()
@@ -76,5 +84,156 @@ async def main() -> None:
             print(f"Error processing query: {e}")
 
 
+def load_batch(path: str) -> List[Dict[str, Any]]:
+    """
+    Read batch items from a JSONL file.
+    
+    Each line is an object with a ``query`` and optionally an ``id`` and a
+    ``customer_id`` (defaults to 123). Blank lines are skipped.
+    
+    Args:
+        path: Path of the JSONL file
+        
+    Returns:
+        The items in file order
+    """
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if "query" not in item:
+                raise ValueError(f"Line {line_number} of {path} has no query")
+            items.append(item)
+    return items
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    concurrency: int = 4,
+    rpm: Optional[int] = None,
+    tpm: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Run the queries of a JSONL file concurrently and write each result as it finishes.
+    
+    Every output line holds the item's ``id`` (its line index if the input has
+    none), the query, the agent's output or error, token usage and latency.
+    
+    Args:
+        input_path: JSONL file with one query per line
+        output_path: JSONL file receiving one result per line
+        concurrency: Maximum number of queries running at once
+        rpm: Model requests per minute to stay under, if any
+        tpm: Model tokens per minute to stay under, if any
+        
+    Returns:
+        Summary with counts, throughput, token usage and latency percentiles
+        
+    Raises:
+        ValueError: If rate limits are given but the agent has no model to pace
+    """
+    items = load_batch(input_path)
+
+    # Pace model requests with the same token buckets the service uses
+    model = None
+    if rpm or tpm:
+        if support_agent.model is None:
+            raise ValueError("Rate limits need the support agent to have a model configured")
+        base = infer_model(support_agent.model)
+        limits = {model_key(base): {"rpm": rpm or 1_000_000, "tpm": tpm or 1_000_000_000}}
+        model = RateLimitedModel(base, RateScheduler(limits), output_tokens=512)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    totals = {"succeeded": 0, "failed": 0, "requests": 0, "request_tokens": 0, "response_tokens": 0, "total_tokens": 0}
+
+    async def run_item(index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            deps = SupportDependencies(customer_id=item.get("customer_id", 123), db=DatabaseConn())
+            record: Dict[str, Any] = {"id": item.get("id", index), "query": item["query"]}
+            start = time.perf_counter()
+            try:
+                result = await support_agent.run(item["query"], deps=deps, model=model)
+                usage = result.usage()
+                record["output"] = result.output
+                record["usage"] = {
+                    "requests": usage.requests,
+                    "request_tokens": usage.request_tokens or 0,
+                    "response_tokens": usage.response_tokens or 0,
+                    "total_tokens": usage.total_tokens or 0,
+                }
+            except Exception as e:
+                record["error"] = str(e)
+            record["latency_ms"] = (time.perf_counter() - start) * 1000
+            return record
+
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(run_item(index, item)) for index, item in enumerate(items)]
+    try:
+        with open(output_path, "w", encoding="utf-8") as out:
+            for next_record in asyncio.as_completed(tasks):
+                record = await next_record
+                out.write(json.dumps(record, default=str) + "\n")
+                out.flush()
+
+                latencies.append(record["latency_ms"] / 1000)
+                if "error" in record:
+                    totals["failed"] += 1
+                    continue
+                totals["succeeded"] += 1
+                for key, value in record["usage"].items():
+                    totals[key] += value
+    finally:
+        for task in tasks:
+            task.cancel()
+    wall_seconds = time.perf_counter() - started
+
+    return {
+        "items": len(items),
+        **totals,
+        "wall_seconds": wall_seconds,
+        "items_per_second": len(items) / wall_seconds if wall_seconds else 0.0,
+        "tokens_per_second": totals["total_tokens"] / wall_seconds if wall_seconds else 0.0,
+        "p50_seconds": percentile(latencies, 50),
+        "p95_seconds": percentile(latencies, 95),
+        "p99_seconds": percentile(latencies, 99),
+    }
+
+
+def print_batch_summary(summary: Dict[str, Any]) -> None:
+    """Print the throughput, usage and latency summary of a batch run."""
+    print("--- Batch Summary ---")
+    print(f"Items: {summary['items']} ({summary['succeeded']} succeeded, {summary['failed']} failed)")
+    print(f"Wall time: {summary['wall_seconds']:.2f}s")
+    print(f"Throughput: {summary['items_per_second']:.2f} items/s, {summary['tokens_per_second']:.0f} tokens/s")
+    print(
+        f"Usage: {summary['requests']} requests, {summary['request_tokens']} request tokens, "
+        f"{summary['response_tokens']} response tokens"
+    )
+    print(
+        f"Latency: p50 {summary['p50_seconds'] * 1000:.0f}ms, "
+        f"p95 {summary['p95_seconds'] * 1000:.0f}ms, p99 {summary['p99_seconds'] * 1000:.0f}ms"
+    )
+    print("---------------------")
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Run the bank support agent example or a batch of queries.")
+    parser.add_argument("--batch", metavar="INPUT", help="JSONL file of queries to run in batch mode")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL file receiving batch results")
+    parser.add_argument("--concurrency", type=int, default=4, help="Queries running at once in batch mode")
+    parser.add_argument("--rpm", type=int, default=None, help="Model requests per minute to stay under")
+    parser.add_argument("--tpm", type=int, default=None, help="Model tokens per minute to stay under")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    args = parse_args()
+    if args.batch:
+        print_batch_summary(asyncio.run(run_batch(args.batch, args.output, args.concurrency, args.rpm, args.tpm)))
+    else:
+        asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""Run agent job workers without the API, so they can be scaled separately.
+
+The API processes start no workers unless JOB_WORKERS is set; start as many
+of these as needed:
+
+    python -m src.run_job_worker --workers 8
+"""
+
+import argparse
+import asyncio
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+async def main(workers: int) -> None:
+    """Create the tables, then process jobs until interrupted."""
+    from src.service.api.jobs.operations import job_worker_pool
+    from src.service.db.base import archive_engine, engine, init_db
+
+    await init_db()
+    job_worker_pool.workers = workers
+    await job_worker_pool.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await job_worker_pool.stop()
+        await engine.dispose()
+        await archive_engine.dispose()
+
+
+if __name__ == "__main__":
+    from src.service.core.settings import settings
+
+    parser = argparse.ArgumentParser(description="Process queued agent jobs.")
+    parser.add_argument("--workers", type=int, default=settings.JOB_WORKERS or 4, help="Concurrent jobs")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.workers))
+    except KeyboardInterrupt:
+        pass
@@ -5,7 +5,11 @@ from fastapi import APIRouter, Depends
 from src.service.api.agent.endpoints import router as agent_router
 from src.service.api.thread.endpoints import router as threads_router
 from src.service.api.health.endpoints import router as health_router
-from src.service.dependencies.auth import get_api_key
+from src.service.api.archive.endpoints import router as archive_router
+from src.service.api.jobs.endpoints import router as jobs_router
+from src.service.api.usage.endpoints import router as usage_router
+from src.service.api.metrics.endpoints import router as metrics_router
+from src.service.dependencies.auth import get_admin_api_key, get_api_key
 from src.service.dependencies.user import get_user_id
 
 # Create main API router with API key dependency only
@@ -14,6 +18,20 @@ api_router = APIRouter(dependencies=[Depends(get_api_key)])
 # Include health endpoints - only requires API key
 api_router.include_router(health_router, tags=["health"])
 
+# Include archive maintenance endpoints - also requires the admin API key
+api_router.include_router(
+    archive_router,
+    prefix="/archive",
+    tags=["archive"],
+    dependencies=[Depends(get_admin_api_key)]
+)
+
+# Include usage reporting - scoped to the caller unless the admin API key is given
+api_router.include_router(usage_router, prefix="/usage", tags=["usage"])
+
+# Include Prometheus metrics - only requires API key
+api_router.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
+
 # Include endpoints that require both API key and user ID validation
 # Add user_id dependency at the router level so all thread endpoints require it
 api_router.include_router(
@@ -23,6 +41,14 @@ api_router.include_router(
     dependencies=[Depends(get_user_id)]
 )
 
+# Agent jobs live under the agent prefix and also require a user ID
+api_router.include_router(
+    jobs_router,
+    prefix="/agent/jobs",
+    tags=["agent"],
+    dependencies=[Depends(get_user_id)]
+)
+
 # Add user_id dependency at the router level for agent endpoints
 api_router.include_router(
     agent_router, 
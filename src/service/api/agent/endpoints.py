@@ -3,17 +3,27 @@
 from typing import AsyncGenerator
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask, BackgroundTasks
 
+from src.service.core.admission import Priority
+from src.service.core.responses import AGENT_RESPONSE, json_response
+from src.service.core.service_metrics import active_streams
+from src.service.core.timing import PhaseTimer
 from src.service.db.session import get_session_factory, SessionFactory
-from src.service.models.api import AgentRequest, AgentResponse
+from src.service.models.api import AgentRequest, AgentResponse, AgentBatchRequest
 from src.service.dependencies.user import get_user_id
 
 from src.service.api.agent.handlers import (
+    authorize_agent_request,
     validate_agent_request,
-    run_agent_query,
-    stream_agent_query
+    admit_agent_request,
+    lock_agent_thread,
+    run_agent_turn,
+    stream_agent_query,
+    validate_agent_batch,
+    run_agent_batch
 )
 
 router = APIRouter()
@@ -23,7 +33,7 @@ async def query_agent(
     agent_request: AgentRequest,
     user_id: UUID = Depends(get_user_id),
     session_factory: SessionFactory = Depends(get_session_factory)
-) -> AgentResponse:
+) -> Response:
     """
     Send a query to the agent and get a complete response.
     
@@ -35,15 +45,11 @@ async def query_agent(
         user_id: ID of the user making the request (from X-User-ID header)
         session_factory: Factory function for database sessions
     """
-    # Validate the request and get the thread object
-    thread = await validate_agent_request(session_factory, agent_request, user_id)
-
-    # Run agent query with the session factory for explicit transaction control
-    return await run_agent_query(
-        session_factory=session_factory,
-        query=agent_request.query,
-        thread=thread
-    )
+    # Check access, lock the thread, load it, wait for capacity, then run and save the turn;
+    # a duplicate of a submission still in flight shares its response
+    timer = PhaseTimer()
+    result = await run_agent_turn(session_factory, agent_request, user_id, Priority.STANDARD, timer)
+    return json_response(AGENT_RESPONSE, result, headers={"Server-Timing": timer.server_timing()})
 
 
 @router.post("/stream")
@@ -63,28 +69,94 @@ async def stream_agent(
         user_id: ID of the user making the request (from X-User-ID header)
         session_factory: Factory function for database sessions
     """
-    # Validate the request and get the thread object
-    thread = await validate_agent_request(session_factory, agent_request, user_id)
+    # Only the thread's owner may wait for its lock
+    timer = PhaseTimer()
+    await authorize_agent_request(session_factory, agent_request, user_id, timer)
+
+    # Wait for capacity before the response starts, so overload is still a plain 503.
+    # Admitted before locking, so a request waiting for capacity holds no thread lock.
+    ticket = await admit_agent_request(user_id, Priority.INTERACTIVE, timer)
+    try:
+        # Wait for other turns on the thread, then load it, so the history includes them
+        lease = await lock_agent_thread(agent_request.thread_id, timer)
+    except BaseException:
+        ticket.release()
+        raise
+    try:
+        # Validate the request and load the thread and its history in one session
+        context = await validate_agent_request(session_factory, agent_request, user_id, timer)
+    except BaseException:
+        ticket.release()
+        await lease.release()
+        raise
     
     async def generate_agent_response_stream() -> AsyncGenerator[str, None]:
         """Generate a stream of agent response chunks as JSON lines."""
         # Stream the agent response
-        async for chunk in stream_agent_query(
-            session_factory=session_factory,
-            query=agent_request.query,
-            thread=thread
-        ):
-            # Convert each chunk to JSON
-            yield f"{chunk.model_dump_json()}\n"
+        active_streams.labels().inc()
+        try:
+            async for chunk in stream_agent_query(
+                session_factory=session_factory,
+                query=agent_request.query,
+                thread=context.thread,
+                message_history=context.message_history,
+                agent_deps=context.agent_deps,
+                timer=context.timer
+            ):
+                # Convert each chunk to JSON
+                yield f"{chunk.model_dump_json()}\n"
+        finally:
+            active_streams.labels().dec()
+            ticket.release()
+            await lease.release()
     
     # Configure stream response with appropriate headers
     return StreamingResponse(
         generate_agent_response_stream(),
         media_type="application/x-ndjson",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Transfer-Encoding": "chunked",
+            # Phases before the first byte; the final timing chunk has the full breakdown
+            "Server-Timing": timer.server_timing(),
+        },
+        # Also frees the slot and the thread if the client disconnects before the stream starts
+        background=BackgroundTasks([BackgroundTask(ticket.release), BackgroundTask(lease.release)]),
+    )
+
+
+@router.post("/batch")
+async def batch_agent(
+    batch_request: AgentBatchRequest,
+    user_id: UUID = Depends(get_user_id),
+    session_factory: SessionFactory = Depends(get_session_factory)
+) -> StreamingResponse:
+    """
+    Run many agent queries concurrently and stream each result as it finishes.
+    
+    Every item is validated, admitted and persisted like a single /query call,
+    at batch priority. A failing item produces a result line with its status
+    code and error instead of failing the batch.
+    
+    Args:
+        batch_request: The queries to run and the requested concurrency
+        user_id: ID of the user making the request (from X-User-ID header)
+        session_factory: Factory function for database sessions
+    """
+    concurrency = validate_agent_batch(batch_request)
+
+    async def generate_batch_results() -> AsyncGenerator[str, None]:
+        """Generate one JSON line per finished item."""
+        async for result in run_agent_batch(session_factory, batch_request.items, user_id, concurrency):
+            yield f"{result.model_dump_json()}\n"
+
+    return StreamingResponse(
+        generate_batch_results(),
+        media_type="application/x-ndjson",
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "Transfer-Encoding": "chunked",
         },
-    ) 
-    
\ No newline at end of file
+    )
@@ -1,34 +1,93 @@
 """Agent request handlers for API endpoints."""
 
-from typing import AsyncGenerator
+import asyncio
+import time
+from typing import AsyncGenerator, List, Optional, Sequence, Tuple, TYPE_CHECKING
 from uuid import UUID
 
 from fastapi import HTTPException, status
+from pydantic_ai.messages import ModelMessage
 from src.service.models.database import Thread
+from src.service.core.admission import AdmissionTicket, Priority, admission_controller
+from src.service.core.thread_locks import ThreadLease, thread_lock_manager, turn_single_flight
+from src.service.core.settings import settings
+from src.service.core.timing import PhaseTimer
 from src.service.db.session import SessionFactory
-from src.service.models.api import AgentRequest, AgentResponse, AgentResponseChunk
+from src.service.models.api import (
+    AgentRequest, AgentResponse, AgentResponseChunk, AgentBatchRequest, AgentBatchItemResult
+)
 from src.service.models.api.stream_models import ErrorChunk, DoneChunk
-from src.service.models.api.errors import ThreadPermissionError, EmptyResponseError, ModelResponseFormatError
+from src.service.models.api.errors import (
+    ThreadPermissionError, EmptyResponseError, ModelResponseFormatError, AdmissionRejectedError, ThreadBusyError
+)
 from src.service.models.database.errors import ThreadNotFoundError
 
+if TYPE_CHECKING:
+    from src.agents.deps import SupportDependencies
+    from src.service.api.agent.operations import AgentRequestContext
+
 import logging
 logger = logging.getLogger(__name__)
 
+async def authorize_agent_request(
+    session_factory: SessionFactory,
+    agent_request: AgentRequest,
+    user_id: UUID,
+    timer: Optional[PhaseTimer] = None
+) -> None:
+    """
+    Check that the user may use the request's thread before the turn takes any of its resources.
+    
+    Runs before the thread lock, so a user cannot hold the lock of someone
+    else's thread. The thread owner cache usually answers without a query.
+    
+    Args:
+        session_factory: Factory function that creates database sessions
+        agent_request: The request containing query and thread_id
+        user_id: The ID of the user making the request
+        timer: Optional per-phase timer receiving the validate phase
+        
+    Raises:
+        HTTPException: 404 for unknown threads, 403 for threads of other users
+    """
+    from src.service.core.utils import verify_thread_access
+
+    try:
+        async with session_factory() as db:
+            with (timer or PhaseTimer()).phase("validate"):
+                await verify_thread_access(db, agent_request.thread_id, user_id, cached=True)
+    except ThreadNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ThreadPermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+
 async def validate_agent_request(
     session_factory: SessionFactory,
     agent_request: AgentRequest, 
-    user_id: UUID
-) -> Thread:
+    user_id: UUID,
+    timer: Optional[PhaseTimer] = None
+) -> "AgentRequestContext":
     """
-    Validate the agent request and load the thread.
+    Validate the agent request and load the thread, its message history and the agent dependencies.
+    
+    Access check and history load share one session, which is closed again
+    before the agent runs so no connection is held during the model call.
+    The dependencies are prepared while the history loads.
     
     Args:
         session_factory: Factory function that creates database sessions
         agent_request: The request containing query and thread_id
         user_id: The ID of the user making the request
+        timer: Optional per-phase timer, created if omitted
     
     Returns:
-        The ThreadResponse API model
+        The request context with the thread, history, dependencies and phase timer
         
     Raises:
         HTTPException: For invalid requests or unauthorized access
@@ -36,9 +95,8 @@ async def validate_agent_request(
 
 
     try:
-        async with session_factory() as db:
-            from src.service.core.utils import verify_thread_access
-            return await verify_thread_access(db, agent_request.thread_id, user_id)
+        from src.service.api.agent.operations import load_agent_context
+        return await load_agent_context(session_factory, agent_request.thread_id, user_id, timer)
     except ThreadNotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -55,10 +113,128 @@ async def validate_agent_request(
             detail=str(e)
         )   
 
+async def admit_agent_request(
+    user_id: UUID,
+    priority: Priority,
+    timer: Optional[PhaseTimer] = None
+) -> AdmissionTicket:
+    """
+    Wait for capacity to run an agent request.
+    
+    Args:
+        user_id: The ID of the user making the request
+        priority: Queue priority of the request
+        timer: Optional per-phase timer receiving the queue phase
+    
+    Returns:
+        Ticket to release once the agent run has finished
+        
+    Raises:
+        HTTPException: 503 with a Retry-After header when the service is at capacity
+    """
+    try:
+        if timer is None:
+            return await admission_controller.acquire(user_id, priority)
+        with timer.phase("queue"):
+            return await admission_controller.acquire(user_id, priority)
+    except AdmissionRejectedError as e:
+        logger.warning(f"Rejected agent request from user {user_id}: {e.message}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+async def lock_agent_thread(
+    thread_id: UUID,
+    timer: Optional[PhaseTimer] = None
+) -> ThreadLease:
+    """
+    Wait until no other turn runs on the thread.
+    
+    Args:
+        thread_id: ID of the thread
+        timer: Optional per-phase timer receiving the lock phase
+    
+    Returns:
+        Lease to release once the turn's messages have been saved
+        
+    Raises:
+        HTTPException: 409 with a Retry-After header when the thread stays busy
+    """
+    try:
+        if timer is None:
+            return await thread_lock_manager.acquire(thread_id)
+        with timer.phase("lock"):
+            return await thread_lock_manager.acquire(thread_id)
+    except ThreadBusyError as e:
+        logger.warning(f"Thread {thread_id} stayed busy: {e.message}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+async def run_agent_turn(
+    session_factory: SessionFactory,
+    agent_request: AgentRequest,
+    user_id: UUID,
+    priority: Priority,
+    timer: Optional[PhaseTimer] = None
+) -> AgentResponse:
+    """
+    Run one complete agent turn: check access, wait for capacity, lock the thread, load it, run and save.
+    
+    A submission identical to one still in flight (same user, thread and
+    query) does not run again; it waits for the first one and gets the same
+    response or error. Its timer then reports the phases of the first one.
+    
+    Args:
+        session_factory: Factory function that creates database sessions
+        agent_request: The query and thread_id of the turn
+        user_id: The ID of the user making the request
+        priority: Admission priority of the turn
+        timer: Optional per-phase timer, created if omitted
+    
+    Returns:
+        Agent response with thread_id, response text, and message_id
+        
+    Raises:
+        HTTPException: For invalid requests, busy threads, overload and agent errors
+    """
+    timer = timer or PhaseTimer()
+
+    async def run_locked_turn() -> Tuple[AgentResponse, PhaseTimer]:
+        await authorize_agent_request(session_factory, agent_request, user_id, timer)
+        # Admitted before locking, so a turn waiting for capacity holds no thread lock
+        async with await admit_agent_request(user_id, priority, timer):
+            async with await lock_agent_thread(agent_request.thread_id, timer):
+                # History is loaded under the lock so it includes the previous turn
+                context = await validate_agent_request(session_factory, agent_request, user_id, timer)
+                response = await run_agent_query(
+                    session_factory=session_factory,
+                    query=agent_request.query,
+                    thread=context.thread,
+                    message_history=context.message_history,
+                    agent_deps=context.agent_deps,
+                    timer=timer
+                )
+        return response, timer
+
+    key = (str(user_id), str(agent_request.thread_id), agent_request.query.strip())
+    response, turn_timer = await turn_single_flight.do(key, run_locked_turn)
+    if turn_timer is not timer:
+        # A duplicate submission shares the first one's turn, and its phases
+        timer.phases.update(turn_timer.phases)
+    return response
+
 async def run_agent_query(
     session_factory: SessionFactory,
     query: str,
-    thread: Thread
+    thread: Thread,
+    message_history: Optional[Sequence[ModelMessage]] = None,
+    agent_deps: Optional["SupportDependencies"] = None,
+    timer: Optional[PhaseTimer] = None
 ) -> AgentResponse:
     """
     Run an agent query and get a complete response.
@@ -67,6 +243,9 @@ async def run_agent_query(
         session_factory: Factory function that creates database sessions
         query: User query text
         thread: The ThreadResponse API model to query
+        message_history: History already loaded for the thread, if any
+        agent_deps: Dependencies already prepared for the thread, if any
+        timer: Optional per-phase timer for the request
         
     Returns:
         Agent response with thread_id, response text, and message_id
@@ -80,7 +259,10 @@ async def run_agent_query(
         return await run_agent_query(
             session_factory=session_factory, 
             query=query, 
-            thread=thread
+            thread=thread,
+            message_history=message_history,
+            agent_deps=agent_deps,
+            timer=timer
         )
     except EmptyResponseError as e:
         logger.error(f"Empty response error: {str(e)}")
@@ -111,7 +293,10 @@ async def run_agent_query(
 async def stream_agent_query(
     session_factory: SessionFactory,
     query: str,
-    thread: Thread
+    thread: Thread,
+    message_history: Optional[Sequence[ModelMessage]] = None,
+    agent_deps: Optional["SupportDependencies"] = None,
+    timer: Optional[PhaseTimer] = None
 ) -> AsyncGenerator[AgentResponseChunk, None]:
     """
     Stream an agent query response chunk by chunk.
@@ -120,6 +305,9 @@ async def stream_agent_query(
         session_factory: Factory function that creates database sessions
         query: User query text
         thread: The Thread model to query
+        message_history: History already loaded for the thread, if any
+        agent_deps: Dependencies already prepared for the thread, if any
+        timer: Optional per-phase timer for the request
         
     Yields:
         Agent response chunks for streaming
@@ -133,7 +321,10 @@ async def stream_agent_query(
         async for chunk in stream_agent_query(
             session_factory=session_factory, 
             query=query, 
-            thread=thread
+            thread=thread,
+            message_history=message_history,
+            agent_deps=agent_deps,
+            timer=timer
         ):
             yield chunk
     except ThreadNotFoundError as e:
@@ -152,4 +343,98 @@ async def stream_agent_query(
         yield ErrorChunk(error="SYSTEM_ERROR", error_type=f"Unexpected error: {str(e)}")
     
     # Send a done event to end the stream properly
-    yield DoneChunk() 
\ No newline at end of file
+    yield DoneChunk()
+
+def validate_agent_batch(batch_request: AgentBatchRequest) -> int:
+    """
+    Validate a batch agent request and work out its concurrency.
+    
+    Args:
+        batch_request: The batch of agent requests
+    
+    Returns:
+        Number of items to run at once
+        
+    Raises:
+        HTTPException: If the batch has too many items
+    """
+    if len(batch_request.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {settings.BATCH_MAX_ITEMS} items"
+        )
+    concurrency = min(batch_request.concurrency or settings.BATCH_MAX_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY)
+    if settings.ADMISSION_MAX_PER_USER > 0:
+        # Items beyond the per-user limit would only wait in the admission queue
+        concurrency = min(concurrency, settings.ADMISSION_MAX_PER_USER)
+    return concurrency
+
+async def run_agent_batch_item(
+    session_factory: SessionFactory,
+    index: int,
+    agent_request: AgentRequest,
+    user_id: UUID
+) -> AgentBatchItemResult:
+    """
+    Run one item of a batch exactly like a single agent query, at batch priority.
+    
+    Args:
+        session_factory: Factory function that creates database sessions
+        index: Position of the item in the batch
+        agent_request: The item's query and thread_id
+        user_id: The ID of the user making the request
+    
+    Returns:
+        The item's response, or the status code and detail of its error
+    """
+    start = time.perf_counter()
+    try:
+        response = await run_agent_turn(session_factory, agent_request, user_id, Priority.BATCH)
+        result_status, error = status.HTTP_200_OK, None
+    except HTTPException as e:
+        response, result_status, error = None, e.status_code, str(e.detail)
+
+    return AgentBatchItemResult(
+        index=index,
+        thread_id=agent_request.thread_id,
+        status_code=result_status,
+        response=response,
+        error=error,
+        duration_ms=(time.perf_counter() - start) * 1000
+    )
+
+async def run_agent_batch(
+    session_factory: SessionFactory,
+    items: List[AgentRequest],
+    user_id: UUID,
+    concurrency: int
+) -> AsyncGenerator[AgentBatchItemResult, None]:
+    """
+    Run batch items concurrently and yield each result as soon as it is ready.
+    
+    Items start in request order. If the consumer stops early, for example
+    because the client disconnected, the items still running are cancelled.
+    
+    Args:
+        session_factory: Factory function that creates database sessions
+        items: The batch items
+        user_id: The ID of the user making the request
+        concurrency: Maximum number of items running at once
+        
+    Yields:
+        Item results in completion order
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_item(index: int, agent_request: AgentRequest) -> AgentBatchItemResult:
+        async with semaphore:
+            return await run_agent_batch_item(session_factory, index, agent_request, user_id)
+
+    tasks = [asyncio.create_task(run_item(index, item)) for index, item in enumerate(items)]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
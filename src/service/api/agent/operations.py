@@ -1,19 +1,37 @@
 """Core agent operations for Pydantic-AI integration."""
 
 from __future__ import annotations
+import asyncio
 import json
+import logging
 
-from typing import Optional, AsyncGenerator, List, Sequence
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, AsyncGenerator, List, Sequence, Tuple
 from uuid import UUID, uuid4
 
 from pydantic import ValidationError
+from pydantic_ai import Agent
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic_ai.messages import (
     ModelResponse, ModelMessagesTypeAdapter, 
-    ModelRequest, UserPromptPart, SystemPromptPart, ModelMessage
+    ModelRequest, UserPromptPart, SystemPromptPart, ModelMessage, ToolCallPart,
+    ToolReturnPart, FunctionToolCallEvent, FunctionToolResultEvent
 )
+from pydantic_ai.result import AgentStream
+from pydantic_ai.usage import Usage
 
+from src.common.stats import HitRateStats
+from src.service.core.agent_registry import agent_registry
+from src.service.core.prompt_layout import prompt_cache_stats
+from src.service.core.response_cache import response_cache
+from src.service.core.service_metrics import (
+    agent_model_duration, agent_run_duration, agent_run_tokens, agent_runs, agent_tool_duration
+)
+from src.service.core.settings import settings
+from src.service.core.timing import PhaseTimer
 from src.service.core.utils import ensure_awaited, db_to_api_message, ensure_uuid
 from src.service.db.session import SessionFactory
+from src.service.db.usage import create_agent_run
 from src.service.db.database import (
     create_message, 
     get_model_messages_by_thread, 
@@ -23,17 +41,101 @@ from src.service.models.api.errors import (
     EmptyResponseError,
     AgentTypeError,
 )
-from src.service.models.api.internal import AgentType
+from src.service.models.api.internal import AgentRunCreate, AgentType
 from src.service.models.api.message_models import MessageResponse
 from src.service.models.api import (
     MessageRole, MessageCreate, 
     AgentResponseChunk, MessageCreatedChunk, 
-    MessageStartedChunk, TextDeltaChunk, MessageCompleteChunk,
+    MessageStartedChunk, TextDeltaChunk, MessageCompleteChunk, TimingChunk,
+    ToolStartedChunk, ToolFinishedChunk,
     StreamMessageInfo, AgentResponse, 
 )
 from src.service.models.database import Message, Thread
-from src.agents.bank_support import support_agent
-from src.agents.deps import SupportDependencies, DatabaseConn
+from src.agents.deps import SupportDependencies, DatabaseConn, DatabaseCache, CachingDatabaseConn
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class AgentRequestContext:
+    """
+    State loaded once per agent request and handed to every later phase.
+    
+    Attributes:
+        thread: The thread the user is allowed to query
+        message_history: Conversation history of the thread for the agent
+        agent_deps: Agent dependencies with the customer profile prefetched
+        timer: Per-phase timing of the request
+    """
+    thread: Thread
+    message_history: List[ModelMessage]
+    agent_deps: Optional[SupportDependencies] = None
+    timer: Optional[PhaseTimer] = None
+
+
+async def load_agent_context(
+    session_factory: SessionFactory,
+    thread_id: UUID,
+    user_id: UUID,
+    timer: Optional[PhaseTimer] = None
+) -> AgentRequestContext:
+    """
+    Verify thread access, then load the history and prepare the agent dependencies concurrently.
+    
+    Validation runs first because it decides whether anything else may run.
+    Loading and decoding the history then overlaps with building the agent
+    dependencies and prefetching the customer profile, which the system
+    prompt would otherwise fetch only once the model run has started. The
+    session is closed before returning, so its connection and read
+    transaction are released before the model is called.
+    
+    Args:
+        session_factory: Factory function to create database sessions
+        thread_id: ID of the thread to query
+        user_id: ID of the user making the request
+        timer: Optional timer receiving the validate, history, history_decode, deps and system_prompt phases
+        
+    Returns:
+        AgentRequestContext with the thread, its message history and dependencies
+        
+    Raises:
+        ThreadNotFoundError: If the thread doesn't exist
+        ThreadPermissionError: If the user doesn't have permission
+    """
+    from src.service.core.utils import verify_thread_access
+
+    timer = timer or PhaseTimer()
+
+    async def prepare_dependencies(thread: Thread) -> Optional[SupportDependencies]:
+        with timer.phase("deps"):
+            try:
+                agent_type, _ = _select_agent(thread)
+            except AgentTypeError:
+                # Reported by the agent run itself
+                return None
+            agent_deps = create_agent_dependencies(thread.user_id, agent_type)
+            # The customer profile the system prompt reads, fetched before the run needs it
+            with timer.phase("system_prompt"):
+                await agent_deps.prefetch()
+            return agent_deps
+
+    async def load_history(db: AsyncSession, thread: Thread) -> Sequence[ModelMessage]:
+        with timer.phase("history"):
+            return await get_model_messages_by_thread(db, ensure_uuid(thread.id), timer)
+
+    async with session_factory() as db:
+        with timer.phase("validate"):
+            thread = await verify_thread_access(db, thread_id, user_id, cached=True)
+        message_history, agent_deps = await asyncio.gather(
+            load_history(db, thread),
+            prepare_dependencies(thread),
+        )
+
+    return AgentRequestContext(
+        thread=thread,
+        message_history=list(message_history),
+        agent_deps=agent_deps,
+        timer=timer,
+    )
 
 async def _prepare_agent_messages(
     thread_id: UUID,
@@ -99,7 +201,8 @@ async def save_agent_messages(
     session_factory: SessionFactory,
     thread_id: UUID,
     model_messages: List[ModelMessage],
-    assistant_message_id: Optional[UUID] = None
+    assistant_message_id: Optional[UUID] = None,
+    run: Optional[AgentRunCreate] = None
 ) -> MessageResponse:
     """
     Save messages from agent result to database using batch operations.
@@ -110,6 +213,7 @@ async def save_agent_messages(
         model_messages: List of ModelMessage objects from agent.new_messages()
         assistant_message_id: Optional pre-generated UUID for the assistant message
                              (used in streaming to match the ID clients are receiving chunks for)
+        run: Optional usage of the run, recorded in the same transaction as the messages
         
     Returns:
         MessageResponse containing the last message added to database
@@ -138,6 +242,8 @@ async def save_agent_messages(
                 async with db.begin():
                     responses = await create_messages_batch(db, thread_id, message_batch_data)
                     logger.info(f"Created {len(responses)} messages in database")
+                    if run is not None and responses:
+                        await create_agent_run(db, run, message_id=ensure_uuid(responses[-1].id))
 
         # Return info about the last message
         last_message = responses[-1] if responses else None
@@ -195,10 +301,45 @@ async def store_user_message_on_error(
         pass
 
 
-# Agent mapping for easy dispatch based on agent_type, right now only bank support
-AGENT_MAP = {
-    AgentType.BANK_SUPPORT.value: support_agent
-}
+def _select_agent(thread: Thread) -> Tuple[AgentType, Agent[Any, Any]]:
+    """
+    Resolve the agent serving a thread from the agent registry.
+    
+    Args:
+        thread: The thread to resolve the agent for
+        
+    Returns:
+        The thread's agent type and the agent serving it
+        
+    Raises:
+        AgentTypeError: If thread has no valid agent type or type isn't supported
+    """
+    # Validate that agent_type exists
+    if not thread.agent_type:
+        raise AgentTypeError("Thread must have a valid agent_type")
+        
+    agent_type = thread.agent_type
+    if isinstance(agent_type, str):
+        agent_type = AgentType(agent_type)
+        
+    return agent_type, agent_registry.get(agent_type)
+
+# Hit-rate counters aggregated over every agent data cache, whatever its scope
+deps_cache_stats = HitRateStats()
+
+# Agent data cache shared by all requests when DEPS_CACHE_SCOPE is "customer"
+customer_data_cache = DatabaseCache(max_entries=settings.DEPS_CACHE_MAX_ENTRIES, stats=deps_cache_stats)
+
+
+def _create_database_conn() -> DatabaseConn:
+    """Create the bank database connection, wrapped in the configured cache scope."""
+    backend = DatabaseConn()
+    if settings.DEPS_CACHE_SCOPE == "customer":
+        return CachingDatabaseConn(backend, cache=customer_data_cache)
+    if settings.DEPS_CACHE_SCOPE == "request":
+        return CachingDatabaseConn(backend, cache=DatabaseCache(stats=deps_cache_stats))
+    return backend
+
 
 # Create agent dependencies for running the agent
 def create_agent_dependencies(user_id: UUID, agent_type: AgentType) -> SupportDependencies:
@@ -216,15 +357,175 @@ def create_agent_dependencies(user_id: UUID, agent_type: AgentType) -> SupportDe
         # For bank support agent, create a synthetic customer ID from user_id
         # and a mock database connection
         customer_id = int(str(user_id).replace('-', '')[:8], 16) % 10000  # Convert part of UUID to int
-        return SupportDependencies(customer_id=customer_id, db=DatabaseConn())
+        return SupportDependencies(customer_id=customer_id, db=_create_database_conn())
     
     # Default case shouldn't happen as we check agent type earlier
     raise ValueError(f"Unsupported agent type: {agent_type}")
 
+def _observe_agent_run(
+    agent_type: AgentType,
+    usage: Optional[Usage],
+    cached_tokens: int,
+    timer: PhaseTimer,
+    streamed: bool
+) -> None:
+    """Record a run's latency and tokens in the agent run metrics."""
+    labels = (agent_type.value, str(streamed).lower())
+    agent_runs.labels(agent_type.value, str(usage is None).lower()).inc()
+    agent_run_duration.labels(*labels).observe(timer.elapsed())
+    if usage is None:
+        return
+    agent_model_duration.labels(*labels).observe(timer.phases.get("model", 0.0))
+    agent_run_tokens.labels(agent_type.value, "input").observe(usage.request_tokens or 0)
+    agent_run_tokens.labels(agent_type.value, "output").observe(usage.response_tokens or 0)
+    agent_run_tokens.labels(agent_type.value, "cached").observe(cached_tokens)
+
+def _build_agent_run(
+    thread: Thread,
+    agent_type: AgentType,
+    messages: List[ModelMessage],
+    usage: Optional[Usage],
+    timer: PhaseTimer,
+    streamed: bool = False
+) -> Optional[AgentRunCreate]:
+    """
+    Collect the token usage and latency of a run for the agent_runs table.
+    
+    Args:
+        thread: The thread the run answered on
+        agent_type: Type of the agent that ran
+        messages: The run's new messages
+        usage: Usage reported for the run, or None if it was answered from the response cache
+        timer: Timer of the request, holding the model phase
+        streamed: Whether the answer was streamed
+        
+    Returns:
+        The run's usage, or None when usage tracking is disabled
+    """
+    cached_tokens = 0
+    if usage is not None:
+        cached_tokens = prompt_cache_stats.observe(usage)
+        logger.info(f"Agent run for thread {thread.id} sent {usage.request_tokens or 0} input tokens, {cached_tokens} cached")
+    if settings.METRICS_ENABLED:
+        _observe_agent_run(agent_type, usage, cached_tokens, timer, streamed)
+    if not settings.USAGE_TRACKING_ENABLED:
+        return None
+
+    cached_response = usage is None
+    usage = usage or Usage(requests=0)
+    responses = [message for message in messages if isinstance(message, ModelResponse)]
+    # Output tool calls deliver the answer; only the agent's own tools count as tool calls
+    tool_names = agent_registry.tool_names(agent_type)
+    tool_calls = sum(
+        1
+        for response in responses
+        for part in response.parts
+        if isinstance(part, ToolCallPart) and part.tool_name in tool_names
+    )
+    return AgentRunCreate(
+        thread_id=ensure_uuid(thread.id),
+        user_id=ensure_uuid(thread.user_id),
+        agent_type=agent_type,
+        model_name=responses[-1].model_name if responses else None,
+        streamed=streamed,
+        cached_response=cached_response,
+        requests=usage.requests,
+        request_tokens=usage.request_tokens or 0,
+        response_tokens=usage.response_tokens or 0,
+        total_tokens=usage.total_tokens or 0,
+        cached_tokens=cached_tokens,
+        tool_calls=tool_calls,
+        model_seconds=timer.phases.get("model", 0.0),
+        total_seconds=timer.elapsed(),
+    )
+
+async def _stream_output(
+    request_stream: AgentStream[Any, Any]
+) -> AsyncGenerator[Any, None]:
+    """
+    Stream the validated output of a model request that carries the agent's output.
+    
+    Requests that only call tools yield nothing. Partial output that does not
+    validate yet ends the request's stream without failing the run: the agent
+    validates the complete response itself and asks the model to retry if needed.
+    
+    Args:
+        request_stream: Stream of a model request node
+        
+    Yields:
+        The output validated so far, the complete output last
+    """
+    # Without debouncing the stream is read in this task, so stopping early leaves it intact
+    try:
+        async for output in request_stream.stream_output(debounce_by=None):
+            yield output
+    except ValidationError:
+        return
+
+def _tool_event_chunk(
+    event: Any,
+    tool_calls: Dict[str, Tuple[str, float]],
+    message_id: UUID,
+    agent_type: AgentType,
+    timer: PhaseTimer
+) -> Optional[AgentResponseChunk]:
+    """
+    Turn an event of a call-tools node into a tool progress chunk.
+    
+    Tools of one response run concurrently, so results are paired with their
+    calls by call ID. A result without a recorded call is reported without a
+    duration.
+    
+    Args:
+        event: Event of the node's stream
+        tool_calls: Name and start time of the running calls by call ID, updated in place
+        message_id: ID of the message being generated
+        agent_type: Type of the running agent, for the tool metrics
+        timer: Timer receiving the tool.<name> phases
+        
+    Returns:
+        The chunk to send, or None for other events
+    """
+    if isinstance(event, FunctionToolCallEvent):
+        tool_calls[event.call_id] = (event.part.tool_name, timer.elapsed())
+        return ToolStartedChunk(
+            message_id=message_id,
+            tool_call_id=event.call_id,
+            tool_name=event.part.tool_name
+        )
+    if not isinstance(event, FunctionToolResultEvent):
+        return None
+
+    succeeded = isinstance(event.result, ToolReturnPart)
+    call = tool_calls.pop(event.tool_call_id, None)
+    if call is None:
+        return ToolFinishedChunk(
+            message_id=message_id,
+            tool_call_id=event.tool_call_id,
+            tool_name=event.result.tool_name or "",
+            succeeded=succeeded
+        )
+
+    tool_name, started = call
+    seconds = timer.elapsed() - started
+    timer.record(f"tool.{tool_name}", seconds)
+    if settings.METRICS_ENABLED:
+        agent_tool_duration.labels(agent_type.value, tool_name, "ok" if succeeded else "retry").observe(seconds)
+    return ToolFinishedChunk(
+        message_id=message_id,
+        tool_call_id=event.tool_call_id,
+        tool_name=tool_name,
+        duration_ms=round(seconds * 1000, 1),
+        succeeded=succeeded
+    )
+
 async def run_agent_query(
     session_factory: SessionFactory,
     query: str,
-    thread: Thread
+    thread: Thread,
+    message_history: Optional[Sequence[ModelMessage]] = None,
+    agent_deps: Optional[SupportDependencies] = None,
+    timer: Optional[PhaseTimer] = None
 ) -> AgentResponse:
     """
     Run a query through the Pydantic-AI agent.
@@ -233,6 +534,10 @@ async def run_agent_query(
         session_factory: Factory function to create database sessions
         query: The user's query
         thread: The thread to use for the query
+        message_history: History already loaded for the thread; loaded here if omitted
+        agent_deps: Dependencies already prepared for the thread; created here if omitted
+        timer: Optional timer receiving the model and persist phases; output validation
+            happens inside the run and counts as model time
         
     Returns:
         AgentResponse with thread information and agent response
@@ -244,59 +549,77 @@ async def run_agent_query(
         ValueError: For other agent-specific errors
     """
     
-    # Load message history using a read-only session
-    async with session_factory() as db:
-        message_history = await get_model_messages_by_thread(db, ensure_uuid(thread.id))
+    timer = timer or PhaseTimer()
 
-    # Validate that agent_type exists
-    if not thread.agent_type:
-        raise AgentTypeError("Thread must have a valid agent_type")
-        
-    # Get agent for the specified type
-    agent_type = thread.agent_type
-    if isinstance(agent_type, str):
-        agent_type = AgentType(agent_type)
-        
-    agent_type_str = agent_type.value
-    selected_agent = AGENT_MAP.get(agent_type_str)
-    
-    # If agent type isn't supported, raise an error
-    if not selected_agent:
-        raise AgentTypeError(f"Unsupported agent type: {agent_type_str}")
+    # Load message history using a read-only session unless the caller already did
+    if message_history is None:
+        with timer.phase("history"):
+            async with session_factory() as db:
+                message_history = await get_model_messages_by_thread(db, ensure_uuid(thread.id), timer)
 
-    # Create agent dependencies
-    agent_deps = create_agent_dependencies(thread.user_id, agent_type)
+    # Get agent for the thread's agent type
+    agent_type, selected_agent = _select_agent(thread)
 
-    # Run the agent query with dependencies
-    agent_result = await selected_agent.run(
-        query, 
-        message_history=list(message_history),
-        deps=agent_deps
-    )
+    # Create agent dependencies unless the caller already did
+    if agent_deps is None:
+        with timer.phase("deps"):
+            agent_deps = create_agent_dependencies(thread.user_id, agent_type)
+
+    # Answer repeated queries with identical context from the response cache
+    cache_key = None
+    cached = None
+    if settings.RESPONSE_CACHE_ENABLED:
+        cache_key = await response_cache.make_key(agent_type, query, message_history, agent_deps)
+        if cache_key:
+            cached = response_cache.get(cache_key, query)
+
+    usage: Optional[Usage] = None
+    if cached:
+        output = cached.output
+        new_messages = cached.messages
+    else:
+        # Run the agent query with dependencies
+        with timer.phase("model"):
+            agent_result = await selected_agent.run(
+                query, 
+                message_history=list(message_history),
+                deps=agent_deps,
+                model=agent_registry.model_for(agent_type)
+            )
 
-    # Get new messages with simplified coroutine handling
-    new_messages = await ensure_awaited(agent_result.new_messages())
-    print(f"New messages: {new_messages}")
-    print(f"Output: {agent_result.output}")
+        # Get new messages with simplified coroutine handling
+        new_messages = await ensure_awaited(agent_result.new_messages())
+        output = agent_result.output
+        usage = agent_result.usage()
+
+        if cache_key:
+            response_cache.put(cache_key, agent_type, output, new_messages)
     
-    # Store all new messages from the agent result
-    result_message = await save_agent_messages(
-        session_factory=session_factory, 
-        thread_id=ensure_uuid(thread.id), 
-        model_messages=new_messages,
-    )
+    # Store all new messages with the run's usage, cached answers are persisted like any other turn
+    run = _build_agent_run(thread, agent_type, new_messages, usage, timer)
+    with timer.phase("persist"):
+        result_message = await save_agent_messages(
+            session_factory=session_factory, 
+            thread_id=ensure_uuid(thread.id), 
+            model_messages=new_messages,
+            run=run,
+        )
+    logger.info(f"Agent turn timings for thread {thread.id}: {timer.summary()}")
 
     # Return response with the last message ID
     return AgentResponse(
         thread_id=result_message.thread_id,
         message_id=result_message.id,
-        response=json.dumps(agent_result.output)
+        response=json.dumps(output)
     )
 
 async def stream_agent_query(
     session_factory: SessionFactory,
     query: str,
-    thread: Thread
+    thread: Thread,
+    message_history: Optional[Sequence[ModelMessage]] = None,
+    agent_deps: Optional[SupportDependencies] = None,
+    timer: Optional[PhaseTimer] = None
 ) -> AsyncGenerator[AgentResponseChunk, None]:
     """
     Stream a query through the Pydantic-AI agent, yielding chunks as they're generated.
@@ -305,9 +628,13 @@ async def stream_agent_query(
         session_factory: Factory function to create database sessions
         query: The user's query
         thread: The thread model to use for the query
+        message_history: History already loaded for the thread; loaded here if omitted
+        agent_deps: Dependencies already prepared for the thread; created here if omitted
+        timer: Optional timer receiving the model, first_token, tool.<name> and persist phases
         
     Yields:
-        AgentResponseChunk objects with data as they're generated
+        AgentResponseChunk objects with data as they're generated, including
+        tool_started and tool_finished events while the agent's tools run
         
     Raises:
         EmptyResponseError: If agent produces empty response
@@ -316,21 +643,8 @@ async def stream_agent_query(
         ValueError: For other agent-specific errors
     """
     
-    # Validate that agent_type exists
-    if not thread.agent_type:
-        raise AgentTypeError("Thread must have a valid agent_type")
-        
-    # Get agent for the specified type
-    agent_type = thread.agent_type
-    if isinstance(agent_type, str):
-        agent_type = AgentType(agent_type)
-        
-    agent_type_str = agent_type.value
-    selected_agent = AGENT_MAP.get(agent_type_str)
-    
-    # If agent type isn't supported, raise an error
-    if not selected_agent:
-        raise AgentTypeError(f"Unsupported agent type: {agent_type_str}")
+    # Get agent for the thread's agent type
+    agent_type, selected_agent = _select_agent(thread)
     
     # Pre-generate UUIDs that will be used for messages
     user_message_id = uuid4()
@@ -339,48 +653,81 @@ async def stream_agent_query(
     # Send user message creation event to the client (UI only, not stored yet)
     yield MessageCreatedChunk(message=StreamMessageInfo(id=user_message_id, role=MessageRole.USER))
     
-    # Load message history using a read-only session
-    async with session_factory() as db:
-        message_history = await get_model_messages_by_thread(db, ensure_uuid(thread.id))
+    timer = timer or PhaseTimer()
+
+    # Load message history using a read-only session unless the caller already did
+    if message_history is None:
+        with timer.phase("history"):
+            async with session_factory() as db:
+                message_history = await get_model_messages_by_thread(db, ensure_uuid(thread.id), timer)
 
     # Tell the client we're starting to generate the assistant's message
     yield MessageStartedChunk(message_id=assistant_message_id)
 
-    # Create agent dependencies
-    agent_deps = create_agent_dependencies(thread.user_id, agent_type)
+    # Create agent dependencies unless the caller already did
+    if agent_deps is None:
+        with timer.phase("deps"):
+            agent_deps = create_agent_dependencies(thread.user_id, agent_type)
 
+    model_started = timer.elapsed()
     try:
-        # Use run_stream method instead of stream
-        async with selected_agent.run_stream(
+        # Walk the agent graph node by node so tool calls can be reported as they happen
+        async with selected_agent.iter(
             query, 
             message_history=list(message_history),
-            deps=agent_deps
-        ) as result:
-            # Stream tokens as they come with debounce
-            async for message, last in result.stream_structured(debounce_by=0.000001):
-                try:
-                    profile = await result.validate_structured_output(  
-                        message,
-                        allow_partial=not last,
-                    )
-
-                    yield TextDeltaChunk(message_id=assistant_message_id, token=json.dumps(profile))
-                except ValidationError:
-                    continue
-                
+            deps=agent_deps,
+            model=agent_registry.model_for(agent_type)
+        ) as agent_run:
+            tool_calls: Dict[str, Tuple[str, float]] = {}
+            streamed_output = None
+            async for node in agent_run:
+                if Agent.is_model_request_node(node):
+                    # Stream the validated output as it grows
+                    async with node.stream(agent_run.ctx) as request_stream:
+                        async for output in _stream_output(request_stream):
+                            streamed_output = json.dumps(output)
+                            timer.mark("first_token")
+                            yield TextDeltaChunk(message_id=assistant_message_id, token=streamed_output)
+                elif Agent.is_call_tools_node(node):
+                    async with node.stream(agent_run.ctx) as tool_stream:
+                        async for event in tool_stream:
+                            chunk = _tool_event_chunk(event, tool_calls, assistant_message_id, agent_type, timer)
+                            if chunk is not None:
+                                yield chunk
+
+            result = agent_run.result
+            if result is None:
+                # The run ended without reaching its end node
+                raise EmptyResponseError("Agent run ended without a result")
+
+            # Send the final output if a partial one that did not validate ended its stream early
+            final_output = json.dumps(result.output)
+            if final_output != streamed_output:
+                timer.mark("first_token")
+                yield TextDeltaChunk(message_id=assistant_message_id, token=final_output)
+
+            # Tool phases overlap the model phase, which covers the whole agent run and its output validation
+            timer.record("model", timer.elapsed() - model_started)
 
             # Store all messages at once with explicit transaction
             # Use our utility function to handle possible coroutines
             messages = await ensure_awaited(result.new_messages())
-            await save_agent_messages(
-                session_factory=session_factory,
-                thread_id=ensure_uuid(thread.id),
-                model_messages=messages,
-                assistant_message_id=assistant_message_id
+            run = _build_agent_run(
+                thread, agent_type, messages, result.usage(), timer, streamed=True
             )
+            with timer.phase("persist"):
+                await save_agent_messages(
+                    session_factory=session_factory,
+                    thread_id=ensure_uuid(thread.id),
+                    model_messages=messages,
+                    assistant_message_id=assistant_message_id,
+                    run=run
+                )
+            logger.info(f"Agent stream timings for thread {thread.id}: {timer.summary()}")
 
-            # Signal completion to the client
+            # Signal completion to the client, then report where the time went
             yield MessageCompleteChunk(message_id=assistant_message_id)
+            yield TimingChunk(phases=timer.as_dict())
     except Exception:
         # Store the user message regardless of the exception type
         await store_user_message_on_error(
@@ -0,0 +1,29 @@
+"""Archive API endpoints."""
+
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Query, status
+
+from src.service.api.archive.handlers import run_archive_job, get_archive_stats
+
+router = APIRouter()
+
+@router.get("/stats", response_model=Dict[str, Any], status_code=status.HTTP_200_OK)
+async def archive_stats() -> Dict[str, Any]:
+    """
+    Report hot-set size, archive size and restore latency metrics.
+    """
+    return await get_archive_stats()
+
+
+@router.post("/run", response_model=Dict[str, Any], status_code=status.HTTP_200_OK)
+async def run_archive(
+    idle_days: Optional[int] = Query(default=None, ge=0, description="Override the idle threshold in days")
+) -> Dict[str, Any]:
+    """
+    Move threads idle for longer than the threshold into the archive.
+    
+    Args:
+        idle_days: Optional idle threshold overriding ARCHIVE_IDLE_DAYS
+    """
+    return await run_archive_job(idle_days)
@@ -0,0 +1,51 @@
+"""Archive request handlers for API endpoints."""
+
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+async def run_archive_job(
+    idle_days: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Run the archival job once.
+    
+    Args:
+        idle_days: Optional idle threshold overriding ARCHIVE_IDLE_DAYS
+        
+    Returns:
+        Number of archived threads and the resulting archive report
+    """
+    from src.service.db.archive import archive_idle_threads, get_archive_report
+
+    try:
+        archived = await archive_idle_threads(idle_days=idle_days)
+        return {"archived_threads": archived, "report": await get_archive_report()}
+    except Exception as e:
+        logger.error(f"Archival job failed: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Archival job failed: {str(e)}"
+        )
+
+
+async def get_archive_stats() -> Dict[str, Any]:
+    """
+    Get hot-set size, archive size and restore latency metrics.
+    
+    Returns:
+        The archive report
+    """
+    from src.service.db.archive import get_archive_report
+
+    try:
+        return await get_archive_report()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
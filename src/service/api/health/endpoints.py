@@ -1,13 +1,48 @@
 """Health check API endpoints."""
 
 from datetime import datetime, timezone
+import os
 import socket
+import time
 from typing import Dict, Any
 
 from fastapi import APIRouter, status
 
+from src.service.api.agent.operations import deps_cache_stats
+from src.service.api.jobs.operations import job_worker_pool
+from src.service.core.admission import admission_controller
+from src.service.core.agent_registry import agent_registry
+from src.service.core.hedging import hedger
+from src.service.core.prompt_layout import prompt_cache_stats
+from src.service.core.rate_limits import rate_scheduler
+from src.service.core.response_cache import response_cache
+from src.service.core.thread_locks import thread_lock_manager, turn_single_flight
+from src.service.core.thread_owners import thread_owner_cache
+
 router = APIRouter()
 
+# Wall-clock reference for the process uptime reported next to its CPU time
+_process_started = time.monotonic()
+
+
+def process_status() -> Dict[str, Any]:
+    """
+    Report CPU time and uptime of this worker process.
+
+    Load tests sample this before and after a step; the CPU time difference
+    divided by the wall time difference is the worker's CPU utilisation,
+    where 1.0 means one core fully busy.
+
+    Returns:
+        Process ID, CPU seconds used since start and uptime in seconds
+    """
+    return {
+        "pid": os.getpid(),
+        "cpu_seconds": time.process_time(),
+        "uptime_seconds": time.monotonic() - _process_started,
+    }
+
+
 @router.get("/health", response_model=Dict[str, Any], status_code=status.HTTP_200_OK)
 async def health_check() -> Dict[str, Any]:
     """
@@ -21,5 +56,16 @@ async def health_check() -> Dict[str, Any]:
         "status": "ok",
         "timestamp": datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
         "hostname": socket.gethostname(),
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "process": process_status(),
+        "agents": agent_registry.status(),
+        "response_cache": {"entries": len(response_cache), **response_cache.stats.as_dict()},
+        "deps_cache": deps_cache_stats.as_dict(),
+        "thread_owner_cache": {"entries": len(thread_owner_cache), **thread_owner_cache.stats.as_dict()},
+        "admission": admission_controller.status(),
+        "rate_limits": rate_scheduler.status(),
+        "hedging": hedger.status(),
+        "prompt_cache": prompt_cache_stats.as_dict(),
+        "jobs": job_worker_pool.status(),
+        "thread_locks": {"in_flight_submissions": len(turn_single_flight), **thread_lock_manager.status()}
     } 
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""Agent job API endpoints."""
+
+import json
+from typing import AsyncGenerator
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+
+from src.service.core.responses import AGENT_JOB, json_response
+from src.service.db.session import get_session_factory, SessionFactory
+from src.service.models.api import AgentRequest, AgentJobResponse
+from src.service.dependencies.user import get_user_id
+
+from src.service.api.jobs.handlers import (
+    enqueue_agent_job,
+    get_agent_job,
+    stream_agent_job
+)
+
+router = APIRouter()
+
+@router.post("", response_model=AgentJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    agent_request: AgentRequest,
+    user_id: UUID = Depends(get_user_id),
+    session_factory: SessionFactory = Depends(get_session_factory)
+) -> Response:
+    """
+    Queue an agent query and return its job right away.
+    
+    A worker runs the turn and saves it to the thread like /agent/query does.
+    Poll the job or subscribe to its stream for the result.
+    
+    Args:
+        agent_request: The query request with thread_id and query text
+        user_id: ID of the user making the request (from X-User-ID header)
+        session_factory: Factory function for database sessions
+    """
+    job = await enqueue_agent_job(session_factory, agent_request, user_id)
+    return json_response(AGENT_JOB, job, status_code=status.HTTP_202_ACCEPTED)
+
+
+@router.get("/{job_id}", response_model=AgentJobResponse)
+async def get_job(
+    job_id: UUID,
+    user_id: UUID = Depends(get_user_id),
+    session_factory: SessionFactory = Depends(get_session_factory)
+) -> Response:
+    """
+    Get the state of a job, with the agent's response once it has succeeded.
+    
+    Args:
+        job_id: ID of the job
+        user_id: ID of the user making the request (from X-User-ID header)
+        session_factory: Factory function for database sessions
+    """
+    job = await get_agent_job(session_factory, job_id, user_id)
+    return json_response(AGENT_JOB, job)
+
+
+@router.get("/{job_id}/stream")
+async def stream_job(
+    job_id: UUID,
+    user_id: UUID = Depends(get_user_id),
+    session_factory: SessionFactory = Depends(get_session_factory)
+) -> StreamingResponse:
+    """
+    Stream the job as JSON lines every time its state changes, ending once it has finished.
+    
+    Args:
+        job_id: ID of the job
+        user_id: ID of the user making the request (from X-User-ID header)
+        session_factory: Factory function for database sessions
+    """
+    # Fail with a plain 404 before the stream starts
+    await get_agent_job(session_factory, job_id, user_id)
+
+    async def generate_job_updates() -> AsyncGenerator[str, None]:
+        """Generate one JSON line per job state."""
+        try:
+            async for job in stream_agent_job(session_factory, job_id, user_id):
+                yield f"{job.model_dump_json()}\n"
+        except HTTPException as e:
+            yield f"{json.dumps({'status_code': e.status_code, 'error': e.detail})}\n"
+
+    return StreamingResponse(
+        generate_job_updates(),
+        media_type="application/x-ndjson",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Transfer-Encoding": "chunked",
+        },
+    )
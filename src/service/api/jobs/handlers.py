@@ -0,0 +1,137 @@
+"""Agent job request handlers for API endpoints."""
+
+from typing import AsyncGenerator, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+from src.service.core.settings import settings
+from src.service.db.session import SessionFactory
+from src.service.models.api import AgentRequest, AgentJobResponse
+from src.service.models.api.errors import ThreadPermissionError
+from src.service.models.api.job_models import FINISHED_JOB_STATUSES
+from src.service.models.database.errors import ThreadNotFoundError, JobNotFoundError
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+async def enqueue_agent_job(
+    session_factory: SessionFactory,
+    agent_request: AgentRequest,
+    user_id: UUID
+) -> AgentJobResponse:
+    """
+    Check thread access and queue an agent turn for the workers.
+    
+    Args:
+        session_factory: Factory function that creates database sessions
+        agent_request: The query and thread_id of the turn
+        user_id: The ID of the user making the request
+    
+    Returns:
+        The queued job
+        
+    Raises:
+        HTTPException: For invalid requests or unauthorized access
+    """
+    from src.service.api.jobs.operations import job_worker_pool
+    from src.service.core.utils import db_to_api_job, verify_thread_access
+    from src.service.db.jobs import enqueue_job
+
+    try:
+        async with session_factory() as db:
+            async with db.begin():
+                await verify_thread_access(db, agent_request.thread_id, user_id, cached=True)
+                job = await enqueue_job(
+                    db, user_id, agent_request.thread_id, agent_request.query, settings.JOB_MAX_ATTEMPTS
+                )
+    except ThreadNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ThreadPermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Could not enqueue agent job: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+    job_worker_pool.notify_enqueued()
+    return db_to_api_job(job)
+
+
+async def get_agent_job(
+    session_factory: SessionFactory,
+    job_id: UUID,
+    user_id: UUID
+) -> AgentJobResponse:
+    """
+    Get the current state of a job.
+    
+    Args:
+        session_factory: Factory function that creates database sessions
+        job_id: ID of the job
+        user_id: The ID of the user making the request
+    
+    Returns:
+        The job, with its result once it succeeded
+        
+    Raises:
+        HTTPException: 404 if the job doesn't exist or belongs to another user
+    """
+    from src.service.core.utils import db_to_api_job
+    from src.service.db.jobs import get_job
+
+    try:
+        async with session_factory() as db:
+            return db_to_api_job(await get_job(db, job_id, user_id))
+    except JobNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+async def stream_agent_job(
+    session_factory: SessionFactory,
+    job_id: UUID,
+    user_id: UUID
+) -> AsyncGenerator[AgentJobResponse, None]:
+    """
+    Yield the job every time its state changes, until it has finished.
+    
+    Updates made by workers of this process are delivered right away; jobs
+    run elsewhere are picked up by re-reading the job every
+    ``JOB_POLL_INTERVAL_SECONDS``.
+    
+    Args:
+        session_factory: Factory function that creates database sessions
+        job_id: ID of the job
+        user_id: The ID of the user making the request
+        
+    Yields:
+        Job snapshots, the last one succeeded or failed
+    """
+    from src.service.api.jobs.operations import job_worker_pool
+
+    last_seen: Optional[Tuple[str, int]] = None
+    while True:
+        job = await get_agent_job(session_factory, job_id, user_id)
+        if (job.status.value, job.attempts) != last_seen:
+            last_seen = (job.status.value, job.attempts)
+            yield job
+        if job.status in FINISHED_JOB_STATUSES:
+            return
+        await job_worker_pool.wait_for_update(job_id, settings.JOB_POLL_INTERVAL_SECONDS)
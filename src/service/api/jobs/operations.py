@@ -0,0 +1,322 @@
+"""Worker pool processing queued agent jobs."""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+from uuid import UUID, uuid4
+
+from src.service.core.admission import Priority, admission_controller
+from src.service.core.metrics import LatencyStats
+from src.service.core.settings import settings
+from src.service.core.thread_locks import thread_lock_manager
+from src.service.core.utils import ensure_uuid
+from src.service.db.jobs import claim_job, complete_job, expire_jobs, extend_job_lease, fail_job, has_due_jobs
+from src.service.db.session import SessionFactory, create_session_factory
+from src.service.models.api import AgentResponse
+from src.service.models.api.errors import (
+    AdmissionRejectedError,
+    AgentTypeError,
+    ThreadBusyError,
+    ThreadPermissionError,
+)
+from src.service.models.api.job_models import JobStatus
+from src.service.models.database import AgentJob
+from src.service.models.database.errors import ThreadNotFoundError
+
+logger = logging.getLogger(__name__)
+
+# Errors that fail a job right away because retrying cannot change the outcome
+PERMANENT_JOB_ERRORS = (ThreadNotFoundError, ThreadPermissionError, AgentTypeError)
+
+
+@dataclass
+class JobWorkerStats:
+    """
+    Counters for the job workers of this process.
+
+    Attributes:
+        claimed: Jobs claimed, including retries
+        succeeded: Jobs finished successfully
+        retried: Failed attempts queued for a retry
+        deferred: Claims queued again for lack of capacity, not counted as attempts
+        failed: Jobs that failed for good
+        lost_leases: Results dropped because another worker had taken over the job
+        wait_time: Time from enqueueing to the first claim
+        run_time: Time from claim to the result being recorded
+    """
+    claimed: int = 0
+    succeeded: int = 0
+    retried: int = 0
+    deferred: int = 0
+    failed: int = 0
+    lost_leases: int = 0
+    wait_time: LatencyStats = field(default_factory=LatencyStats)
+    run_time: LatencyStats = field(default_factory=LatencyStats)
+
+
+async def execute_agent_job(session_factory: SessionFactory, job: AgentJob) -> AgentResponse:
+    """
+    Run the agent turn of a job exactly like a single agent query.
+
+    Args:
+        session_factory: Factory function to create database sessions
+        job: The claimed job
+
+    Returns:
+        The agent's response, already saved to the thread
+
+    Raises:
+        ThreadNotFoundError: If the thread no longer exists
+        ThreadPermissionError: If the job's user no longer owns the thread
+        AdmissionRejectedError: If the service is at capacity
+        ThreadBusyError: If another turn held the thread for too long
+    """
+    from src.service.api.agent.operations import load_agent_context, run_agent_query
+
+    user_id = ensure_uuid(job.user_id)
+    thread_id = ensure_uuid(job.thread_id)
+    # Admitted before locking, so a job waiting for capacity holds no thread lock
+    async with await admission_controller.acquire(user_id, Priority.BATCH):
+        async with await thread_lock_manager.acquire(thread_id):
+            context = await load_agent_context(session_factory, thread_id, user_id)
+            return await run_agent_query(
+                session_factory=session_factory,
+                query=job.query,
+                thread=context.thread,
+                message_history=context.message_history,
+                agent_deps=context.agent_deps,
+                timer=context.timer
+            )
+
+
+class JobWorkerPool:
+    """Workers that claim jobs from the job table and run them."""
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        workers: int,
+        visibility_timeout: float,
+        retry_backoff: float,
+        poll_interval: float
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.visibility_timeout = visibility_timeout
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+        self.stats = JobWorkerStats()
+        self.name = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._watchers: Dict[str, Set[asyncio.Event]] = {}
+
+    @property
+    def running(self) -> bool:
+        """Whether worker tasks are running in this process."""
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(f"{self.name}:{index}"))
+            for index in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} agent job workers as {self.name}")
+
+    async def stop(self) -> None:
+        """Stop the worker tasks; jobs they were running are picked up again after their lease expires."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify_enqueued(self) -> None:
+        """Wake idle workers of this process because a job was enqueued."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def wait_for_update(self, job_id: UUID, timeout: float) -> None:
+        """
+        Wait until a worker of this process updates a job, or the timeout passes.
+
+        Jobs run by other processes are only noticed when the caller reads the
+        job table again after the timeout.
+
+        Args:
+            job_id: ID of the job
+            timeout: Maximum seconds to wait
+        """
+        event = asyncio.Event()
+        watchers = self._watchers.setdefault(str(job_id), set())
+        watchers.add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            watchers.discard(event)
+            if not watchers:
+                self._watchers.pop(str(job_id), None)
+
+    def _notify(self, job_id: Any) -> None:
+        """Wake everyone waiting for an update of a job."""
+        for event in self._watchers.get(str(job_id), ()):
+            event.set()
+
+    async def _worker(self, worker_id: str) -> None:
+        """Claim and run jobs until cancelled."""
+        while True:
+            try:
+                processed = await self.run_once(worker_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} failed: {str(e)}", exc_info=True)
+                processed = False
+
+            if not processed and self._wakeup is not None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def run_once(self, worker_id: str) -> bool:
+        """
+        Claim one job and run it.
+
+        Args:
+            worker_id: ID of the claiming worker
+
+        Returns:
+            False if no job was available
+        """
+        async with self.session_factory() as db:
+            # Idle polls only read, so they do not contend for the write lock with requests
+            if not await has_due_jobs(db):
+                return False
+            await db.commit()
+            async with db.begin():
+                expired = await expire_jobs(db)
+                job = await claim_job(db, worker_id, self.visibility_timeout)
+        if expired:
+            logger.warning(f"Failed {expired} agent jobs whose lease expired on their last attempt")
+            self.stats.failed += expired
+        if job is None:
+            return False
+
+        self.stats.claimed += 1
+        # Deferred claims leave an error behind; only the first claim ends the wait
+        if job.attempts == 1 and job.error is None:
+            self.stats.wait_time.observe(max(0.0, (job.updated_at - job.created_at).total_seconds()))
+        self._notify(job.id)
+        await self._process(job, worker_id)
+        return True
+
+    async def _process(self, job: AgentJob, worker_id: str) -> None:
+        """Run a claimed job while keeping its lease alive, then record the outcome."""
+        job_id = ensure_uuid(job.id)
+        start = time.perf_counter()
+        heartbeat = asyncio.create_task(self._keep_lease(job_id, worker_id))
+        try:
+            try:
+                response = await execute_agent_job(self.session_factory, job)
+            finally:
+                heartbeat.cancel()
+        except Exception as e:
+            await self._record_failure(job, worker_id, e)
+        else:
+            async with self.session_factory() as db:
+                async with db.begin():
+                    recorded = await complete_job(db, job_id, worker_id, response.model_dump_json())
+            if recorded:
+                self.stats.succeeded += 1
+            else:
+                self.stats.lost_leases += 1
+                logger.warning(f"Agent job {job_id} finished after its lease was taken over")
+        finally:
+            self.stats.run_time.observe(time.perf_counter() - start)
+            self._notify(job_id)
+
+    async def _record_failure(self, job: AgentJob, worker_id: str, error: Exception) -> None:
+        """
+        Queue a failed attempt for a retry with exponential backoff, or fail the job.
+
+        A job deferred for lack of capacity or a busy thread is queued again
+        without using up an attempt, so load alone never fails it.
+        """
+        deferred = isinstance(error, (AdmissionRejectedError, ThreadBusyError))
+        if isinstance(error, PERMANENT_JOB_ERRORS):
+            retry_delay: Optional[float] = None
+        elif isinstance(error, (AdmissionRejectedError, ThreadBusyError)):
+            retry_delay = float(error.retry_after)
+        else:
+            retry_delay = self.retry_backoff * 2 ** max(job.attempts - 1, 0)
+
+        async with self.session_factory() as db:
+            async with db.begin():
+                outcome = await fail_job(db, ensure_uuid(job.id), worker_id, str(error), retry_delay, deferred=deferred)
+
+        if deferred and outcome == JobStatus.QUEUED:
+            self.stats.deferred += 1
+            logger.info(f"Agent job {job.id} deferred for {retry_delay:.1f}s: {str(error)}")
+        elif outcome == JobStatus.QUEUED:
+            self.stats.retried += 1
+            logger.warning(f"Agent job {job.id} attempt {job.attempts} failed, retrying in {retry_delay:.1f}s: {str(error)}")
+        elif outcome == JobStatus.FAILED:
+            self.stats.failed += 1
+            logger.error(f"Agent job {job.id} failed after {job.attempts} attempts: {str(error)}")
+        else:
+            self.stats.lost_leases += 1
+
+    async def _keep_lease(self, job_id: UUID, worker_id: str) -> None:
+        """
+        Extend the job's lease every third of the visibility timeout.
+
+        A failed extension, such as a locked database, is retried on the next
+        tick, which still leaves two more before the lease expires. The loop only
+        ends when the lease was taken over.
+        """
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            try:
+                async with self.session_factory() as db:
+                    async with db.begin():
+                        extended = await extend_job_lease(db, job_id, worker_id, self.visibility_timeout)
+            except Exception as e:
+                logger.warning(f"Could not extend the lease of agent job {job_id}, retrying: {str(e)}")
+                continue
+            if not extended:
+                logger.warning(f"Agent job {job_id} lost its lease to another worker")
+                return
+
+    def status(self) -> Dict[str, Any]:
+        """Report worker state and counters."""
+        return {
+            "workers": len(self._tasks),
+            "claimed": self.stats.claimed,
+            "succeeded": self.stats.succeeded,
+            "retried": self.stats.retried,
+            "deferred": self.stats.deferred,
+            "failed": self.stats.failed,
+            "lost_leases": self.stats.lost_leases,
+            "wait_time": self.stats.wait_time.as_dict(),
+            "run_time": self.stats.run_time.as_dict(),
+        }
+
+
+job_worker_pool = JobWorkerPool(
+    session_factory=create_session_factory(),
+    workers=settings.JOB_WORKERS,
+    visibility_timeout=settings.JOB_VISIBILITY_TIMEOUT_SECONDS,
+    retry_backoff=settings.JOB_RETRY_BACKOFF_SECONDS,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+)
@@ -0,0 +1,24 @@
+"""Metrics API endpoints."""
+
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import PlainTextResponse
+
+from src.service.api.metrics.handlers import render_metrics
+from src.service.db.session import SessionFactory, get_session_factory
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter()
+
+@router.get("", response_class=PlainTextResponse, status_code=status.HTTP_200_OK)
+async def metrics(
+    session_factory: SessionFactory = Depends(get_session_factory)
+) -> PlainTextResponse:
+    """
+    Expose service metrics for Prometheus to scrape.
+    
+    Args:
+        session_factory: Factory function for database sessions
+    """
+    return PlainTextResponse(await render_metrics(session_factory), media_type=PROMETHEUS_CONTENT_TYPE)
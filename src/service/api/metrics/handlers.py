@@ -0,0 +1,80 @@
+"""Metrics request handlers for API endpoints."""
+
+from typing import Dict
+
+from src.common.stats import HitRateStats
+from src.service.core.service_metrics import (
+    cache_hit_ratio,
+    cache_lookups,
+    in_progress,
+    metrics_registry,
+    queue_depth,
+)
+from src.service.db.session import SessionFactory
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def _observe_cache(cache: str, stats: HitRateStats) -> None:
+    """Mirror a cache's lookup counters and hit ratio."""
+    cache_lookups.labels(cache, "hit").set(stats.hits)
+    cache_lookups.labels(cache, "miss").set(stats.misses)
+    cache_hit_ratio.labels(cache).set(stats.hit_rate)
+
+
+def refresh_component_metrics(job_counts: Dict[str, int]) -> None:
+    """
+    Copy cache and queue state of the service components into their gauges.
+    
+    Args:
+        job_counts: Number of agent jobs per status
+    """
+    from src.service.api.agent.operations import deps_cache_stats
+    from src.service.core.admission import admission_controller
+    from src.service.core.prompt_layout import prompt_cache_stats
+    from src.service.core.response_cache import response_cache
+    from src.service.core.thread_locks import thread_lock_manager
+    from src.service.core.thread_owners import thread_owner_cache
+    from src.service.models.api.job_models import JobStatus
+
+    _observe_cache("response", response_cache.stats)
+    _observe_cache("agent_data", deps_cache_stats)
+    _observe_cache("thread_owner", thread_owner_cache.stats)
+    # The provider's prompt cache is measured in input tokens, not lookups
+    cache_lookups.labels("prompt", "hit").set(prompt_cache_stats.cached_tokens)
+    cache_lookups.labels("prompt", "miss").set(prompt_cache_stats.request_tokens - prompt_cache_stats.cached_tokens)
+    cache_hit_ratio.labels("prompt").set(prompt_cache_stats.hit_rate)
+
+    admission = admission_controller.status()
+    locks = thread_lock_manager.status()
+    queue_depth.labels("admission").set(admission["queued"])
+    queue_depth.labels("jobs").set(job_counts.get(JobStatus.QUEUED.value, 0))
+    queue_depth.labels("thread_locks").set(locks["waiting"])
+    in_progress.labels("agent_runs").set(admission["active"])
+    in_progress.labels("agent_jobs").set(job_counts.get(JobStatus.RUNNING.value, 0))
+    in_progress.labels("threads").set(locks["threads_in_use"] - locks["waiting"])
+
+
+async def render_metrics(session_factory: SessionFactory) -> str:
+    """
+    Refresh the component gauges and render all metrics.
+    
+    Args:
+        session_factory: Factory function that creates database sessions
+    
+    Returns:
+        Metrics in the Prometheus text exposition format
+    """
+    from src.service.db.jobs import count_jobs_by_status
+
+    try:
+        async with session_factory() as db:
+            job_counts = await count_jobs_by_status(db)
+    except Exception as e:
+        # Still report everything kept in memory if the database is unavailable
+        logger.warning(f"Could not count agent jobs for metrics: {str(e)}")
+        job_counts = {}
+
+    refresh_component_metrics(job_counts)
+    return metrics_registry.render()
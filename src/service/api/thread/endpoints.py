@@ -1,17 +1,31 @@
 """Thread API endpoints."""
 
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
 
+from src.service.core.etags import CACHE_CONTROL, not_modified
+from src.service.core.responses import (
+    THREAD,
+    THREAD_DETAIL,
+    THREAD_LIST,
+    THREAD_SEARCH_RESULTS,
+    json_response
+)
 from src.service.dependencies.user import get_user_id
-from src.service.api.thread.handlers import create_thread, get_threads_by_user, get_thread_by_id
-from src.service.db.session import get_session_factory, SessionFactory
+from src.service.api.thread.handlers import (
+    create_thread,
+    get_threads_by_user,
+    get_thread_by_id,
+    search_threads
+)
+from src.service.db.session import get_archive_session_factory, get_session_factory, SessionFactory
 from src.service.models.api import (
     ThreadCreateRequest,
     ThreadResponse,
-    ThreadDetailResponse
+    ThreadDetailResponse,
+    ThreadSearchResult
 )
 
 router = APIRouter()
@@ -21,7 +35,7 @@ async def create_new_thread(
     thread_request: ThreadCreateRequest,
     user_id: UUID = Depends(get_user_id),
     session_factory: SessionFactory = Depends(get_session_factory)
-) -> ThreadResponse:
+) -> Response:
     """
     Create a new conversation thread.
     
@@ -30,38 +44,73 @@ async def create_new_thread(
         user_id: ID of the user creating the thread (from X-User-ID header)
         session_factory: Factory function that creates database sessions
     """
-
-    return await create_thread(session_factory, thread_request, user_id)
+    thread = await create_thread(session_factory, thread_request, user_id)
+    return json_response(THREAD, thread, status_code=status.HTTP_201_CREATED)
 
 
 @router.get("", response_model=List[ThreadResponse], status_code=status.HTTP_200_OK)
 async def get_threads(
+    if_none_match: Optional[str] = Header(default=None),
     user_id: UUID = Depends(get_user_id),
-    session_factory: SessionFactory = Depends(get_session_factory)
-) -> List[ThreadResponse]:
+    session_factory: SessionFactory = Depends(get_session_factory),
+    archive_session_factory: SessionFactory = Depends(get_archive_session_factory)
+) -> Response:
     """
     Get all threads for the specified user.
     
+    Answers 304 without loading the threads if If-None-Match holds the current ETag.
+    
     Args:
+        if_none_match: ETags of the client's cached copies (from If-None-Match header)
         user_id: ID of the user to get threads for (from X-User-ID header)
         session_factory: Factory function that creates database sessions
+        archive_session_factory: Factory function that creates archive database sessions
     """
+    etag, threads = await get_threads_by_user(session_factory, user_id, if_none_match, archive_session_factory)
+    if threads is None:
+        return not_modified(etag)
+    return json_response(THREAD_LIST, threads, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
 
-    return await get_threads_by_user(session_factory, user_id)
+@router.get("/search", response_model=List[ThreadSearchResult], status_code=status.HTTP_200_OK)
+async def search_user_threads(
+    q: str = Query(..., min_length=1, description="Free-text search query"),
+    limit: int = Query(default=20, ge=1, le=100, description="Maximum number of matches"),
+    user_id: UUID = Depends(get_user_id),
+    session_factory: SessionFactory = Depends(get_session_factory)
+) -> Response:
+    """
+    Search the user's threads by message content.
+    
+    Args:
+        q: Free-text search query
+        limit: Maximum number of matches to return
+        user_id: ID of the user whose threads are searched (from X-User-ID header)
+        session_factory: Factory function that creates database sessions
+    """
+    results = await search_threads(session_factory, user_id, q, limit)
+    return json_response(THREAD_SEARCH_RESULTS, results)
 
 
 @router.get("/{thread_id}", response_model=ThreadDetailResponse, status_code=status.HTTP_200_OK)
 async def get_thread(
     thread_id: UUID,
+    if_none_match: Optional[str] = Header(default=None),
     user_id: UUID = Depends(get_user_id),
     session_factory: SessionFactory = Depends(get_session_factory)
-) -> ThreadDetailResponse:
+) -> Response:
     """
     Get a specific thread by ID with its messages.
     
+    Answers 304 without loading the messages if If-None-Match holds the current ETag.
+    
     Args:
         thread_id: ID of the thread to retrieve
+        if_none_match: ETags of the client's cached copies (from If-None-Match header)
         user_id: ID of the user requesting the thread (from X-User-ID header)
         session_factory: Factory function that creates database sessions
     """
-    return await get_thread_by_id(session_factory, thread_id, user_id)
+    etag, thread = await get_thread_by_id(session_factory, thread_id, user_id, if_none_match)
+    if thread is None:
+        return not_modified(etag)
+    return json_response(THREAD_DETAIL, thread, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
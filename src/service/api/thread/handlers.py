@@ -1,18 +1,20 @@
 """Thread request handlers for API endpoints."""
 
-from typing import List, Sequence
+from typing import List, Optional, Sequence, Tuple
 from uuid import UUID
 from fastapi import HTTPException, status
 
-from src.service.core.utils import verify_thread_access, db_to_api_message, db_to_api_thread
+from src.service.core.etags import etag_matches, thread_etag, thread_list_etag
+from src.service.core.utils import verify_thread_access, db_to_api_thread, db_to_api_thread_detail
 from src.service.db.database import get_messages_by_thread
 
-from src.service.db.session import SessionFactory
+from src.service.db.session import SessionFactory, create_archive_session_factory
 from src.service.models.api import (
     ThreadCreate,
     ThreadCreateRequest,
     ThreadResponse,
-    ThreadDetailResponse
+    ThreadDetailResponse,
+    ThreadSearchResult
 )
 from src.service.models.database.errors import ThreadNotFoundError, RecordCreationError
 from src.service.models.api.errors import ThreadPermissionError
@@ -42,11 +44,15 @@ async def create_thread(
             agent_type=thread_request.agent_type
         )
         
+        from src.service.core.thread_owners import thread_owner_cache
         from src.service.db.database import create_thread
         async with session_factory() as db:
             async with db.begin():
                 thread = await create_thread(db, thread_create)
         
+        # Its first turn can then skip reading the thread again
+        thread_owner_cache.put(thread.id, thread.user_id, thread.agent_type, thread.updated_at)
+        
         return db_to_api_thread(thread)
     except RecordCreationError as e:
         raise HTTPException(
@@ -61,24 +67,48 @@ async def create_thread(
 
 async def get_threads_by_user(
     session_factory: SessionFactory,
-    user_id: UUID
-) -> List[ThreadResponse]:
+    user_id: UUID,
+    if_none_match: Optional[str] = None,
+    archive_session_factory: Optional[SessionFactory] = None
+) -> Tuple[str, Optional[List[ThreadResponse]]]:
     """
-    Get all threads for the specified user.
+    Get all threads for the specified user unless the client's copy is current.
     
     Args:
         session_factory: Factory function that creates database sessions
         user_id: ID of the user to get threads for
+        if_none_match: The client's If-None-Match header, if any
+        archive_session_factory: Factory function that creates archive database sessions
         
     Returns:
-        List of threads belonging to the user
+        ETag of the list, and the threads belonging to the user, or None if
+        the ETag matches if_none_match
     """
-    from src.service.db.database import get_threads_by_user
+    from src.service.db.database import get_threads_by_user, get_user_version
+    from src.service.db.archive import get_archived_threads_by_user
 
     try:
         async with session_factory() as db:
+            # Read the version first; a write in between only makes the tag stale, never the list
+            etag = thread_list_etag(user_id, await get_user_version(db, user_id))
+            if etag_matches(if_none_match, etag):
+                return etag, None
+
             # Read-only operation, no transaction needed
-            return [db_to_api_thread(thread) for thread in await get_threads_by_user(db, user_id)]
+            threads = [db_to_api_thread(thread) for thread in await get_threads_by_user(db, user_id)]
+
+        # Archived threads stay visible; they are restored when opened. A thread
+        # whose archiving did not complete is in both places; list the hot copy.
+        hot_ids = {thread.id for thread in threads}
+        archived = [
+            thread for thread in map(db_to_api_thread, await get_archived_threads_by_user(
+                archive_session_factory or create_archive_session_factory(), user_id
+            ))
+            if thread.id not in hot_ids
+        ]
+        if archived:
+            threads = sorted(threads + archived, key=lambda thread: thread.created_at, reverse=True)
+        return etag, threads
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -88,37 +118,34 @@ async def get_threads_by_user(
 async def get_thread_by_id(
     session_factory: SessionFactory,
     thread_id: UUID,
-    user_id: UUID
-) -> ThreadDetailResponse:
+    user_id: UUID,
+    if_none_match: Optional[str] = None
+) -> Tuple[str, Optional[ThreadDetailResponse]]:
     """
-    Get a thread by ID with its messages.
+    Get a thread by ID with its messages unless the client's copy is current.
     
     Args:
         session_factory: Factory function that creates database sessions
         thread_id: ID of the thread to get
         user_id: ID of the user to get threads for
+        if_none_match: The client's If-None-Match header, if any
         
     Returns:
-        Thread detail
+        ETag of the thread, and the thread detail, or None if the ETag
+        matches if_none_match
     """
     try: 
         async with session_factory() as db:
             # Verify access and get thread
             thread: Thread = await verify_thread_access(db, thread_id, user_id)
+            etag = thread_etag(thread_id, thread.version)
+            if etag_matches(if_none_match, etag):
+                return etag, None
+
             # Get messages for thread
             messages: Sequence[Message] = await get_messages_by_thread(db, thread_id)
             
-            # Create a ThreadDetailResponse with messages
-            thread_detail = ThreadDetailResponse(
-                id=thread.id,
-                user_id=thread.user_id,
-                agent_type=thread.agent_type,
-                created_at=thread.created_at,
-                updated_at=thread.updated_at,
-                messages=[db_to_api_message(message) for message in messages]
-            )
-            
-            return thread_detail 
+            return etag, db_to_api_thread_detail(thread, messages)
     except ThreadNotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -134,4 +161,42 @@ async def get_thread_by_id(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
-    
\ No newline at end of file
+
+
+async def search_threads(
+    session_factory: SessionFactory,
+    user_id: UUID,
+    query: str,
+    limit: int
+) -> List[ThreadSearchResult]:
+    """
+    Search the user's conversation history by message content.
+    
+    Args:
+        session_factory: Factory function that creates database sessions
+        user_id: ID of the user whose threads are searched
+        query: Free-text search query
+        limit: Maximum number of matches to return
+        
+    Returns:
+        Matching messages with their thread IDs and snippets, best match first
+    """
+    from src.service.db.search import search_messages
+
+    try:
+        async with session_factory() as db:
+            hits = await search_messages(db, user_id, query, limit=limit)
+        return [
+            ThreadSearchResult(
+                thread_id=UUID(hit.thread_id),
+                message_id=UUID(hit.message_id),
+                snippet=hit.snippet,
+                rank=hit.rank
+            )
+            for hit in hits
+        ]
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
@@ -0,0 +1,56 @@
+"""Usage API endpoints."""
+
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, Security, status
+
+from src.service.api.usage.handlers import get_usage_report
+from src.service.core.responses import USAGE_REPORT, json_response
+from src.service.db.session import SessionFactory, get_session_factory
+from src.service.dependencies.auth import admin_api_key_header, is_admin_api_key
+from src.service.dependencies.user import get_user_id
+from src.service.models.api import AgentType, UsageBucket, UsageReport
+
+router = APIRouter()
+
+@router.get("", response_model=UsageReport, status_code=status.HTTP_200_OK)
+async def usage_report(
+    start: Optional[datetime] = Query(default=None, description="Start of the range (inclusive), defaults to 7 days before end"),
+    end: Optional[datetime] = Query(default=None, description="End of the range (exclusive), defaults to now"),
+    bucket: UsageBucket = Query(default=UsageBucket.DAY, description="Size of the time buckets"),
+    user_id: Optional[UUID] = Query(default=None, description="Only include runs of this user; other users need the admin API key"),
+    agent_type: Optional[AgentType] = Query(default=None, description="Only include runs of this agent type"),
+    top_threads: int = Query(default=10, ge=0, le=100, description="Number of most expensive threads to list"),
+    caller_id: UUID = Depends(get_user_id),
+    admin_api_key: Optional[str] = Security(admin_api_key_header),
+    session_factory: SessionFactory = Depends(get_session_factory)
+) -> Response:
+    """
+    Report token usage and latency of agent runs per time bucket, user and agent type.
+    
+    Times are in UTC. The report also lists the threads that used the most
+    tokens in the range. It covers the caller's own runs; reports on other
+    users, or on all of them, need the admin API key.
+    
+    Args:
+        start: Start of the range
+        end: End of the range
+        bucket: Size of the time buckets
+        user_id: Optional user filter, the caller unless the admin API key is given
+        agent_type: Optional agent type filter
+        top_threads: Number of most expensive threads to list
+        caller_id: ID of the user making the request (from X-User-ID header)
+        admin_api_key: Optional operations API key (from X-Admin-Key header)
+        session_factory: Factory function for database sessions
+    """
+    if not is_admin_api_key(admin_api_key):
+        if user_id is not None and user_id != caller_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Reports on other users need the admin API key",
+            )
+        user_id = caller_id
+    report = await get_usage_report(session_factory, start, end, bucket, user_id, agent_type, top_threads)
+    return json_response(USAGE_REPORT, report)
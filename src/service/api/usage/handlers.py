@@ -0,0 +1,68 @@
+"""Usage request handlers for API endpoints."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+from src.service.core.utils import as_naive_utc
+from src.service.db.session import SessionFactory
+from src.service.models.api import AgentType, UsageBucket, UsageReport
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Range reported when the caller gives no start
+DEFAULT_USAGE_WINDOW = timedelta(days=7)
+
+
+async def get_usage_report(
+    session_factory: SessionFactory,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket: UsageBucket = UsageBucket.DAY,
+    user_id: Optional[UUID] = None,
+    agent_type: Optional[AgentType] = None,
+    top_threads: int = 10
+) -> UsageReport:
+    """
+    Aggregate token usage and latency of agent runs over a time range.
+    
+    Args:
+        session_factory: Factory function to create database sessions
+        start: Start of the range (inclusive), defaults to seven days before the end
+        end: End of the range (exclusive), defaults to now
+        bucket: Size of the time buckets
+        user_id: Only include runs of this user
+        agent_type: Only include runs of this agent type
+        top_threads: Number of most expensive threads to include
+        
+    Returns:
+        Usage per time bucket, user and agent type, and the most expensive threads
+        
+    Raises:
+        HTTPException: 400 if the range is empty, 500 if the report fails
+    """
+    from src.service.db.usage import get_top_threads, get_usage_aggregates
+
+    end = as_naive_utc(end) if end else datetime.now(timezone.utc).replace(tzinfo=None)
+    start = as_naive_utc(start) if start else end - DEFAULT_USAGE_WINDOW
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+
+    try:
+        async with session_factory() as db:
+            aggregates = await get_usage_aggregates(db, start, end, bucket, user_id, agent_type)
+            threads = await get_top_threads(db, start, end, top_threads, user_id, agent_type)
+    except Exception as e:
+        logger.error(f"Usage report failed: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Usage report failed: {str(e)}"
+        )
+
+    return UsageReport(start=start, end=end, bucket=bucket, aggregates=aggregates, top_threads=threads)
@@ -0,0 +1,239 @@
+"""Admission control for LLM-bound agent requests.
+
+Every agent run holds a provider connection for seconds at a time, so the
+number of concurrent runs is capped globally and per user. Requests over the
+cap wait in a bounded queue ordered by priority (interactive streams before
+standard queries before batch work) and then by arrival. When the queue is
+full, or a request has waited too long, it is rejected right away with a
+suggested retry delay instead of piling more load onto the provider.
+"""
+
+import asyncio
+import itertools
+import math
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Dict, List, Optional
+
+from src.service.core.metrics import LatencyStats
+from src.service.core.settings import settings
+from src.service.models.api.errors import AdmissionRejectedError
+
+
+class Priority(IntEnum):
+    """Queue priority of an agent request; lower values are admitted first."""
+    INTERACTIVE = 0
+    STANDARD = 1
+    BATCH = 2
+
+
+@dataclass
+class AdmissionStats:
+    """
+    Counters for the admission controller.
+
+    Attributes:
+        admitted: Requests that got a slot
+        rejected_queue_full: Requests rejected because the queue was full
+        rejected_timeout: Requests rejected after waiting too long
+        queue_time: Time admitted requests spent waiting for a slot
+        run_time: Time admitted requests held their slot
+    """
+    admitted: int = 0
+    rejected_queue_full: int = 0
+    rejected_timeout: int = 0
+    queue_time: LatencyStats = field(default_factory=LatencyStats)
+    run_time: LatencyStats = field(default_factory=LatencyStats)
+
+
+@dataclass(eq=False)
+class _Waiter:
+    """A request waiting in the admission queue."""
+    priority: int
+    sequence: int
+    user_id: str
+    future: "asyncio.Future[None]"
+
+
+class AdmissionTicket:
+    """A granted slot; releasing it more than once is harmless."""
+
+    def __init__(self, controller: Optional["AdmissionController"], user_id: str):
+        self._controller = controller
+        self._user_id = user_id
+        self._granted_at = time.perf_counter()
+        self._released = False
+
+    def release(self) -> None:
+        """Return the slot to the controller."""
+        if self._released:
+            return
+        self._released = True
+        if self._controller is not None:
+            self._controller._release(self._user_id, time.perf_counter() - self._granted_at)
+
+    async def __aenter__(self) -> "AdmissionTicket":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+class AdmissionController:
+    """Global and per-user concurrency limits with a bounded priority queue."""
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_per_user: int,
+        max_queue: int,
+        queue_timeout_seconds: float
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.stats = AdmissionStats()
+        self._active = 0
+        self._active_by_user: Dict[str, int] = {}
+        self._waiters: List[_Waiter] = []
+        self._sequence = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any limit is configured."""
+        return self.max_concurrent > 0
+
+    def _has_capacity(self, user_id: str) -> bool:
+        """Check whether a request of this user may start now."""
+        if self._active >= self.max_concurrent:
+            return False
+        return self.max_per_user <= 0 or self._active_by_user.get(user_id, 0) < self.max_per_user
+
+    def _grant(self, user_id: str) -> None:
+        """Account for a request that starts running."""
+        self._active += 1
+        self._active_by_user[user_id] = self._active_by_user.get(user_id, 0) + 1
+
+    def _free(self, user_id: str) -> None:
+        """Account for a request that stops running."""
+        self._active -= 1
+        remaining = self._active_by_user.get(user_id, 1) - 1
+        if remaining:
+            self._active_by_user[user_id] = remaining
+        else:
+            self._active_by_user.pop(user_id, None)
+
+    def _release(self, user_id: str, held_seconds: float) -> None:
+        """Account for a finished request and hand its slot to the next waiter."""
+        self._free(user_id)
+        self.stats.run_time.observe(held_seconds)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Admit queued requests in priority order while capacity allows."""
+        for waiter in sorted(self._waiters, key=lambda w: (w.priority, w.sequence)):
+            if self._active >= self.max_concurrent:
+                break
+            if waiter.future.done() or not self._has_capacity(waiter.user_id):
+                continue
+            self._waiters.remove(waiter)
+            self._grant(waiter.user_id)
+            waiter.future.set_result(None)
+
+    def retry_after_seconds(self) -> int:
+        """Estimate when a rejected request could be admitted, in whole seconds."""
+        average_run = self.stats.run_time.avg_seconds or 1.0
+        backlog = (len(self._waiters) + 1) / max(self.max_concurrent, 1)
+        return max(1, math.ceil(average_run * backlog))
+
+    async def acquire(
+        self,
+        user_id: Any,
+        priority: Priority = Priority.STANDARD
+    ) -> AdmissionTicket:
+        """
+        Wait for a slot to run an agent request.
+
+        Args:
+            user_id: ID of the user making the request
+            priority: Queue priority of the request
+
+        Returns:
+            Ticket that must be released when the request finishes
+
+        Raises:
+            AdmissionRejectedError: If the queue is full or the wait timed out
+        """
+        user_key = str(user_id)
+        if not self.enabled:
+            return AdmissionTicket(None, user_key)
+
+        start = time.perf_counter()
+        if len(self._waiters) >= self.max_queue and not self._has_capacity(user_key):
+            self.stats.rejected_queue_full += 1
+            raise AdmissionRejectedError("Too many requests are queued", self.retry_after_seconds())
+
+        waiter = _Waiter(
+            priority=int(priority),
+            sequence=next(self._sequence),
+            user_id=user_key,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._waiters.append(waiter)
+        # Runs right away if no higher-priority waiter is eligible for the free capacity
+        self._dispatch()
+        if waiter.future.done():
+            return self._admitted(user_key, start)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.queue_timeout_seconds or None)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.stats.rejected_timeout += 1
+            raise AdmissionRejectedError("Timed out waiting for capacity", self.retry_after_seconds())
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+        return self._admitted(user_key, start)
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """Take a waiter out of the queue, returning its slot if it was granted meanwhile."""
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+        elif waiter.future.done() and not waiter.future.cancelled():
+            self._free(waiter.user_id)
+            self._dispatch()
+        if not waiter.future.done():
+            waiter.future.cancel()
+
+    def _admitted(self, user_id: str, start: float) -> AdmissionTicket:
+        """Record an admission and issue its ticket."""
+        self.stats.admitted += 1
+        self.stats.queue_time.observe(time.perf_counter() - start)
+        return AdmissionTicket(self, user_id)
+
+    def status(self) -> Dict[str, Any]:
+        """Report current load and counters."""
+        return {
+            "active": self._active,
+            "queued": len(self._waiters),
+            "max_concurrent": self.max_concurrent,
+            "max_per_user": self.max_per_user,
+            "max_queue": self.max_queue,
+            "admitted": self.stats.admitted,
+            "rejected_queue_full": self.stats.rejected_queue_full,
+            "rejected_timeout": self.stats.rejected_timeout,
+            "queue_time": self.stats.queue_time.as_dict(),
+            "run_time": self.stats.run_time.as_dict(),
+        }
+
+
+admission_controller = AdmissionController(
+    max_concurrent=settings.ADMISSION_MAX_CONCURRENT,
+    max_per_user=settings.ADMISSION_MAX_PER_USER,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout_seconds=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+)
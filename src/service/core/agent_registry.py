@@ -0,0 +1,264 @@
+"""Registry of the agents served by the API.
+
+Agents are referenced by import path and only imported when first needed, so a
+worker pays the import and schema-building cost only for the agent types it
+actually serves. With ``AGENT_PRELOAD`` enabled, the application startup hook
+loads every agent up front and warms it up: one offline run through the agent
+graph with a test model and, with ``AGENT_WARMUP_CONNECT``, one cheap request
+that opens the provider's pooled HTTP connection. The first user request then
+costs the same as any other.
+"""
+
+import importlib
+import logging
+import time
+from typing import Any, Callable, Dict, FrozenSet, Mapping, Optional
+
+from pydantic_ai import Agent
+from pydantic_ai.models import Model, infer_model
+from pydantic_ai.models.test import TestModel
+
+from src.common.tools import is_read_only
+from src.service.core.hedging import HedgedModel, hedger
+from src.service.core.mock_model import MockModelConfig, build_mock_model
+from src.service.core.prompt_layout import StablePromptModel
+from src.service.core.rate_limits import RateLimitedModel, model_key, rate_scheduler
+from src.service.core.settings import settings
+from src.service.models.api.errors import AgentTypeError
+from src.service.models.api.internal import AgentType
+
+logger = logging.getLogger(__name__)
+
+# Import path ("module:attribute") of the agent serving each agent type
+AGENT_IMPORT_PATHS: Dict[AgentType, str] = {
+    AgentType.BANK_SUPPORT: "src.agents.bank_support:support_agent",
+}
+
+
+class AgentRegistry:
+    """Lazily constructed agents keyed by agent type."""
+
+    def __init__(self, import_paths: Mapping[AgentType, str]):
+        self._import_paths = dict(import_paths)
+        self._tool_names: Dict[AgentType, FrozenSet[str]] = {}
+        self._read_only_tool_names: Dict[AgentType, FrozenSet[str]] = {}
+        self._output_tool_names: Dict[AgentType, FrozenSet[str]] = {}
+        self._agents: Dict[AgentType, Agent[Any, Any]] = {}
+        self._models: Dict[AgentType, Optional[Model]] = {}
+        self._warm: Dict[AgentType, float] = {}
+
+    def get(self, agent_type: AgentType) -> Agent[Any, Any]:
+        """
+        Get the agent for an agent type, importing it on first use.
+
+        Args:
+            agent_type: Type of agent to get
+
+        Returns:
+            The agent serving the agent type
+
+        Raises:
+            AgentTypeError: If no agent is registered for the type, or its import path is not an agent
+        """
+        agent = self._agents.get(agent_type)
+        if agent is not None:
+            return agent
+
+        import_path = self._import_paths.get(agent_type)
+        if not import_path:
+            raise AgentTypeError(f"Unsupported agent type: {agent_type.value}")
+
+        start = time.perf_counter()
+        module_name, _, attribute = import_path.partition(":")
+        loaded = getattr(importlib.import_module(module_name), attribute)
+        if not isinstance(loaded, Agent):
+            raise AgentTypeError(f"{import_path} is not an agent")
+        agent = loaded
+        # pydantic-ai has no public accessor for an agent's function and output tools
+        tools = agent._function_tools
+        self._tool_names[agent_type] = frozenset(tools)
+        self._read_only_tool_names[agent_type] = frozenset(
+            name for name, tool in tools.items() if is_read_only(tool.function)
+        )
+        output_schema = agent._output_schema
+        self._output_tool_names[agent_type] = frozenset(output_schema.tools if output_schema else ())
+        self._agents[agent_type] = agent
+        logger.info(f"Loaded agent {agent_type.value} in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return agent
+
+    def tool_names(self, agent_type: AgentType) -> FrozenSet[str]:
+        """
+        Get the names of an agent type's function tools.
+
+        Calls of these tools are the agent's own work, as opposed to the
+        output tool calls that deliver its answer.
+
+        Args:
+            agent_type: Type of agent to get the tool names for
+
+        Returns:
+            Names of the agent's function tools, empty if no agent is registered for the type
+        """
+        if agent_type not in self._import_paths:
+            return frozenset()
+        self.get(agent_type)
+        return self._tool_names[agent_type]
+
+    def read_only_tool_names(self, agent_type: AgentType) -> FrozenSet[str]:
+        """
+        Get the names of an agent type's function tools marked ``read_only``.
+
+        Args:
+            agent_type: Type of agent to get the tool names for
+
+        Returns:
+            Names of the agent's read-only tools, empty if no agent is registered for the type
+        """
+        if agent_type not in self._import_paths:
+            return frozenset()
+        self.get(agent_type)
+        return self._read_only_tool_names[agent_type]
+
+    def output_tool_names(self, agent_type: AgentType) -> FrozenSet[str]:
+        """
+        Get the names of the tools an agent type's agent returns structured output through.
+
+        Args:
+            agent_type: Type of agent to get the tool names for
+
+        Returns:
+            Names of the agent's output tools, empty for plain text output or if
+            no agent is registered for the type
+        """
+        if agent_type not in self._import_paths:
+            return frozenset()
+        self.get(agent_type)
+        return self._output_tool_names[agent_type]
+
+    def model_for(self, agent_type: AgentType) -> Optional[Model]:
+        """
+        Get the model to run an agent type with.
+
+        With ``MOCK_MODEL_ENABLED`` the local mock model replaces the agent's
+        model and the hedging backup. The model is wrapped in the rate
+        scheduler when limits are configured for it, hedged with the backup
+        model when hedging is enabled, and sends its prompts in the stable
+        layout when ``PROMPT_LAYOUT`` is ``stable``.
+
+        Args:
+            agent_type: Type of agent to get the model for
+
+        Returns:
+            Model to pass to ``Agent.run``, or None to use the agent's own model
+        """
+        if agent_type in self._models:
+            return self._models[agent_type]
+
+        agent = self.get(agent_type)
+        model: Optional[Model] = None
+        if agent.model is not None or settings.MOCK_MODEL_ENABLED:
+            base = self._base_model(agent.model)
+            primary = self._rate_limited(base)
+            if settings.HEDGE_ENABLED and settings.HEDGE_BACKUP_MODEL:
+                backup = self._rate_limited(self._base_model(settings.HEDGE_BACKUP_MODEL))
+                model = HedgedModel(primary, backup, hedger, model_key(base))
+            elif primary is not base or settings.MOCK_MODEL_ENABLED:
+                model = primary
+            if settings.PROMPT_LAYOUT == "stable":
+                model = StablePromptModel(model or base)
+        self._models[agent_type] = model
+        return model
+
+    @staticmethod
+    def _base_model(model: Any) -> Model:
+        """Resolve a configured model, or create the mock model when it is enabled."""
+        if settings.MOCK_MODEL_ENABLED:
+            return build_mock_model(MockModelConfig.from_settings())
+        return infer_model(model)
+
+    @staticmethod
+    def _rate_limited(model: Model) -> Model:
+        """Wrap a model in the rate scheduler if limits are configured for it."""
+        if rate_scheduler.is_limited(model_key(model)):
+            return RateLimitedModel(model, rate_scheduler, settings.RATE_LIMIT_OUTPUT_TOKENS)
+        return model
+
+    def load_all(self) -> None:
+        """Import every registered agent."""
+        for agent_type in self._import_paths:
+            self.get(agent_type)
+
+    async def warm_up(
+        self,
+        agent_type: AgentType,
+        deps: Any,
+        connect: bool = True
+    ) -> None:
+        """
+        Exercise an agent once so the first real request runs at steady-state speed.
+
+        The offline run goes through system prompt functions, tool preparation
+        and output validation without calling the provider. Warmup failures are
+        logged and never raised, so a missing key or network outage cannot
+        prevent the service from starting.
+
+        Args:
+            agent_type: Type of agent to warm up
+            deps: Dependencies to run the agent with
+            connect: Also open the provider HTTP connection
+        """
+        start = time.perf_counter()
+        agent = self.get(agent_type)
+        try:
+            await agent.run("warmup", deps=deps, model=TestModel(call_tools=[]))
+        except Exception as e:
+            logger.warning(f"Offline warmup of agent {agent_type.value} failed: {str(e)}")
+
+        # The mock model has no provider connection to open
+        if connect and not settings.MOCK_MODEL_ENABLED:
+            await self._open_provider_connection(agent, agent_type)
+
+        self._warm[agent_type] = time.perf_counter() - start
+        logger.info(f"Warmed up agent {agent_type.value} in {self._warm[agent_type] * 1000:.1f}ms")
+
+    async def warm_up_all(
+        self,
+        deps_factory: Callable[[AgentType], Any],
+        connect: bool = True
+    ) -> None:
+        """
+        Load and warm up every registered agent.
+
+        Args:
+            deps_factory: Builds the dependencies used for an agent type's warmup run
+            connect: Also open the provider HTTP connections
+        """
+        for agent_type in self._import_paths:
+            await self.warm_up(agent_type, deps_factory(agent_type), connect=connect)
+
+    @staticmethod
+    async def _open_provider_connection(agent: Agent[Any, Any], agent_type: AgentType) -> None:
+        """Make a cheap authenticated request so the provider's pooled connection is open."""
+        if agent.model is None:
+            return
+        try:
+            client: Optional[Any] = getattr(infer_model(agent.model), "client", None)
+            models_api = getattr(client, "models", None)
+            if models_api is None:
+                return
+            await models_api.list()
+        except Exception as e:
+            logger.warning(f"Could not open provider connection for agent {agent_type.value}: {str(e)}")
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Report which agents are loaded and how long their warmup took."""
+        return {
+            agent_type.value: {
+                "loaded": agent_type in self._agents,
+                "warmup_seconds": self._warm.get(agent_type),
+            }
+            for agent_type in self._import_paths
+        }
+
+
+agent_registry = AgentRegistry(AGENT_IMPORT_PATHS)
@@ -0,0 +1,53 @@
+"""Entity tags for conditional GETs of threads.
+
+A thread's tag is derived from its version, which grows with every write to the
+thread, and the thread list's tag from the owner's list version. Neither needs
+the response body, so a matching ``If-None-Match`` is answered with 304 before
+any messages are loaded or serialized.
+"""
+
+from typing import Optional
+from uuid import UUID
+
+from fastapi import Response, status
+
+# Revalidate on every use; the responses are per user
+CACHE_CONTROL = "private, no-cache"
+
+
+def thread_etag(thread_id: UUID, version: int) -> str:
+    """Tag of a thread's detail response at the given version."""
+    return f'"thread-{thread_id}-{version}"'
+
+
+def thread_list_etag(user_id: UUID, version: int) -> str:
+    """Tag of a user's thread list at the given list version."""
+    return f'"threads-{user_id}-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an ``If-None-Match`` header against the current tag.
+
+    Args:
+        if_none_match: Header value, a comma-separated list of tags or ``*``
+        etag: Current tag of the resource
+
+    Returns:
+        True if the client's copy is current; weak tags compare like strong ones
+    """
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return any(
+        candidate == "*" or candidate.removeprefix("W/") == etag
+        for candidate in candidates
+    )
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response telling the client to reuse its copy."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
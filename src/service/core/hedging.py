@@ -0,0 +1,314 @@
+"""Hedged model requests against a backup model.
+
+Most model requests answer quickly, but the slowest few percent can take many
+times longer than the median. With hedging enabled, a request that has not
+answered (or, for streams, sent its first chunk) within a latency budget is
+sent a second time to a backup model. Whichever responds first is used and
+the other request is cancelled. A primary request that fails within the
+budget is sent to the backup right away.
+
+The budget is a percentile of the primary model's recent latencies, so only
+requests that are already slower than usual are duplicated and the extra
+provider load stays around ``100 - HEDGE_PERCENTILE`` percent. Full responses
+and streams are timed in separate windows under the keys ``<model>:request``
+and ``<model>:stream``, since the time to a full response and the time to a
+first chunk follow different distributions.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from pydantic_ai.messages import ModelMessage, ModelResponse
+from pydantic_ai.models import Model, ModelRequestParameters, StreamedResponse
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+from pydantic_ai.usage import Usage
+
+from src.service.core.metrics import LatencyWindow
+from src.service.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class HedgeStats:
+    """
+    Counters for one kind of request (full responses or streams) to one primary model.
+
+    Attributes:
+        requests: Requests sent to the primary model
+        hedged: Requests that exceeded the budget and were also sent to the backup
+        failovers: Requests sent to the backup because the primary failed within the budget
+        backup_wins: Hedged or failed-over requests answered by the backup model
+        primary_latency: Latency of primary responses; those that lost the race count at the time they were cancelled
+        latency: Latency seen by the caller, including hedged requests
+    """
+    requests: int = 0
+    hedged: int = 0
+    failovers: int = 0
+    backup_wins: int = 0
+    primary_latency: LatencyWindow = field(default_factory=LatencyWindow)
+    latency: LatencyWindow = field(default_factory=LatencyWindow)
+
+
+class Hedger:
+    """Races slow primary requests against a backup and keeps per-model statistics."""
+
+    def __init__(
+        self,
+        percentile: float,
+        min_samples: int,
+        initial_delay_seconds: float,
+        min_delay_seconds: float
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay_seconds = initial_delay_seconds
+        self.min_delay_seconds = min_delay_seconds
+        self._stats: Dict[str, HedgeStats] = {}
+
+    def stats_for(self, key: str) -> HedgeStats:
+        """Get the statistics of a primary model key, creating them on first use."""
+        return self._stats.setdefault(key, HedgeStats())
+
+    def budget_seconds(self, key: str) -> float:
+        """
+        Time to wait for the primary model before hedging.
+
+        Args:
+            key: Primary model key
+
+        Returns:
+            The configured percentile of recent primary latencies, or the initial
+            delay until enough samples were observed
+        """
+        window = self.stats_for(key).primary_latency
+        if len(window) < self.min_samples:
+            return self.initial_delay_seconds
+        return max(self.min_delay_seconds, window.percentile(self.percentile))
+
+    async def race(
+        self,
+        key: str,
+        primary: Callable[[], Awaitable[T]],
+        backup: Callable[[], Awaitable[T]],
+        discard: Optional[Callable[[T], Awaitable[None]]] = None
+    ) -> T:
+        """
+        Run the primary call and start the backup call if the primary is over budget or fails.
+
+        Args:
+            key: Primary model key
+            primary: Starts the request to the primary model
+            backup: Starts the same request to the backup model
+            discard: Cleans up the result of a call that completed but lost the race
+
+        Returns:
+            Result of the first call that succeeded
+
+        Raises:
+            Exception: The primary call's error if every started call failed
+        """
+        stats = self.stats_for(key)
+        stats.requests += 1
+        start = time.perf_counter()
+
+        primary_task = asyncio.ensure_future(primary())
+        tasks: List["asyncio.Future[T]"] = [primary_task]
+        winner: Optional["asyncio.Future[T]"] = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.budget_seconds(key))
+            if not done:
+                stats.hedged += 1
+                tasks.append(asyncio.ensure_future(backup()))
+            elif primary_task.exception() is not None:
+                stats.failovers += 1
+                tasks.append(asyncio.ensure_future(backup()))
+            winner = await self._first_success(tasks)
+        finally:
+            primary_running = not primary_task.done()
+            await self._cancel_losers(tasks, winner, discard)
+
+        elapsed = time.perf_counter() - start
+        stats.latency.observe(elapsed)
+        if winner is primary_task:
+            stats.primary_latency.observe(elapsed)
+        else:
+            if primary_running:
+                # Censored: the primary would have taken at least this long, and leaving
+                # it out would pull the budget below the primary's real tail
+                stats.primary_latency.observe(elapsed)
+            stats.backup_wins += 1
+            logger.info(f"Backup model answered for {key} after {elapsed * 1000:.1f}ms")
+        return winner.result()
+
+    @staticmethod
+    async def _first_success(tasks: List["asyncio.Future[T]"]) -> "asyncio.Future[T]":
+        """Wait for the first task that completes without an error."""
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:
+                if task in done and task.exception() is None:
+                    return task
+        error = tasks[0].exception()
+        if error is None:
+            raise RuntimeError("Every hedged request failed")
+        raise error
+
+    @staticmethod
+    async def _cancel_losers(
+        tasks: List["asyncio.Future[T]"],
+        winner: Optional["asyncio.Future[T]"],
+        discard: Optional[Callable[[T], Awaitable[None]]]
+    ) -> None:
+        """Cancel every task except the winner and clean up losers that completed anyway."""
+        losers = [task for task in tasks if task is not winner]
+        for task in losers:
+            task.cancel()
+        await asyncio.gather(*losers, return_exceptions=True)
+        if discard is None:
+            return
+        for task in losers:
+            if not task.cancelled() and task.exception() is None:
+                await discard(task.result())
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Report hedging counters and latency percentiles per primary model.
+
+        ``tail_saved_seconds`` compares the p99 of primary requests with the
+        p99 callers saw. Primary requests that lost the race are counted at the
+        time they were cancelled, short of their real latency, so the saving is
+        a lower bound.
+        """
+        report = {}
+        for key, stats in self._stats.items():
+            primary = stats.primary_latency.as_dict()
+            observed = stats.latency.as_dict()
+            report[key] = {
+                "requests": stats.requests,
+                "hedged": stats.hedged,
+                "failovers": stats.failovers,
+                "backup_wins": stats.backup_wins,
+                "trigger_rate": stats.hedged / stats.requests if stats.requests else 0.0,
+                "budget_seconds": self.budget_seconds(key),
+                "primary_latency": primary,
+                "latency": observed,
+                "tail_saved_seconds": max(0.0, primary["p99_seconds"] - observed["p99_seconds"]),
+            }
+        return report
+
+
+@dataclass
+class _HeldStream:
+    """
+    A model stream kept open by a task of its own.
+
+    The task enters the stream's context and, once released, exits it, so the
+    provider's cancel scopes are entered and exited in the same task.
+
+    Attributes:
+        stream: The open stream
+        task: Task holding the stream's context
+        release: Set to let the task close the stream
+    """
+    stream: StreamedResponse
+    task: "asyncio.Task[None]"
+    release: asyncio.Event
+
+    async def close(self) -> None:
+        """Close the stream and wait for its task; errors while closing are raised."""
+        self.release.set()
+        await self.task
+
+
+class HedgedModel(WrapperModel):
+    """Model wrapper that hedges slow requests to the wrapped model with a backup model."""
+
+    def __init__(self, wrapped: Model, backup: Model, hedger: Hedger, key: str):
+        super().__init__(wrapped)
+        self.backup = backup
+        self.hedger = hedger
+        self.key = key
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+    ) -> tuple[ModelResponse, Usage]:
+        # Time to a full response; kept apart from time to first chunk, which is much shorter
+        return await self.hedger.race(
+            f"{self.key}:request",
+            lambda: self.wrapped.request(messages, model_settings, model_request_parameters),
+            lambda: self.backup.request(messages, model_settings, model_request_parameters),
+        )
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+    ) -> AsyncIterator[StreamedResponse]:
+        # Opening a provider stream waits for its first chunk, so the race is on time to first token
+        async def open_stream(model: Model) -> _HeldStream:
+            opened: "asyncio.Future[StreamedResponse]" = asyncio.get_running_loop().create_future()
+            release = asyncio.Event()
+
+            async def hold() -> None:
+                try:
+                    async with model.request_stream(messages, model_settings, model_request_parameters) as stream:
+                        opened.set_result(stream)
+                        await release.wait()
+                except BaseException as error:
+                    if not opened.done():
+                        if isinstance(error, asyncio.CancelledError):
+                            opened.cancel()
+                        else:
+                            opened.set_exception(error)
+                    raise
+
+            task = asyncio.ensure_future(hold())
+            try:
+                # Shielded: a cancelled race must stop the task, not just this wait
+                stream = await asyncio.shield(opened)
+            except BaseException:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                raise
+            return _HeldStream(stream=stream, task=task, release=release)
+
+        async def close_stream(held: _HeldStream) -> None:
+            await held.close()
+
+        held = await self.hedger.race(
+            f"{self.key}:stream",
+            lambda: open_stream(self.wrapped),
+            lambda: open_stream(self.backup),
+            discard=close_stream,
+        )
+        try:
+            yield held.stream
+        except BaseException:
+            # The consumer failed or was cancelled: stop reading rather than drain the stream
+            held.task.cancel()
+            await asyncio.gather(held.task, return_exceptions=True)
+            raise
+        await held.close()
+
+
+hedger = Hedger(
+    percentile=settings.HEDGE_PERCENTILE,
+    min_samples=settings.HEDGE_MIN_SAMPLES,
+    initial_delay_seconds=settings.HEDGE_INITIAL_DELAY_SECONDS,
+    min_delay_seconds=settings.HEDGE_MIN_DELAY_SECONDS,
+)
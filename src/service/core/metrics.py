@@ -0,0 +1,332 @@
+"""In-process metric primitives shared by service components."""
+
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Generic, Iterator, List, Sequence, Tuple, TypeVar
+
+
+@dataclass
+class LatencyStats:
+    """
+    Running latency statistics for a single operation.
+
+    Attributes:
+        count: Number of observations recorded
+        total_seconds: Sum of all observed durations
+        max_seconds: Largest observed duration
+        last_seconds: Most recently observed duration
+    """
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seconds: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record a single duration in seconds."""
+        self.count += 1
+        self.total_seconds += seconds
+        self.last_seconds = seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+
+    @property
+    def avg_seconds(self) -> float:
+        """Average observed duration, or 0.0 when nothing was recorded."""
+        return self.total_seconds / self.count if self.count else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        """Export the statistics as a flat dictionary."""
+        return {
+            "count": self.count,
+            "avg_seconds": self.avg_seconds,
+            "max_seconds": self.max_seconds,
+            "last_seconds": self.last_seconds,
+        }
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile of a list of samples.
+
+    Args:
+        samples: Observed values
+        q: Percentile between 0 and 100
+
+    Returns:
+        The percentile, or 0.0 when there are no samples
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class LatencyWindow:
+    """Sliding window of the most recent latencies for percentile estimates."""
+
+    def __init__(self, size: int = 500):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def observe(self, seconds: float) -> None:
+        """Record a single duration in seconds."""
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        """Percentile ``q`` (0-100) of the samples in the window."""
+        return percentile(list(self.samples), q)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Export p50/p95/p99 and the sample count."""
+        samples = list(self.samples)
+        return {
+            "count": len(samples),
+            "p50_seconds": percentile(samples, 50),
+            "p95_seconds": percentile(samples, 95),
+            "p99_seconds": percentile(samples, 99),
+        }
+
+
+# Prometheus exposition
+#
+# The service runs on one event loop, so metric updates never race and need no
+# locks: an update is a dict lookup and an addition. Rendering walks the
+# families in registration order.
+
+# Request and query latencies from 1ms to 1 minute
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Tokens per agent run
+TOKEN_BUCKETS = (64, 256, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072)
+
+LabelValues = Tuple[str, ...]
+C = TypeVar("C")
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Render ``{name="value",...}``, or nothing without labels."""
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value; whole numbers without a fraction."""
+    if value == math.inf:
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricFamily(ABC, Generic[C]):
+    """
+    A named metric with one child per combination of label values.
+
+    Attributes:
+        name: Metric name
+        documentation: Help text
+        label_names: Names of the labels every child is identified by
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._children: Dict[LabelValues, C] = {}
+        if not self.label_names:
+            # A family without labels has exactly one child, reported from the start
+            self.labels()
+
+    @abstractmethod
+    def _new_child(self) -> C:
+        """Create the child of one combination of label values."""
+
+    def labels(self, *values: object) -> C:
+        """Get the child for the given label values, created on first use."""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {key}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    @abstractmethod
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        """Yield ``(name, labels, value)`` for every sample of the family."""
+
+    def render(self) -> List[str]:
+        """Render the family in the Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples())
+        return lines
+
+
+class CounterValue:
+    """A monotonically increasing count."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Add to the count."""
+        self.value += amount
+
+    def set(self, value: float) -> None:
+        """Mirror a cumulative count kept by another component."""
+        self.value = value
+
+
+class Counter(MetricFamily[CounterValue]):
+    """Counter family; sample names end in ``_total``."""
+
+    type_name = "counter"
+
+    def _new_child(self) -> CounterValue:
+        return CounterValue()
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        for key, child in self._children.items():
+            yield f"{self.name}_total", _format_labels(self.label_names, key), child.value
+
+
+class GaugeValue:
+    """A value that goes up and down."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Raise the value."""
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Lower the value."""
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        """Replace the value."""
+        self.value = value
+
+
+class Gauge(MetricFamily[GaugeValue]):
+    """Gauge family."""
+
+    type_name = "gauge"
+
+    def _new_child(self) -> GaugeValue:
+        return GaugeValue()
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        for key, child in self._children.items():
+            yield self.name, _format_labels(self.label_names, key), child.value
+
+
+class HistogramValue:
+    """Observation counts per bucket, plus their sum and count."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # One count per bound plus the +Inf bucket; stored per bucket, made cumulative when rendered
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(MetricFamily[HistogramValue]):
+    """Histogram family with fixed bucket bounds."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramValue:
+        return HistogramValue(self.buckets)
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                labels = _format_labels(self.label_names + ("le",), key + (_format_value(bound),))
+                yield f"{self.name}_bucket", labels, cumulative
+            labels = _format_labels(self.label_names, key)
+            yield f"{self.name}_sum", labels, child.sum
+            yield f"{self.name}_count", labels, child.count
+
+
+class MetricsRegistry:
+    """The metric families exposed by one process."""
+
+    def __init__(self) -> None:
+        self._families: Dict[str, MetricFamily[Any]] = {}
+
+    def register(self, family: MetricFamily[C]) -> MetricFamily[C]:
+        """Add a family; names must be unique."""
+        if family.name in self._families:
+            raise ValueError(f"Metric {family.name} is already registered")
+        self._families[family.name] = family
+        return family
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        """Create and register a counter."""
+        family = Counter(name, documentation, label_names)
+        self.register(family)
+        return family
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        """Create and register a gauge."""
+        family = Gauge(name, documentation, label_names)
+        self.register(family)
+        return family
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS
+    ) -> Histogram:
+        """Create and register a histogram."""
+        family = Histogram(name, documentation, label_names, buckets)
+        self.register(family)
+        return family
+
+    def render(self) -> str:
+        """Render every family in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for family in self._families.values():
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
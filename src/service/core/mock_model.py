@@ -0,0 +1,188 @@
+"""Local mock model for load testing without a model provider.
+
+With ``MOCK_MODEL_ENABLED`` the agent registry runs every agent on a
+``FunctionModel`` that behaves like a provider without calling one. It waits
+for the configured time to first token, streams its answer in small chunks
+at a fixed inter-token latency, and calls the agent's tools in a configurable
+pattern before it answers. The final answer is a valid structured output for
+the agent, so the API, database and streaming path run exactly as in
+production. The answers are meaningless, which makes the mock useful for
+measuring the service itself, not the agent.
+"""
+
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Sequence, Union
+
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart, ToolCallPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, DeltaToolCalls, FunctionModel
+
+from src.service.core.settings import settings
+
+# Characters per streamed chunk, roughly one token of English text
+CHARS_PER_TOKEN = 4
+
+FILLER_WORDS = (
+    "please", "review", "your", "account", "activity", "and", "contact", "us", "if",
+    "anything", "looks", "unfamiliar", "we", "are", "happy", "to", "help", "today",
+)
+
+
+def parse_tool_pattern(pattern: str) -> List[List[str]]:
+    """
+    Parse a tool-call pattern into the tool calls of each model request.
+
+    Requests are separated by commas; tools called in parallel within one
+    request are joined with ``+``. For example
+    ``get_balance+get_recent_transactions,block_customer_card`` first calls two
+    tools at once, then one more, and answers on the third request.
+
+    Args:
+        pattern: The pattern, empty to answer right away
+
+    Returns:
+        Tool names per request
+    """
+    return [
+        [name.strip() for name in step.split("+") if name.strip()]
+        for step in pattern.split(",")
+        if step.strip()
+    ]
+
+
+@dataclass
+class MockModelConfig:
+    """
+    Behaviour of the mock model.
+
+    Attributes:
+        first_token_seconds: Delay before the first chunk of every response
+        inter_token_seconds: Delay between two streamed chunks
+        output_words: Words in the answer's text field
+        tool_pattern: Tools to call per model request before answering
+    """
+    first_token_seconds: float = 0.3
+    inter_token_seconds: float = 0.02
+    output_words: int = 40
+    tool_pattern: List[List[str]] = field(default_factory=list)
+
+    @classmethod
+    def from_settings(cls) -> "MockModelConfig":
+        """Build the configuration from the ``MOCK_MODEL_*`` settings."""
+        return cls(
+            first_token_seconds=settings.MOCK_MODEL_FIRST_TOKEN_SECONDS,
+            inter_token_seconds=settings.MOCK_MODEL_INTER_TOKEN_SECONDS,
+            output_words=settings.MOCK_MODEL_OUTPUT_WORDS,
+            tool_pattern=parse_tool_pattern(settings.MOCK_MODEL_TOOL_PATTERN),
+        )
+
+
+def _current_run(messages: Sequence[ModelMessage]) -> List[ModelMessage]:
+    """Messages since the latest user prompt, i.e. those of the run being answered."""
+    for index in range(len(messages) - 1, -1, -1):
+        message = messages[index]
+        if isinstance(message, ModelRequest) and any(isinstance(part, UserPromptPart) for part in message.parts):
+            return list(messages[index:])
+    return list(messages)
+
+
+def _latest_prompt(messages: Sequence[ModelMessage]) -> str:
+    """Text of the latest user prompt."""
+    for message in reversed(messages):
+        if isinstance(message, ModelRequest):
+            for part in message.parts:
+                if isinstance(part, UserPromptPart) and isinstance(part.content, str):
+                    return part.content
+    return ""
+
+
+class MockResponder:
+    """Decides what the mock model answers and how long it takes."""
+
+    def __init__(self, config: MockModelConfig):
+        self.config = config
+
+    def _tool_calls(self, messages: Sequence[ModelMessage], info: AgentInfo) -> List[str]:
+        """Tools to call in this request, or an empty list to answer."""
+        step = sum(isinstance(message, ModelResponse) for message in _current_run(messages))
+        if step >= len(self.config.tool_pattern):
+            return []
+        available = {tool.name for tool in info.function_tools}
+        return [name for name in self.config.tool_pattern[step] if name in available]
+
+    def _output(self, messages: Sequence[ModelMessage]) -> Dict[str, Any]:
+        """A valid support answer whose content depends only on the prompt."""
+        prompt = _latest_prompt(messages)
+        digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+        words = [FILLER_WORDS[(digest + index) % len(FILLER_WORDS)] for index in range(self.config.output_words)]
+        called = {
+            part.tool_name
+            for message in _current_run(messages) if isinstance(message, ModelResponse)
+            for part in message.parts if isinstance(part, ToolCallPart)
+        }
+        return {
+            "support_advice": " ".join(words).capitalize() + ".",
+            "block_card": "block_customer_card" in called,
+            "risk_level": digest % 11,
+            "follow_up_actions": ["Review recent transactions"],
+        }
+
+    def _answer_text(self, messages: Sequence[ModelMessage], info: AgentInfo) -> str:
+        """The answer as the output tool's JSON arguments, or as text for agents without one."""
+        output = self._output(messages)
+        if info.output_tools:
+            return json.dumps(output)
+        return str(output["support_advice"])
+
+    async def respond(self, messages: List[ModelMessage], info: AgentInfo) -> ModelResponse:
+        """Answer a non-streamed request after the time a full stream would take."""
+        tools = self._tool_calls(messages, info)
+        if tools:
+            await asyncio.sleep(self.config.first_token_seconds)
+            return ModelResponse(parts=[ToolCallPart(name, {}) for name in tools])
+
+        text = self._answer_text(messages, info)
+        chunks = max(1, -(-len(text) // CHARS_PER_TOKEN))
+        await asyncio.sleep(self.config.first_token_seconds + (chunks - 1) * self.config.inter_token_seconds)
+        if info.output_tools:
+            return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, text)])
+        return ModelResponse(parts=[TextPart(text)])
+
+    async def stream(
+        self,
+        messages: List[ModelMessage],
+        info: AgentInfo
+    ) -> AsyncIterator[Union[str, DeltaToolCalls]]:
+        """Stream a response chunk by chunk at the configured latencies."""
+        await asyncio.sleep(self.config.first_token_seconds)
+        tools = self._tool_calls(messages, info)
+        if tools:
+            yield {index: DeltaToolCall(name=name, json_args="{}") for index, name in enumerate(tools)}
+            return
+
+        text = self._answer_text(messages, info)
+        for offset in range(0, len(text), CHARS_PER_TOKEN):
+            if offset:
+                await asyncio.sleep(self.config.inter_token_seconds)
+            chunk = text[offset:offset + CHARS_PER_TOKEN]
+            if info.output_tools:
+                name = info.output_tools[0].name if offset == 0 else None
+                yield {0: DeltaToolCall(name=name, json_args=chunk)}
+            else:
+                yield chunk
+
+
+def build_mock_model(config: MockModelConfig) -> FunctionModel:
+    """
+    Create a mock model with the given behaviour.
+
+    Args:
+        config: Latencies, output size and tool-call pattern
+
+    Returns:
+        A model serving both plain and streamed runs
+    """
+    responder = MockResponder(config)
+    return FunctionModel(responder.respond, stream_function=responder.stream, model_name="mock")
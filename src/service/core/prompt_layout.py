@@ -0,0 +1,167 @@
+"""Prompt layout that keeps provider prefix caches warm.
+
+Providers such as OpenAI and Anthropic reuse the computation for a prompt
+prefix they saw recently, which makes it cheaper and faster. A prefix only
+matches if it is byte-identical, so everything that is the same for every
+request has to come first and must be serialized the same way each time.
+
+With ``PROMPT_LAYOUT=stable`` every model request is normalized before it is
+sent:
+
+* Tool schemas are sorted by name, so the tool block does not depend on the
+  order tools were registered or prepared in.
+* Static system prompts come before per-customer ones (``dynamic=True``
+  system prompt functions such as ``add_customer_info``), so the shared
+  instructions form a prefix common to all customers.
+
+The history itself is replayed from the database in insertion order (see
+``MESSAGE_ORDER``), so the previous turn of a thread is always a prefix of the
+next one. Cached input tokens reported by the provider are counted per run to
+track the hit rate.
+"""
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional
+
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, SystemPromptPart
+from pydantic_ai.models import ModelRequestParameters, StreamedResponse
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+from pydantic_ai.usage import Usage
+
+# Usage detail keys under which providers report input tokens read from their prompt cache
+CACHED_TOKEN_DETAILS = ("cached_tokens", "cache_read_input_tokens")
+
+
+def cached_tokens(usage: Usage) -> int:
+    """
+    Input tokens a provider served from its prompt cache.
+
+    Args:
+        usage: Usage of a request or run
+
+    Returns:
+        Cached input tokens, or 0 when the provider did not report any
+    """
+    details = usage.details or {}
+    return sum(details.get(key, 0) for key in CACHED_TOKEN_DETAILS)
+
+
+@dataclass
+class PromptCacheStats:
+    """
+    Provider prompt cache counters over agent runs.
+
+    Attributes:
+        runs: Agent runs observed
+        runs_with_hits: Runs with at least one cached input token
+        request_tokens: Input tokens sent
+        cached_tokens: Input tokens the provider served from its cache
+        last_cached_tokens: Cached input tokens of the most recent run
+    """
+    runs: int = 0
+    runs_with_hits: int = 0
+    request_tokens: int = 0
+    cached_tokens: int = 0
+    last_cached_tokens: int = 0
+
+    def observe(self, usage: Usage) -> int:
+        """
+        Record the usage of one agent run.
+
+        Args:
+            usage: Total usage of the run
+
+        Returns:
+            Cached input tokens of the run
+        """
+        cached = cached_tokens(usage)
+        self.runs += 1
+        self.request_tokens += usage.request_tokens or 0
+        self.cached_tokens += cached
+        self.last_cached_tokens = cached
+        if cached:
+            self.runs_with_hits += 1
+        return cached
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of input tokens served from the cache, or 0.0 when nothing was sent."""
+        return self.cached_tokens / self.request_tokens if self.request_tokens else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Export the counters and hit rate as a flat dictionary."""
+        return {
+            "runs": self.runs,
+            "runs_with_hits": self.runs_with_hits,
+            "request_tokens": self.request_tokens,
+            "cached_tokens": self.cached_tokens,
+            "last_cached_tokens": self.last_cached_tokens,
+            "hit_rate": self.hit_rate,
+        }
+
+
+def stable_messages(messages: List[ModelMessage]) -> List[ModelMessage]:
+    """
+    Put static system prompts before per-customer ones in every request.
+
+    The agent's messages are not modified, so what is saved to the thread stays
+    exactly what the agent produced.
+
+    Args:
+        messages: Messages about to be sent to the model
+
+    Returns:
+        The messages with the system prompt parts of each request reordered
+    """
+    ordered: List[ModelMessage] = []
+    for message in messages:
+        if isinstance(message, ModelRequest) and any(
+            isinstance(part, SystemPromptPart) and part.dynamic_ref for part in message.parts
+        ):
+            static = [part for part in message.parts if isinstance(part, SystemPromptPart) and not part.dynamic_ref]
+            dynamic = [part for part in message.parts if isinstance(part, SystemPromptPart) and part.dynamic_ref]
+            rest = [part for part in message.parts if not isinstance(part, SystemPromptPart)]
+            message = replace(message, parts=[*static, *dynamic, *rest])
+        ordered.append(message)
+    return ordered
+
+
+def stable_parameters(parameters: ModelRequestParameters) -> ModelRequestParameters:
+    """Sort function and output tool schemas by name."""
+    return replace(
+        parameters,
+        function_tools=sorted(parameters.function_tools, key=lambda tool: tool.name),
+        output_tools=sorted(parameters.output_tools, key=lambda tool: tool.name),
+    )
+
+
+class StablePromptModel(WrapperModel):
+    """Model wrapper sending every request in the stable prompt layout."""
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+    ) -> tuple[ModelResponse, Usage]:
+        return await self.wrapped.request(
+            stable_messages(messages), model_settings, stable_parameters(model_request_parameters)
+        )
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+    ) -> AsyncIterator[StreamedResponse]:
+        async with self.wrapped.request_stream(
+            stable_messages(messages), model_settings, stable_parameters(model_request_parameters)
+        ) as stream:
+            yield stream
+
+
+prompt_cache_stats = PromptCacheStats()
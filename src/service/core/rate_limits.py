@@ -0,0 +1,241 @@
+"""Client-side scheduling against provider rate limits.
+
+Each configured model gets two token buckets that refill continuously: one
+for requests per minute and one for tokens per minute. Before a model request
+is dispatched, its prompt size is estimated from the messages and tool
+definitions and taken from the buckets, waiting if they are empty. Once the
+provider reports the actual usage, the difference is returned to (or taken
+from) the token bucket, so estimation errors do not accumulate.
+
+Requests for the same model are dispatched in arrival order, which keeps
+throughput just under the provider limits instead of finding them through
+429 responses and retries.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+from pydantic_ai.messages import ModelMessage, ModelResponse
+from pydantic_ai.models import Model, ModelRequestParameters, StreamedResponse
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+from pydantic_ai.usage import Usage
+
+from src.service.core.metrics import LatencyStats
+from src.service.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a token in characters for English text and JSON
+CHARS_PER_TOKEN = 4
+
+# Fixed per-message overhead the providers add for roles and separators
+TOKENS_PER_MESSAGE = 4
+
+
+def model_key(model: Model) -> str:
+    """Key used to look up a model's limits, e.g. ``openai:gpt-4o``."""
+    return f"{model.system}:{model.model_name}"
+
+
+def estimate_request_tokens(
+    messages: Sequence[ModelMessage],
+    model_settings: Optional[ModelSettings],
+    parameters: Optional[ModelRequestParameters],
+    output_tokens: int
+) -> int:
+    """
+    Estimate the tokens a model request will count against the TPM limit.
+
+    Args:
+        messages: Messages sent to the model
+        model_settings: Settings of the request; ``max_tokens`` bounds the output
+        parameters: Tool definitions sent with the request
+        output_tokens: Expected output size when ``max_tokens`` is not set
+
+    Returns:
+        Estimated prompt plus output tokens
+    """
+    characters = 0
+    for message in messages:
+        for part in message.parts:
+            content = getattr(part, "content", None)
+            if content is None:
+                content = getattr(part, "args", None)
+            characters += len(content if isinstance(content, str) else json.dumps(content, default=str))
+
+    if parameters is not None:
+        for tool in [*parameters.function_tools, *parameters.output_tools]:
+            characters += len(tool.name) + len(tool.description) + len(json.dumps(tool.parameters_json_schema))
+
+    max_tokens = (model_settings or {}).get("max_tokens")
+    prompt_tokens = characters // CHARS_PER_TOKEN + TOKENS_PER_MESSAGE * len(messages)
+    return prompt_tokens + (max_tokens or output_tokens)
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to one minute of capacity."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_seconds(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken; amounts above capacity wait for a full bucket."""
+        self._refill()
+        needed = min(amount, self.capacity)
+        return 0.0 if self.level >= needed else (needed - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        """Take ``amount``; a negative amount returns capacity. The level may go below zero."""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+@dataclass
+class ModelRateStats:
+    """
+    Counters for one rate-limited model.
+
+    Attributes:
+        requests: Requests dispatched
+        estimated_tokens: Sum of token estimates taken before dispatch
+        actual_tokens: Sum of tokens reported by the provider
+        wait: Time requests waited for bucket capacity
+    """
+    requests: int = 0
+    estimated_tokens: int = 0
+    actual_tokens: int = 0
+    wait: LatencyStats = field(default_factory=LatencyStats)
+
+
+@dataclass
+class _ModelLimiter:
+    """Buckets, dispatch lock and counters of one model."""
+    requests: TokenBucket
+    tokens: TokenBucket
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    stats: ModelRateStats = field(default_factory=ModelRateStats)
+
+
+class RateScheduler:
+    """Per-model RPM/TPM token buckets shared by every agent run in the process."""
+
+    def __init__(self, limits: Mapping[str, Mapping[str, int]]):
+        self._limiters: Dict[str, _ModelLimiter] = {
+            key: _ModelLimiter(requests=TokenBucket(limit["rpm"]), tokens=TokenBucket(limit["tpm"]))
+            for key, limit in limits.items()
+        }
+
+    def is_limited(self, key: str) -> bool:
+        """Whether limits are configured for a model key."""
+        return key in self._limiters
+
+    async def acquire(self, key: str, tokens: int) -> None:
+        """
+        Wait until one request and ``tokens`` tokens are available, then take them.
+
+        Args:
+            key: Model key, see ``model_key``
+            tokens: Estimated tokens of the request
+        """
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            return
+
+        start = time.perf_counter()
+        async with limiter.lock:
+            while True:
+                wait = max(limiter.requests.wait_seconds(1), limiter.tokens.wait_seconds(tokens))
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            limiter.requests.take(1)
+            limiter.tokens.take(tokens)
+
+        limiter.stats.requests += 1
+        limiter.stats.estimated_tokens += tokens
+        limiter.stats.wait.observe(time.perf_counter() - start)
+
+    def settle(self, key: str, estimated: int, actual: Optional[int]) -> None:
+        """
+        Correct the token bucket once the provider reported the actual usage.
+
+        Args:
+            key: Model key, see ``model_key``
+            estimated: Tokens taken by ``acquire``
+            actual: Tokens reported by the provider, None if unknown
+        """
+        limiter = self._limiters.get(key)
+        if limiter is None or actual is None:
+            return
+        limiter.tokens.take(actual - estimated)
+        limiter.stats.actual_tokens += actual
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Report bucket levels and counters per model."""
+        return {
+            key: {
+                "requests_available": round(limiter.requests.level, 1),
+                "tokens_available": round(limiter.tokens.level),
+                "requests": limiter.stats.requests,
+                "estimated_tokens": limiter.stats.estimated_tokens,
+                "actual_tokens": limiter.stats.actual_tokens,
+                "wait": limiter.stats.wait.as_dict(),
+            }
+            for key, limiter in self._limiters.items()
+        }
+
+
+class RateLimitedModel(WrapperModel):
+    """Model wrapper that schedules every request through a ``RateScheduler``."""
+
+    def __init__(self, wrapped: Model, scheduler: RateScheduler, output_tokens: int):
+        super().__init__(wrapped)
+        self.scheduler = scheduler
+        self.output_tokens = output_tokens
+        self.key = model_key(self.wrapped)
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+    ) -> tuple[ModelResponse, Usage]:
+        estimated = estimate_request_tokens(messages, model_settings, model_request_parameters, self.output_tokens)
+        await self.scheduler.acquire(self.key, estimated)
+        response, usage = await self.wrapped.request(messages, model_settings, model_request_parameters)
+        self.scheduler.settle(self.key, estimated, usage.total_tokens or None)
+        return response, usage
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+    ) -> AsyncIterator[StreamedResponse]:
+        estimated = estimate_request_tokens(messages, model_settings, model_request_parameters, self.output_tokens)
+        await self.scheduler.acquire(self.key, estimated)
+        async with self.wrapped.request_stream(messages, model_settings, model_request_parameters) as response_stream:
+            try:
+                yield response_stream
+            finally:
+                # Usage arrives with the last chunk; an interrupted stream keeps the estimate
+                self.scheduler.settle(self.key, estimated, response_stream.usage().total_tokens or None)
+
+
+rate_scheduler = RateScheduler(settings.MODEL_RATE_LIMITS)
@@ -0,0 +1,229 @@
+"""Exact-match response cache for repeatable agent queries.
+
+A cached answer is only reused when everything that could change it is the
+same: the agent type, the normalized query text, the recent conversation
+history and a fingerprint of the data the agent's tools can read. Runs that
+called a tool which is not marked ``read_only`` on the agent (such as blocking
+a card) are never stored.
+
+On a hit the original run's messages are replayed with fresh timestamps and
+tool call IDs, so the thread is persisted exactly like a normal turn.
+"""
+
+import copy
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import uuid4
+
+from pydantic_ai.messages import (
+    ModelMessage, ModelResponse, RetryPromptPart, ToolCallPart, ToolReturnPart, UserPromptPart
+)
+
+from src.common.stats import HitRateStats
+from src.service.core.agent_registry import agent_registry
+from src.service.core.settings import settings
+from src.service.models.api.internal import AgentType
+
+_WORD_PATTERN = re.compile(r"\w+(?:'\w+)*", re.UNICODE)
+
+
+@dataclass
+class CachedResponse:
+    """
+    A cached agent answer.
+
+    Attributes:
+        output: The agent's output
+        messages: New messages produced by the original run
+        expires_at: Monotonic time after which the entry is stale
+    """
+    output: Any
+    messages: List[ModelMessage]
+    expires_at: float
+
+
+def normalize_query(query: str) -> str:
+    """Normalize query text so trivial case, spacing and punctuation changes share an entry."""
+    return " ".join(_WORD_PATTERN.findall(query.casefold()))
+
+
+def history_digest(messages: Sequence[ModelMessage], window: int) -> str:
+    """
+    Hash the content of the most recent messages, ignoring timestamps and IDs.
+
+    Args:
+        messages: Conversation history
+        window: Number of most recent messages to include
+
+    Returns:
+        Hex digest of the recent history
+    """
+    recent = messages[-window:] if window > 0 else []
+    content = [
+        [message.kind] + [
+            [part.part_kind, getattr(part, "tool_name", None), getattr(part, "content", None), getattr(part, "args", None)]
+            for part in message.parts
+        ]
+        for message in recent
+    ]
+    return hashlib.sha256(json.dumps(content, default=str).encode("utf-8")).hexdigest()
+
+
+def _replay_messages(messages: Sequence[ModelMessage], query: str) -> List[ModelMessage]:
+    """Copy cached messages for a new turn with the caller's query, new timestamps and tool call IDs."""
+    now = datetime.now(timezone.utc)
+    tool_call_ids: Dict[str, str] = {}
+    replayed = copy.deepcopy(list(messages))
+
+    for message in replayed:
+        if isinstance(message, ModelResponse):
+            message.timestamp = now
+        for part in message.parts:
+            if hasattr(part, "timestamp"):
+                part.timestamp = now
+            if isinstance(part, UserPromptPart):
+                part.content = query
+            if isinstance(part, (ToolCallPart, ToolReturnPart, RetryPromptPart)) and part.tool_call_id:
+                part.tool_call_id = tool_call_ids.setdefault(part.tool_call_id, f"pyd_ai_{uuid4().hex}")
+
+    return replayed
+
+
+class ResponseCache:
+    """In-memory LRU cache of agent answers with a per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, history_window: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.history_window = history_window
+        self.stats = HitRateStats()
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def make_key(
+        self,
+        agent_type: AgentType,
+        query: str,
+        message_history: Sequence[ModelMessage],
+        deps: Any
+    ) -> Optional[str]:
+        """
+        Build the cache key for a query.
+
+        Args:
+            agent_type: Type of agent answering the query
+            query: The user's query
+            message_history: Conversation history passed to the agent
+            deps: Agent dependencies; must provide ``cache_fingerprint()``
+
+        Returns:
+            Cache key, or None if the dependencies cannot be fingerprinted
+        """
+        fingerprint = getattr(deps, "cache_fingerprint", None)
+        if fingerprint is None:
+            return None
+
+        parts = [
+            agent_type.value,
+            normalize_query(query),
+            history_digest(message_history, self.history_window),
+            await fingerprint(),
+        ]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str, query: str) -> Optional[CachedResponse]:
+        """
+        Look up a cached answer.
+
+        Args:
+            key: Cache key from ``make_key``
+            query: The user's query, written into the replayed messages
+
+        Returns:
+            Copy of the cached answer ready to persist, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            entry = None
+
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return CachedResponse(
+            output=copy.deepcopy(entry.output),
+            messages=_replay_messages(entry.messages, query),
+            expires_at=entry.expires_at,
+        )
+
+    @staticmethod
+    def is_cacheable(agent_type: AgentType, messages: Sequence[ModelMessage]) -> bool:
+        """Check that every tool called during a run is safe to skip on a cache hit."""
+        # Output tools only deliver the answer, so they have no side effects either
+        allowed = agent_registry.read_only_tool_names(agent_type) | agent_registry.output_tool_names(agent_type)
+        for message in messages:
+            if not isinstance(message, ModelResponse):
+                continue
+            for part in message.parts:
+                if isinstance(part, ToolCallPart) and part.tool_name not in allowed:
+                    return False
+        return True
+
+    def put(
+        self,
+        key: str,
+        agent_type: AgentType,
+        output: Any,
+        messages: Sequence[ModelMessage]
+    ) -> bool:
+        """
+        Store an answer unless the caching policy forbids it.
+
+        Args:
+            key: Cache key from ``make_key``
+            agent_type: Type of agent that produced the answer
+            output: The agent's output
+            messages: New messages produced by the run
+
+        Returns:
+            True if the answer was stored
+        """
+        if not self.is_cacheable(agent_type, messages):
+            self.stats.uncacheable += 1
+            return False
+
+        self._entries[key] = CachedResponse(
+            output=copy.deepcopy(output),
+            messages=copy.deepcopy(list(messages)),
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        self._entries.move_to_end(key)
+        self.stats.stores += 1
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+        return True
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    history_window=settings.RESPONSE_CACHE_HISTORY_MESSAGES,
+)
@@ -0,0 +1,60 @@
+"""JSON responses encoded by pydantic-core.
+
+For a returned model, FastAPI validates it against the endpoint's response
+model again, converts it to plain Python with ``jsonable_encoder`` and encodes
+that with ``json.dumps``. Endpoints instead return the bytes of the type
+adapters below, which pydantic-core encodes in one pass. The adapters are
+built once at import; the endpoints keep their ``response_model`` for the
+OpenAPI schema.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+from src.service.models.api import (
+    AgentJobResponse,
+    AgentResponse,
+    ThreadDetailResponse,
+    ThreadResponse,
+    ThreadSearchResult,
+    UsageReport,
+)
+
+THREAD = TypeAdapter(ThreadResponse)
+THREAD_LIST = TypeAdapter(List[ThreadResponse])
+THREAD_DETAIL = TypeAdapter(ThreadDetailResponse)
+THREAD_SEARCH_RESULTS = TypeAdapter(List[ThreadSearchResult])
+AGENT_RESPONSE = TypeAdapter(AgentResponse)
+AGENT_JOB = TypeAdapter(AgentJobResponse)
+USAGE_REPORT = TypeAdapter(UsageReport)
+
+
+def json_response(
+    adapter: TypeAdapter[Any],
+    content: Any,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Encode a response body with its type adapter.
+
+    FastAPI does not add headers set on an injected ``Response`` to a returned
+    response, so pass them here.
+
+    Args:
+        adapter: Adapter of the body's type
+        content: The body, already of the adapter's type
+        status_code: HTTP status of the response
+        headers: Extra response headers
+
+    Returns:
+        Response with the JSON body
+    """
+    return Response(
+        content=adapter.dump_json(content),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
@@ -0,0 +1,80 @@
+"""Prometheus metric families of the service.
+
+Components update these as they work. Gauges that mirror the state of other
+components, such as cache hit ratios and queue depths, are refreshed when the
+metrics endpoint is scraped.
+"""
+
+from src.service.core.metrics import TOKEN_BUCKETS, MetricsRegistry
+
+metrics_registry = MetricsRegistry()
+
+# HTTP
+http_request_duration = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request until its response body was sent, per route",
+    ("method", "route", "status"),
+)
+active_streams = metrics_registry.gauge(
+    "agent_active_streams",
+    "Agent response streams currently open",
+)
+
+# Agent runs
+agent_run_duration = metrics_registry.histogram(
+    "agent_run_duration_seconds",
+    "Time from receiving an agent turn until its answer was ready",
+    ("agent_type", "streamed"),
+)
+agent_model_duration = metrics_registry.histogram(
+    "agent_model_duration_seconds",
+    "Time spent in the model run of an agent turn",
+    ("agent_type", "streamed"),
+)
+agent_tool_duration = metrics_registry.histogram(
+    "agent_tool_duration_seconds",
+    "Time from a tool call until its result; outcome is ok or retry",
+    ("agent_type", "tool", "outcome"),
+)
+agent_run_tokens = metrics_registry.histogram(
+    "agent_run_tokens",
+    "Tokens per agent run; kind is input, output or cached input",
+    ("agent_type", "kind"),
+    buckets=TOKEN_BUCKETS,
+)
+agent_runs = metrics_registry.counter(
+    "agent_runs",
+    "Agent runs, by whether the response cache answered them",
+    ("agent_type", "cached_response"),
+)
+
+# Database
+db_query_duration = metrics_registry.histogram(
+    "db_query_duration_seconds",
+    "Time to execute one SQL statement",
+    ("database", "operation"),
+)
+
+# Caches, refreshed on scrape
+cache_lookups = metrics_registry.counter(
+    "cache_lookups",
+    "Cache lookups by result; prompt counts input tokens",
+    ("cache", "result"),
+)
+cache_hit_ratio = metrics_registry.gauge(
+    "cache_hit_ratio",
+    "Share of lookups answered from the cache",
+    ("cache",),
+)
+
+# Queues, refreshed on scrape
+queue_depth = metrics_registry.gauge(
+    "queue_depth",
+    "Work waiting in each queue: admission waiters, queued agent jobs, turns waiting for a thread lock",
+    ("queue",),
+)
+in_progress = metrics_registry.gauge(
+    "in_progress",
+    "Work currently running: admitted agent runs, running agent jobs, threads with a turn",
+    ("kind",),
+)
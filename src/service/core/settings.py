@@ -1,6 +1,6 @@
 """API configuration settings."""
 
-from typing import List, Union
+from typing import Dict, List, Union
 
 from pydantic import Field, field_validator, AnyHttpUrl
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -20,6 +20,9 @@ class Settings(BaseSettings):
     API_BASE_URL: str = Field(default="http://localhost:8000", description="API base URL")
     API_KEY: str = Field(default="", description="API key for accessing the API")
     API_KEY_NAME: str = "X-API-Key"
+    # Operations endpoints (archive maintenance, usage across users); empty disables them
+    ADMIN_API_KEY: str = Field(default="", description="API key for operations endpoints")
+    ADMIN_API_KEY_NAME: str = "X-Admin-Key"
     # CORS
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
         
@@ -40,10 +43,88 @@ class Settings(BaseSettings):
     def SQLALCHEMY_DATABASE_URI(self) -> str:
         """Get the SQLite database URI."""
         return f"sqlite+aiosqlite:///{self.DB_PATH}"
-    
+
+    # Cold-thread archive
+    ARCHIVE_DB_PATH: str = Field(default="./sqlite_archive.db", description="SQLite archive database path")
+    ARCHIVE_IDLE_DAYS: int = Field(default=30, description="Archive threads idle for more than this many days")
+    ARCHIVE_INTERVAL_SECONDS: int = Field(default=0, description="Run the archival job every N seconds (0 disables)")
+    ARCHIVE_BATCH_SIZE: int = Field(default=100, description="Maximum threads archived per job run")
+
+    @property
+    def ARCHIVE_DATABASE_URI(self) -> str:
+        """Get the SQLite archive database URI."""
+        return f"sqlite+aiosqlite:///{self.ARCHIVE_DB_PATH}"
+
     # Agent
     OPENAI_API_KEY: str = Field(default="", description="OpenAI API key")
+    AGENT_PRELOAD: bool = Field(default=True, description="Load and warm up all agents at startup instead of on first use")
+    AGENT_WARMUP_CONNECT: bool = Field(default=False, description="Open model provider connections during warmup (one network request per agent)")
+
+    # Token usage and latency of every agent run, stored in the agent_runs table
+    USAGE_TRACKING_ENABLED: bool = Field(default=True, description="Record token usage and latency of agent runs")
+
+    # Prompt layout: "stable" sorts tool schemas and puts static instructions before per-customer data
+    PROMPT_LAYOUT: str = Field(default="stable", description="Layout of model prompts (stable, default)")
+
+    # Local mock model replacing the provider, for load tests without network access or cost
+    MOCK_MODEL_ENABLED: bool = Field(default=False, description="Run all agents on the local mock model")
+    MOCK_MODEL_FIRST_TOKEN_SECONDS: float = Field(default=0.3, description="Mock model delay before the first chunk of a response")
+    MOCK_MODEL_INTER_TOKEN_SECONDS: float = Field(default=0.02, description="Mock model delay between streamed chunks")
+    MOCK_MODEL_OUTPUT_WORDS: int = Field(default=40, description="Words in the mock model's answers")
+    MOCK_MODEL_TOOL_PATTERN: str = Field(default="", description="Tools the mock model calls before answering, e.g. get_balance+get_recent_transactions,block_customer_card")
+
+    # Provider rate limits per model, e.g. {"openai:gpt-4o": {"rpm": 500, "tpm": 30000}}
+    MODEL_RATE_LIMITS: Dict[str, Dict[str, int]] = Field(default={}, description="Requests and tokens per minute per model")
+    RATE_LIMIT_OUTPUT_TOKENS: int = Field(default=512, description="Expected output tokens per request when max_tokens is unset")
+
+    # Hedged requests: duplicate requests slower than a percentile of recent latencies to a backup model
+    HEDGE_ENABLED: bool = Field(default=False, description="Send slow model requests to a backup model as well")
+    HEDGE_BACKUP_MODEL: str = Field(default="", description="Backup model, e.g. openai:gpt-4o-mini")
+    HEDGE_PERCENTILE: float = Field(default=95.0, description="Percentile of recent primary latencies used as the hedging budget")
+    HEDGE_MIN_SAMPLES: int = Field(default=20, description="Primary latencies needed before the percentile budget is used")
+    HEDGE_INITIAL_DELAY_SECONDS: float = Field(default=5.0, description="Hedging budget until enough latencies were observed")
+    HEDGE_MIN_DELAY_SECONDS: float = Field(default=0.5, description="Lower bound of the hedging budget")
+
+    # Admission control for agent runs (ADMISSION_MAX_CONCURRENT=0 disables)
+    ADMISSION_MAX_CONCURRENT: int = Field(default=32, description="Maximum concurrent agent runs")
+    ADMISSION_MAX_PER_USER: int = Field(default=2, description="Maximum concurrent agent runs per user (0 = no per-user limit)")
+    ADMISSION_MAX_QUEUE: int = Field(default=100, description="Maximum agent requests waiting for a slot")
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = Field(default=30.0, description="Maximum time a request waits for a slot")
+
+    # Batch agent queries
+    BATCH_MAX_ITEMS: int = Field(default=100, description="Maximum items in one batch agent request")
+    BATCH_MAX_CONCURRENCY: int = Field(default=8, description="Maximum items of one batch running at once")
+
+    # Per-thread turn locks shared by all processes through the database
+    THREAD_LOCK_ENABLED: bool = Field(default=True, description="Run at most one agent turn per thread at a time")
+    THREAD_LOCK_TTL_SECONDS: float = Field(default=120.0, description="Lease after which a lock of a crashed process expires")
+    THREAD_LOCK_WAIT_SECONDS: float = Field(default=60.0, description="Maximum time a turn waits for its thread")
+    THREAD_LOCK_POLL_SECONDS: float = Field(default=0.05, description="First retry delay while another process holds the thread")
+
+    # Asynchronous agent jobs; by default they run in src/run_job_worker.py, not in the API process
+    JOB_WORKERS: int = Field(default=0, description="Agent job workers started with each API process")
+    JOB_MAX_ATTEMPTS: int = Field(default=3, description="Attempts before an agent job fails for good")
+    JOB_VISIBILITY_TIMEOUT_SECONDS: float = Field(default=120.0, description="Lease after which a running job is handed to another worker")
+    JOB_RETRY_BACKOFF_SECONDS: float = Field(default=5.0, description="Delay before the first retry, doubled for each later one")
+    JOB_POLL_INTERVAL_SECONDS: float = Field(default=1.0, description="How often idle workers and job streams check the job table")
+
+    # Agent data cache: "request" shares reads within one request, "customer" across requests, "off" disables
+    DEPS_CACHE_SCOPE: str = Field(default="request", description="Scope of the agent data cache (off, request, customer)")
+    DEPS_CACHE_MAX_ENTRIES: int = Field(default=10000, description="Maximum cached reads in the customer-scoped agent data cache")
+
+    # Response cache
+    RESPONSE_CACHE_ENABLED: bool = Field(default=False, description="Reuse answers to repeated queries with identical context")
+    RESPONSE_CACHE_TTL_SECONDS: int = Field(default=300, description="Seconds a cached answer stays valid")
+    RESPONSE_CACHE_MAX_ENTRIES: int = Field(default=1000, description="Maximum cached answers before LRU eviction")
+    RESPONSE_CACHE_HISTORY_MESSAGES: int = Field(default=6, description="Recent history messages included in the cache key")
+
+    # Thread owner cache for access checks (0 entries disables)
+    THREAD_OWNER_CACHE_MAX_ENTRIES: int = Field(default=10000, description="Maximum cached thread owners before LRU eviction")
+    THREAD_OWNER_CACHE_TTL_SECONDS: int = Field(default=300, description="Longest time a cached thread owner is trusted")
     
+    # In-process Prometheus metrics served at /metrics
+    METRICS_ENABLED: bool = Field(default=True, description="Record request, agent run and database query metrics")
+
     # Logging
     LOGFIRE_TOKEN: str = Field(default="", description="Logfire token")
     LOGFIRE_SEND_TO_LOGFIRE: bool = Field(default=False, description="Send logs to Logfire")
@@ -0,0 +1,318 @@
+"""Serialization of agent turns per thread.
+
+A turn loads the thread's history, runs the model and appends the new
+messages. Two turns on the same thread running at the same time would both
+answer without seeing each other and interleave their messages, so every turn
+holds the thread's lock from loading the history until its messages are saved.
+
+Turns in one process queue on an in-memory lock first, so only one of them
+polls the ``thread_locks`` table that coordinates with other processes.
+
+Identical submissions that arrive while the first one is still running, such
+as a double-clicked send button or a client retry, do not start a turn of
+their own: they wait for the first one and share its result.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+from uuid import UUID, uuid4
+
+from src.service.core.metrics import LatencyStats
+from src.service.core.settings import settings
+from src.service.db.locks import extend_thread_lock, release_thread_lock, try_acquire_thread_lock
+from src.service.db.session import SessionFactory, create_session_factory
+from src.service.models.api.errors import ThreadBusyError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Longest pause between two attempts to take a lock held by another process
+MAX_POLL_INTERVAL_SECONDS = 1.0
+
+
+@dataclass
+class ThreadLockStats:
+    """
+    Counters for thread locks and coalesced submissions.
+
+    Attributes:
+        acquired: Locks taken
+        contended: Locks that were held by another turn when requested
+        timeouts: Requests that gave up waiting for a lock
+        lost: Leases that expired and were taken over while a turn was still running
+        coalesced: Duplicate submissions answered with another submission's result
+        wait: Time spent waiting for locks
+        hold: Time locks were held
+    """
+    acquired: int = 0
+    contended: int = 0
+    timeouts: int = 0
+    lost: int = 0
+    coalesced: int = 0
+    wait: LatencyStats = field(default_factory=LatencyStats)
+    hold: LatencyStats = field(default_factory=LatencyStats)
+
+
+@dataclass
+class _LocalLock:
+    """
+    In-process lock of a thread.
+
+    Attributes:
+        lock: Held by the turn of this process that holds or waits for the thread's row
+        users: Turns holding or waiting for the lock
+    """
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0
+
+
+class ThreadLease:
+    """A held thread lock; releasing it more than once is harmless."""
+
+    def __init__(
+        self,
+        manager: Optional["ThreadLockManager"],
+        thread_id: Optional[UUID] = None,
+        owner: str = ""
+    ):
+        self._manager = manager
+        self.thread_id = thread_id
+        self.owner = owner
+        self._acquired_at = time.perf_counter()
+        self._heartbeat: Optional["asyncio.Task[None]"] = None
+        self._released = False
+
+    async def release(self) -> None:
+        """Give the lock back to the next turn."""
+        if self._released:
+            return
+        self._released = True
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+        if self._manager is not None:
+            await self._manager._release(self, time.perf_counter() - self._acquired_at)
+
+    async def __aenter__(self) -> "ThreadLease":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.release()
+
+
+class ThreadLockManager:
+    """Per-thread locks shared by every process using the same database."""
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        ttl: float,
+        wait_timeout: float,
+        poll_interval: float,
+        enabled: bool = True
+    ):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.enabled = enabled
+        self.stats = ThreadLockStats()
+        self._process = f"{socket.gethostname()[:20]}:{os.getpid()}"
+        self._local: Dict[str, _LocalLock] = {}
+
+    def _local_lock(self, key: str) -> asyncio.Lock:
+        """Get the in-process lock of a thread and register one more user of it."""
+        entry = self._local.setdefault(key, _LocalLock())
+        entry.users += 1
+        return entry.lock
+
+    def _drop_local(self, key: str, release: bool) -> None:
+        """Unregister a user of the in-process lock, releasing it if it was held."""
+        entry = self._local[key]
+        if release:
+            entry.lock.release()
+        entry.users -= 1
+        if entry.users == 0:
+            del self._local[key]
+
+    def waiting(self) -> int:
+        """Turns in this process waiting for a thread another turn holds."""
+        return sum(entry.users - (1 if entry.lock.locked() else 0) for entry in self._local.values())
+
+    def retry_after_seconds(self) -> int:
+        """Estimate when a thread that timed out could be free, in whole seconds."""
+        return max(1, math.ceil(self.stats.hold.avg_seconds or 1.0))
+
+    async def acquire(self, thread_id: UUID) -> ThreadLease:
+        """
+        Wait for the lock of a thread.
+
+        Args:
+            thread_id: ID of the thread
+
+        Returns:
+            Lease that must be released when the turn has been saved
+
+        Raises:
+            ThreadBusyError: If the lock was not free within the wait timeout
+        """
+        if not self.enabled:
+            return ThreadLease(None)
+
+        key = str(thread_id)
+        start = time.perf_counter()
+        deadline = start + self.wait_timeout
+        local = self._local_lock(key)
+        contended = local.locked()
+        if contended:
+            self.stats.contended += 1
+
+        try:
+            await asyncio.wait_for(local.acquire(), timeout=max(deadline - time.perf_counter(), 0))
+        except asyncio.TimeoutError:
+            self._drop_local(key, release=False)
+            self.stats.timeouts += 1
+            raise ThreadBusyError(retry_after=self.retry_after_seconds())
+        except BaseException:
+            self._drop_local(key, release=False)
+            raise
+
+        owner = f"{self._process}:{uuid4().hex}"
+        try:
+            await self._acquire_row(thread_id, owner, deadline, contended)
+        except BaseException:
+            self._drop_local(key, release=True)
+            raise
+
+        self.stats.acquired += 1
+        self.stats.wait.observe(time.perf_counter() - start)
+        lease = ThreadLease(self, thread_id, owner)
+        lease._heartbeat = asyncio.create_task(self._keep_lease(thread_id, owner))
+        return lease
+
+    async def _acquire_row(self, thread_id: UUID, owner: str, deadline: float, contended: bool) -> None:
+        """Take the thread's row in the lock table, backing off while another process holds it."""
+        delay = self.poll_interval
+        while True:
+            async with self.session_factory() as db:
+                async with db.begin():
+                    if await try_acquire_thread_lock(db, thread_id, owner, self.ttl):
+                        return
+            if not contended:
+                contended = True
+                self.stats.contended += 1
+            if time.perf_counter() + delay > deadline:
+                self.stats.timeouts += 1
+                raise ThreadBusyError(retry_after=self.retry_after_seconds())
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_POLL_INTERVAL_SECONDS)
+
+    async def _keep_lease(self, thread_id: UUID, owner: str) -> None:
+        """
+        Extend the lease every third of its TTL while the turn runs.
+
+        A failed extension, such as a locked database, is retried on the next
+        tick. The loop only ends when the lease was taken over.
+        """
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                async with self.session_factory() as db:
+                    async with db.begin():
+                        extended = await extend_thread_lock(db, thread_id, owner, self.ttl)
+            except Exception as e:
+                logger.warning(f"Could not extend the lock of thread {thread_id}, retrying: {str(e)}")
+                continue
+            if not extended:
+                self.stats.lost += 1
+                return
+
+    async def _release(self, lease: ThreadLease, held_seconds: float) -> None:
+        """Delete the lease's row and hand the in-process lock to the next turn."""
+        if lease.thread_id is None:
+            # Leases without a thread come from disabled locking and hold nothing
+            return
+        try:
+            async with self.session_factory() as db:
+                async with db.begin():
+                    await release_thread_lock(db, lease.thread_id, lease.owner)
+        finally:
+            self.stats.hold.observe(held_seconds)
+            self._drop_local(str(lease.thread_id), release=True)
+
+    def status(self) -> Dict[str, Any]:
+        """Report lock counters."""
+        return {
+            "enabled": self.enabled,
+            "threads_in_use": len(self._local),
+            "waiting": self.waiting(),
+            "acquired": self.stats.acquired,
+            "contended": self.stats.contended,
+            "timeouts": self.stats.timeouts,
+            "lost": self.stats.lost,
+            "coalesced": self.stats.coalesced,
+            "wait": self.stats.wait.as_dict(),
+            "hold": self.stats.hold.as_dict(),
+        }
+
+
+class SingleFlight:
+    """Runs one call per key at a time; callers with the same key share its result."""
+
+    def __init__(self, stats: ThreadLockStats):
+        self.stats = stats
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``call`` unless a call with the same key is in flight, then wait for that one.
+
+        The call runs in its own task, so it still finishes for the other
+        callers if the caller that started it goes away.
+
+        Args:
+            key: Identity of the call
+            call: Starts the call
+
+        Returns:
+            The result of the call, shared by every caller with the same key
+
+        Raises:
+            Exception: Whatever the call raised, re-raised to every caller
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self.stats.coalesced += 1
+        else:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        """Forget a finished call; its error is marked as retrieved in case every caller left."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+
+thread_lock_manager = ThreadLockManager(
+    session_factory=create_session_factory(),
+    ttl=settings.THREAD_LOCK_TTL_SECONDS,
+    wait_timeout=settings.THREAD_LOCK_WAIT_SECONDS,
+    poll_interval=settings.THREAD_LOCK_POLL_SECONDS,
+    enabled=settings.THREAD_LOCK_ENABLED,
+)
+
+# Identical agent submissions in flight, keyed by user, thread and query
+turn_single_flight = SingleFlight(thread_lock_manager.stats)
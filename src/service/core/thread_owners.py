@@ -0,0 +1,145 @@
+"""In-memory cache of thread owners for access checks.
+
+Every agent turn and job submission checks that the thread belongs to the
+caller, which would otherwise read the thread from the database each time.
+A thread's owner and agent type never change, so they are kept in a
+per-process LRU keyed by thread ID, filled when a thread is created or read.
+
+A cache hit skips the read that would restore an archived thread, so an entry
+must not outlive the thread's place in the hot tables. Threads are archived
+only after ``ARCHIVE_IDLE_DAYS`` without a write, so an entry expires before
+the thread read into it could have become idle, and after
+``THREAD_OWNER_CACHE_TTL_SECONDS`` at most. This holds for archive runs of
+every process; the archive job also drops the entries of the threads it moves.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
+
+from src.common.stats import HitRateStats
+from src.service.core.settings import settings
+
+# Writes stamp a thread and its messages separately, so its last activity may precede updated_at slightly
+_ACTIVITY_MARGIN = timedelta(minutes=1)
+
+
+@dataclass(frozen=True)
+class ThreadOwner:
+    """
+    Cached identity of a thread.
+
+    Attributes:
+        user_id: ID of the user who owns the thread, as stored
+        agent_type: Agent type of the thread, as stored
+        expires_at: Monotonic time after which the entry is stale
+    """
+    user_id: Any
+    agent_type: Any
+    expires_at: float
+
+
+class ThreadOwnerCache:
+    """In-memory LRU cache of thread owners and agent types."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, idle_days: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.idle_days = idle_days
+        self.stats = HitRateStats()
+        self._entries: "OrderedDict[str, ThreadOwner]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, thread_id: Any) -> Optional[ThreadOwner]:
+        """
+        Look up a thread's owner.
+
+        Args:
+            thread_id: ID of the thread
+
+        Returns:
+            The cached owner, or None on a miss
+        """
+        key = str(thread_id)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            entry = None
+
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry
+
+    def put(
+        self,
+        thread_id: Any,
+        user_id: Any,
+        agent_type: Any,
+        updated_at: Optional[datetime]
+    ) -> bool:
+        """
+        Remember a thread read from or written to the hot tables.
+
+        Args:
+            thread_id: ID of the thread
+            user_id: ID of the thread's owner
+            agent_type: Agent type of the thread
+            updated_at: Time of the thread's last write, which bounds how long it stays hot
+
+        Returns:
+            True if the thread was stored, False if caching is disabled or the
+            thread could be archived already
+        """
+        if self.max_entries <= 0:
+            return False
+
+        ttl_seconds = self.ttl_seconds
+        if updated_at is not None:
+            if updated_at.tzinfo is not None:
+                updated_at = updated_at.astimezone(timezone.utc).replace(tzinfo=None)
+            archivable_at = updated_at + timedelta(days=self.idle_days) - _ACTIVITY_MARGIN
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            ttl_seconds = min(ttl_seconds, (archivable_at - now).total_seconds())
+        if ttl_seconds <= 0:
+            self.stats.uncacheable += 1
+            return False
+
+        key = str(thread_id)
+        self._entries[key] = ThreadOwner(
+            user_id=user_id,
+            agent_type=agent_type,
+            expires_at=time.monotonic() + ttl_seconds,
+        )
+        self._entries.move_to_end(key)
+        self.stats.stores += 1
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+        return True
+
+    def invalidate(self, thread_ids: Iterable[Any]) -> None:
+        """Drop the entries of threads that left the hot tables."""
+        for thread_id in thread_ids:
+            if self._entries.pop(str(thread_id), None) is not None:
+                self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+
+thread_owner_cache = ThreadOwnerCache(
+    max_entries=settings.THREAD_OWNER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.THREAD_OWNER_CACHE_TTL_SECONDS,
+    idle_days=settings.ARCHIVE_IDLE_DAYS,
+)
@@ -0,0 +1,73 @@
+"""Per-phase timing of a single request."""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from opentelemetry import trace
+
+# Logfire exports OpenTelemetry spans, so phases appear under the request's span
+tracer = trace.get_tracer(__name__)
+
+
+class PhaseTimer:
+    """
+    Records how long each phase of a request took.
+
+    Phases may run concurrently, so their durations can add up to more than
+    the wall-clock total. Milestones record the time elapsed since the timer
+    was created, e.g. when the first token reached the client. Every phase is
+    also emitted as a tracing span named ``phase <name>``, and milestones as
+    events on the current span.
+    """
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as phase ``name``."""
+        start = time.perf_counter()
+        try:
+            with tracer.start_as_current_span(f"phase {name}", attributes={"phase": name}):
+                yield
+        finally:
+            self._add(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Record a phase measured by the caller, emitting a span that ended just now."""
+        end = time.time_ns()
+        span = tracer.start_span(
+            f"phase {name}", start_time=end - int(seconds * 1e9), attributes={"phase": name}
+        )
+        span.end(end_time=end)
+        self._add(name, seconds)
+
+    def _add(self, name: str, seconds: float) -> None:
+        """Add time to a phase; a phase entered more than once accumulates."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def mark(self, name: str) -> None:
+        """Record a milestone at the time elapsed since the timer started."""
+        if name not in self.phases:
+            self.phases[name] = self.elapsed()
+            trace.get_current_span().add_event(name)
+
+    def elapsed(self) -> float:
+        """Seconds since the timer started."""
+        return time.perf_counter() - self.started_at
+
+    def as_dict(self) -> Dict[str, float]:
+        """Phase durations and the running total in milliseconds."""
+        timings = {name: seconds * 1000 for name, seconds in self.phases.items()}
+        timings["total"] = self.elapsed() * 1000
+        return timings
+
+    def summary(self) -> str:
+        """Human-readable breakdown for logs, e.g. ``validate=1.2ms history=3.4ms total=9.9ms``."""
+        return " ".join(f"{name}={ms:.1f}ms" for name, ms in self.as_dict().items())
+
+    def server_timing(self) -> str:
+        """Value for a ``Server-Timing`` header, e.g. ``validate;dur=1.2, total;dur=9.9``."""
+        return ", ".join(f"{name};dur={ms:.1f}" for name, ms in self.as_dict().items())
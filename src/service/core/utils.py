@@ -1,16 +1,20 @@
 """Utilities for service operations."""
 
-from typing import Any
+from datetime import datetime, timezone
+from typing import Any, Sequence, Union
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.service.db.database import get_thread
 from src.service.models.api.errors import ThreadPermissionError
-from src.service.models.api import ThreadResponse, MessageResponse
-from src.service.models.database import Thread, Message
+from src.service.models.api import (
+    ThreadResponse, ThreadDetailResponse, MessageResponse, AgentJobResponse, AgentResponse
+)
+from src.service.models.database import Thread, Message, ArchivedThread, AgentJob
 
 from pydantic_ai.messages import ModelMessagesTypeAdapter
+from pydantic_core import from_json
 
 # Utility function to handle both coroutines and direct results
 async def ensure_awaited(obj: Any) -> Any:
@@ -41,40 +45,63 @@ async def ensure_awaited(obj: Any) -> Any:
 async def verify_thread_access(
     db: AsyncSession,
     thread_id: UUID,
-    user_id: UUID
+    user_id: UUID,
+    cached: bool = False
 ) -> Thread:
     """
     Verify a user has access to a specified thread.
-    
+
     Args:
-        session_factory: Factory function to create database sessions
+        db: Database session
         thread_id: The ID of the thread to verify
         user_id: The ID of the user requesting access
-        
+        cached: Answer from the thread owner cache when it knows the thread.
+            The returned thread then only has id, user_id and agent_type set.
+
     Returns:
-        The thread API model if access is granted
-        
+        The thread if access is granted
+
     Raises:
+        ThreadNotFoundError: If the thread doesn't exist
         ThreadPermissionError: If the user doesn't have permission
     """
-    thread = await get_thread(db, thread_id)
+    from src.service.core.thread_owners import thread_owner_cache
+
+    owner = thread_owner_cache.get(thread_id) if cached else None
+    if owner is not None:
+        thread = Thread(id=str(thread_id), user_id=owner.user_id, agent_type=owner.agent_type)
+    else:
+        thread = await get_thread(db, thread_id)
+        thread_owner_cache.put(thread.id, thread.user_id, thread.agent_type, thread.updated_at)
 
     # Check permission - compare as strings to handle SQLite string storage
     if str(thread.user_id) != str(user_id):
         raise ThreadPermissionError(f"User with ID {user_id} does not have permission to access thread with ID {thread_id}")
-        
+
     return thread
 
 
+def as_naive_utc(value: datetime) -> datetime:
+    """
+    Convert a datetime to naive UTC, the format SQLite stores; naive input is taken as UTC.
+    
+    API timestamps are normalised once here, so every database backend encodes
+    them the same way, without a UTC offset.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
 # Direct model conversion functions
 def db_to_api_thread(
-    thread: Thread
+    thread: Union[Thread, ArchivedThread]
 ) -> ThreadResponse:
     """
     Convert a database Thread model to a ThreadResponse API model.
     
     Args:
-        thread: Database Thread model instance
+        thread: Database Thread (or ArchivedThread) model instance
             
     Returns:
         ThreadResponse API model
@@ -87,8 +114,58 @@ def db_to_api_thread(
         id=thread.id,
         user_id=thread.user_id,
         agent_type=AgentType(thread.agent_type),
-        created_at=thread.created_at,
-        updated_at=thread.updated_at
+        created_at=as_naive_utc(thread.created_at),
+        updated_at=as_naive_utc(thread.updated_at)
+    )
+
+
+def db_to_api_thread_detail(
+    thread: Thread,
+    messages: Sequence[Message]
+) -> ThreadDetailResponse:
+    """
+    Convert a database Thread model and its messages to a ThreadDetailResponse API model.
+    
+    Args:
+        thread: Database Thread model instance
+        messages: The thread's database Message model instances, in order
+            
+    Returns:
+        ThreadDetailResponse API model
+    """
+    return ThreadDetailResponse(
+        id=thread.id,
+        user_id=thread.user_id,
+        agent_type=thread.agent_type,
+        created_at=as_naive_utc(thread.created_at),
+        updated_at=as_naive_utc(thread.updated_at),
+        messages=[db_to_api_message(message) for message in messages]
+    )
+
+
+def db_to_api_job(
+    job: AgentJob
+) -> AgentJobResponse:
+    """
+    Convert a database AgentJob model to an AgentJobResponse API model.
+    
+    Args:
+        job: Database AgentJob model instance
+            
+    Returns:
+        AgentJobResponse API model with the stored result decoded
+    """
+    from src.service.models.api.job_models import JobStatus
+
+    return AgentJobResponse(
+        id=UUID(str(job.id)),
+        thread_id=UUID(str(job.thread_id)),
+        status=JobStatus(job.status),
+        attempts=job.attempts,
+        result=AgentResponse.model_validate_json(job.result) if job.result else None,
+        error=job.error,
+        created_at=as_naive_utc(job.created_at),
+        updated_at=as_naive_utc(job.updated_at)
     )
 
 
@@ -106,25 +183,14 @@ def db_to_api_message(
     """
     from src.service.models.api.message_models import MessageRole
     
-    # Make sure we have valid UUIDs
     try:
-        message_id = UUID(str(message.id)) if message.id else None
-        thread_id = UUID(str(message.thread_id)) if message.thread_id else None
-        
-        # Check if we have valid values
-        if not message_id or not thread_id:
-            raise ValueError("Missing required ID fields")
-            
-        # Use proper type conversion for enums too
-        message_role = MessageRole(message.role) if message.role else MessageRole.ASSISTANT
-        
-        # Create the response with proper types
+        # IDs are stored as strings; pydantic-core parses them into UUIDs and rejects missing ones
         return MessageResponse(
-            id=message_id,
-            thread_id=thread_id,
-            role=message_role,
+            id=message.id,
+            thread_id=message.thread_id,
+            role=message.role or MessageRole.ASSISTANT,
             content=_raw_json_to_content(message.raw_json_text),
-            created_at=message.created_at
+            created_at=as_naive_utc(message.created_at)
         )
     except Exception as e:
         # Include detailed error information
@@ -136,6 +202,12 @@ def db_to_api_message(
         raise ValueError(error_message) from e
 
 
+# Parts whose content is shown as message text
+_CONTENT_PART_KINDS = frozenset(("user-prompt", "tool-return", "retry-prompt", "text"))
+# Parts whose structured content validates into objects with their own str()
+_VALIDATED_PART_KINDS = frozenset(("user-prompt", "retry-prompt"))
+
+
 def _raw_json_to_content(
     raw_json: str
 ) -> str:
@@ -143,7 +215,11 @@ def _raw_json_to_content(
     Extract human-readable content from the raw message data.
     
     This computed field processes the raw JSON data into a format
-    suitable for display to users.
+    suitable for display to users. Stored messages were written by
+    ModelMessagesTypeAdapter, so their parts are read as plain JSON rather than
+    validated into message objects again. Prompts and retry prompts with
+    structured content print differently once validated, so they take the
+    validating path.
     
     Returns:
         Human-readable message content as a string
@@ -151,6 +227,30 @@ def _raw_json_to_content(
     if not raw_json:
         return ""
     
+    # Collect content from all messages and their applicable parts
+    parts_content = []
+    for message in from_json(raw_json):
+        for part in message.get("parts") or ():
+            part_kind = part.get("part_kind")
+            if part_kind == "tool-call":
+                parts_content.append(str(part["args"]))
+            elif part_kind in _CONTENT_PART_KINDS:
+                if part_kind in _VALIDATED_PART_KINDS and not isinstance(part["content"], str):
+                    return _validated_raw_json_to_content(raw_json)
+                parts_content.append(str(part["content"]))
+                
+    return "\n\n".join(parts_content)
+
+
+def _validated_raw_json_to_content(
+    raw_json: str
+) -> str:
+    """
+    Extract human-readable content after validating the raw message data.
+    
+    Returns:
+        Human-readable message content as a string
+    """
     # Use ModelMessagesTypeAdapter to validate and parse the JSON
     model_messages = ModelMessagesTypeAdapter.validate_json(raw_json)
     if not model_messages:
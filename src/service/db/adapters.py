@@ -11,6 +11,7 @@ from uuid import UUID
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.service.db.database import MESSAGE_ORDER
 from src.service.models.database.models import Message, Thread
 from src.service.models.api import MessageRole, AgentType
 
@@ -77,7 +78,7 @@ class MessageAdapter(SQLiteAdapter[Message]):
         session: AsyncSession
     ) -> List[Message]:
         """Get all messages for a thread."""
-        stmt = select(Message).where(Message.thread_id == thread_id).order_by(Message.created_at)
+        stmt = select(Message).where(Message.thread_id == thread_id).order_by(*MESSAGE_ORDER)
         result = await session.execute(stmt)
         return list(result.scalars().all())
     
@@ -0,0 +1,423 @@
+"""Cold-thread archival tier.
+
+Threads that have been idle for longer than ``ARCHIVE_IDLE_DAYS`` are moved out
+of the hot ``threads`` and ``messages`` tables into a separate SQLite archive
+file. Each archived thread keeps its metadata as plain columns, while all of its
+messages are packed into a single zlib-compressed JSON payload.
+
+Archived threads are restored transparently the first time they are read
+through ``get_thread`` or ``get_model_messages_by_thread``, which only look in
+the archive when the hot ``threads`` table has no row for the thread.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.service.core.metrics import LatencyStats
+from src.service.core.settings import settings
+from src.service.core.thread_owners import thread_owner_cache
+from src.service.db.base import AsyncSessionLocal, ArchiveSessionLocal
+from src.service.db.database import MESSAGE_ORDER
+from src.service.db.search import index_messages, remove_thread_from_index
+from src.service.db.session import SessionFactory
+from src.service.models.database.models import ArchivedThread, Message, Thread
+
+logger = logging.getLogger(__name__)
+
+# Codec identifier stored alongside every payload so other codecs can be added later
+ARCHIVE_CODEC = "zlib"
+
+
+class _ThreadActiveError(Exception):
+    """Raised inside the archive transaction to abort archiving an active thread."""
+
+
+@dataclass
+class ArchiveStats:
+    """
+    Counters for the archival tier.
+
+    Attributes:
+        runs: Number of archival job runs
+        threads_archived: Threads moved to the archive
+        messages_archived: Messages moved to the archive
+        threads_restored: Threads restored to the hot database on access
+        restore_latency: Latency of restore operations
+    """
+    runs: int = 0
+    threads_archived: int = 0
+    messages_archived: int = 0
+    threads_restored: int = 0
+    restore_latency: LatencyStats = field(default_factory=LatencyStats)
+
+
+archive_stats = ArchiveStats()
+
+
+def _pack_messages(messages: Sequence[Dict[str, Any]]) -> bytes:
+    """Serialize and compress message rows into an archive payload."""
+    document = json.dumps(list(messages), separators=(",", ":")).encode("utf-8")
+    return zlib.compress(document, level=6)
+
+
+def _unpack_messages(payload: bytes, codec: str) -> List[Dict[str, Any]]:
+    """Decompress and deserialize an archive payload into message rows."""
+    if codec != ARCHIVE_CODEC:
+        raise ValueError(f"Unsupported archive codec: {codec}")
+    rows: List[Dict[str, Any]] = json.loads(zlib.decompress(payload))
+    return rows
+
+
+def _as_utc_naive(value: datetime) -> datetime:
+    """Normalize a datetime to naive UTC, the format SQLite stores."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def find_idle_thread_ids(
+    db: AsyncSession,
+    cutoff: datetime,
+    limit: int
+) -> List[str]:
+    """
+    Find threads whose last activity is older than the cutoff.
+
+    Last activity is the newest message timestamp, falling back to the thread's
+    own ``updated_at`` for threads without messages.
+
+    Args:
+        db: Hot database session
+        cutoff: Threads last active before this moment are considered idle
+        limit: Maximum number of thread IDs to return
+
+    Returns:
+        IDs of idle threads, least recently active first
+    """
+    last_activity = func.coalesce(func.max(Message.created_at), Thread.updated_at)
+    query = select(Thread.id) \
+        .outerjoin(Message, Message.thread_id == Thread.id) \
+        .group_by(Thread.id) \
+        .having(last_activity < cutoff) \
+        .order_by(last_activity) \
+        .limit(limit)
+    result = await db.execute(query)
+    return [str(thread_id) for thread_id in result.scalars().all()]
+
+
+async def archive_thread(
+    db: AsyncSession,
+    archive_db: AsyncSession,
+    thread_id: str,
+    cutoff: datetime
+) -> int:
+    """
+    Move a single thread and its messages into the archive.
+
+    Messages are removed with ``DELETE ... RETURNING`` so the rows that end up
+    in the payload are exactly the rows removed from the hot tables. The archive
+    row is committed before the hot delete, so a crash in between leaves the
+    thread in both places rather than in neither. If the hot commit fails, the
+    archive row is removed again; readers prefer the hot copy of a thread found
+    in both places, and a later run overwrites a leftover archive row.
+
+    Args:
+        db: Hot database session without an active transaction
+        archive_db: Archive database session without an active transaction
+        thread_id: ID of the thread to archive
+        cutoff: Idle cutoff, re-checked once the write lock is held
+
+    Returns:
+        Number of archived messages, or -1 if the thread became active again
+    """
+    archived = False
+    try:
+        async with db.begin():
+            deleted_messages = await db.execute(
+                delete(Message)
+                .where(Message.thread_id == thread_id)
+                .returning(Message.id, Message.role, Message.raw_json_text, Message.created_at, MESSAGE_ORDER[1].label("position"))
+            )
+            rows = sorted(deleted_messages.all(), key=lambda row: (row.created_at, row.position))
+
+            deleted_thread = await db.execute(
+                delete(Thread)
+                .where(Thread.id == thread_id)
+                .returning(Thread.id, Thread.user_id, Thread.agent_type, Thread.created_at, Thread.updated_at, Thread.version)
+            )
+            thread_row = deleted_thread.first()
+            if not thread_row:
+                raise _ThreadActiveError()
+
+            await remove_thread_from_index(db, thread_id)
+
+            # The thread may have been written to since it was selected
+            last_activity = rows[-1].created_at if rows else thread_row.updated_at
+            if _as_utc_naive(last_activity) >= cutoff:
+                raise _ThreadActiveError()
+
+            payload = _pack_messages([
+                {
+                    "id": str(row.id),
+                    "role": str(getattr(row.role, "value", row.role)),
+                    "raw_json_text": row.raw_json_text,
+                    "created_at": row.created_at.isoformat(),
+                }
+                for row in rows
+            ])
+
+            async with archive_db.begin():
+                await archive_db.merge(ArchivedThread(
+                    id=str(thread_row.id),
+                    user_id=str(thread_row.user_id),
+                    agent_type=thread_row.agent_type,
+                    created_at=thread_row.created_at,
+                    updated_at=thread_row.updated_at,
+                    version=thread_row.version,
+                    message_count=len(rows),
+                    codec=ARCHIVE_CODEC,
+                    payload=payload,
+                ))
+            archived = True
+
+            # Before the hot delete commits, so no access check trusts a cached entry meanwhile
+            thread_owner_cache.invalidate([thread_id])
+    except _ThreadActiveError:
+        # Leaving the transaction block through the exception rolls back the deletes
+        return -1
+    except Exception:
+        if archived:
+            await _discard_archived_copy(archive_db, thread_id)
+        raise
+
+    return len(rows)
+
+
+async def _discard_archived_copy(
+    archive_db: AsyncSession,
+    thread_id: str
+) -> None:
+    """Remove the archive row of a thread whose hot delete did not commit."""
+    try:
+        async with archive_db.begin():
+            await archive_db.execute(delete(ArchivedThread).where(ArchivedThread.id == thread_id))
+    except Exception as e:
+        # Harmless: the hot copy wins when the thread is read or listed
+        logger.warning(f"Could not remove archive copy of thread {thread_id}: {str(e)}")
+
+
+async def archive_idle_threads(
+    idle_days: Optional[int] = None,
+    batch_size: Optional[int] = None
+) -> int:
+    """
+    Archive threads idle for longer than ``idle_days``.
+
+    Args:
+        idle_days: Idle threshold in days (defaults to ``ARCHIVE_IDLE_DAYS``)
+        batch_size: Maximum threads to archive (defaults to ``ARCHIVE_BATCH_SIZE``)
+
+    Returns:
+        Number of threads moved to the archive
+    """
+    idle_days = settings.ARCHIVE_IDLE_DAYS if idle_days is None else idle_days
+    batch_size = settings.ARCHIVE_BATCH_SIZE if batch_size is None else batch_size
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=idle_days)
+
+    archived = 0
+    async with AsyncSessionLocal() as db, ArchiveSessionLocal() as archive_db:
+        thread_ids = await find_idle_thread_ids(db, cutoff, batch_size)
+        await db.commit()
+
+        for thread_id in thread_ids:
+            try:
+                message_count = await archive_thread(db, archive_db, thread_id, cutoff)
+            except Exception as e:
+                logger.error(f"Failed to archive thread {thread_id}: {str(e)}")
+                continue
+            if message_count < 0:
+                continue
+            archived += 1
+            archive_stats.threads_archived += 1
+            archive_stats.messages_archived += message_count
+
+    archive_stats.runs += 1
+    logger.info(f"Archived {archived} idle threads (cutoff {cutoff.isoformat()})")
+    return archived
+
+
+async def _insert_archived_thread(
+    db: AsyncSession,
+    archived: ArchivedThread,
+    rows: Sequence[Dict[str, Any]]
+) -> None:
+    """Insert an archived thread and its messages into the hot tables, unless it is already there."""
+    inserted = await db.execute(
+        sqlite_insert(Thread)
+        .values(
+            id=archived.id,
+            user_id=archived.user_id,
+            agent_type=archived.agent_type,
+            created_at=archived.created_at,
+            updated_at=archived.updated_at,
+            # Keep the version so ETags issued before archiving stay valid
+            version=archived.version,
+        )
+        .on_conflict_do_nothing()
+    )
+    # A concurrent restore already brought the thread back
+    if rows and inserted.rowcount:
+        await db.execute(
+            sqlite_insert(Message)
+            .values([
+                {
+                    "id": row["id"],
+                    "thread_id": archived.id,
+                    "role": row["role"],
+                    "raw_json_text": row["raw_json_text"],
+                    "created_at": datetime.fromisoformat(row["created_at"]),
+                }
+                for row in rows
+            ])
+            .on_conflict_do_nothing()
+        )
+        await index_messages(
+            db, archived.user_id, archived.id,
+            [(row["id"], row["raw_json_text"]) for row in rows]
+        )
+
+
+async def restore_archived_thread(
+    session_factory: SessionFactory,
+    archive_session_factory: SessionFactory,
+    thread_id: UUID,
+    db: Optional[AsyncSession] = None
+) -> bool:
+    """
+    Restore an archived thread and its messages into the hot database.
+
+    The hot insert is committed before the archive row is removed. Inserts
+    ignore conflicts, so concurrent restores of the same thread are safe.
+
+    Given ``db``, the thread is restored in that session's transaction
+    instead, for callers that already hold SQLite's write lock, where a
+    session of its own would wait for the lock until "database is locked".
+    The archive row is then kept, since the caller's transaction may still
+    roll back; readers prefer the hot copy, and archiving the thread again
+    overwrites the leftover row.
+
+    Args:
+        session_factory: Factory function that creates hot database sessions
+        archive_session_factory: Factory function that creates archive database sessions
+        thread_id: ID of the thread to restore
+        db: Hot session whose open transaction receives the thread, if any
+
+    Returns:
+        True if the thread was found in the archive and restored
+    """
+    start = time.perf_counter()
+    async with archive_session_factory() as archive_db:
+        async with archive_db.begin():
+            archived = await archive_db.get(ArchivedThread, str(thread_id))
+            if not archived:
+                return False
+
+            rows = _unpack_messages(archived.payload, archived.codec)
+            if db is not None:
+                await _insert_archived_thread(db, archived, rows)
+            else:
+                async with session_factory() as hot_db:
+                    async with hot_db.begin():
+                        await _insert_archived_thread(hot_db, archived, rows)
+                await archive_db.delete(archived)
+
+    elapsed = time.perf_counter() - start
+    archive_stats.threads_restored += 1
+    archive_stats.restore_latency.observe(elapsed)
+    logger.info(f"Restored archived thread {thread_id} with {len(rows)} messages in {elapsed * 1000:.1f}ms")
+    return True
+
+
+async def get_archived_threads_by_user(
+    archive_session_factory: SessionFactory,
+    user_id: UUID
+) -> Sequence[ArchivedThread]:
+    """
+    Get metadata for all archived threads of a user without restoring them.
+
+    Args:
+        archive_session_factory: Factory function that creates archive database sessions
+        user_id: ID of the user
+
+    Returns:
+        Archived threads belonging to the user
+    """
+    async with archive_session_factory() as archive_db:
+        query = select(ArchivedThread).where(ArchivedThread.user_id == user_id)
+        result = await archive_db.execute(query)
+        return result.scalars().all()
+
+
+async def _database_size_bytes(db: AsyncSession) -> int:
+    """Get the on-disk size of a SQLite database in bytes."""
+    page_count = (await db.execute(text("PRAGMA page_count"))).scalar() or 0
+    page_size = (await db.execute(text("PRAGMA page_size"))).scalar() or 0
+    return int(page_count) * int(page_size)
+
+
+async def get_archive_report() -> Dict[str, Any]:
+    """
+    Report the hot-set size, archive size and restore latency.
+
+    Returns:
+        Dictionary with hot/archive row counts, file sizes and job counters
+    """
+    async with AsyncSessionLocal() as db:
+        hot_threads = (await db.execute(select(func.count()).select_from(Thread))).scalar() or 0
+        hot_messages = (await db.execute(select(func.count()).select_from(Message))).scalar() or 0
+        hot_bytes = await _database_size_bytes(db)
+
+    async with ArchiveSessionLocal() as archive_db:
+        archived_threads = (await archive_db.execute(
+            select(func.count()).select_from(ArchivedThread)
+        )).scalar() or 0
+        archive_bytes = await _database_size_bytes(archive_db)
+
+    return {
+        "hot_threads": hot_threads,
+        "hot_messages": hot_messages,
+        "hot_db_bytes": hot_bytes,
+        "archived_threads": archived_threads,
+        "archive_db_bytes": archive_bytes,
+        "runs": archive_stats.runs,
+        "threads_archived": archive_stats.threads_archived,
+        "messages_archived": archive_stats.messages_archived,
+        "threads_restored": archive_stats.threads_restored,
+        "restore_latency": archive_stats.restore_latency.as_dict(),
+    }
+
+
+async def run_archive_scheduler(interval_seconds: int) -> None:
+    """
+    Run the archival job periodically until cancelled.
+
+    Args:
+        interval_seconds: Delay between job runs
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await archive_idle_threads()
+        except Exception as e:
+            logger.error(f"Archival job failed: {str(e)}", exc_info=True)
@@ -1,13 +1,16 @@
 """Base SQLAlchemy models and engine configuration for SQLite."""
 
 import logging
+import time
 from uuid import UUID
 from typing import Optional, Any, Type, TypeVar, Generic, Union, Dict
 from enum import Enum
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy import Connection, event, inspect
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from sqlalchemy import MetaData, TypeDecorator, String
+from sqlalchemy.schema import CreateColumn
 
 from src.service.core.settings import settings
 
@@ -77,6 +80,14 @@ class Base(DeclarativeBase):
         UUID: UUIDType(36),
     }
 
+# Separate declarative base for the cold-thread archive database
+class ArchiveBase(DeclarativeBase):
+    metadata = MetaData(naming_convention=metadata.naming_convention)
+
+    type_annotation_map = {
+        UUID: UUIDType(36),
+    }
+
 # Function to configure enum types - will be called after Base is defined
 def configure_type_mapping() -> None:
     """Configure type mapping for enums.
@@ -86,16 +97,19 @@ def configure_type_mapping() -> None:
     # Import enums here to avoid circular imports
     from src.service.models.api.message_models import MessageRole
     from src.service.models.api.internal import AgentType
+    from src.service.models.api.job_models import JobStatus
     
     # We need to use dict() with type annotation to avoid mypy errors
     # with mixing different types in the same dictionary
     enum_mappings: Dict[Any, Any] = {
         AgentType: EnumType(AgentType, 50),
         MessageRole: EnumType(MessageRole, 20),
+        JobStatus: EnumType(JobStatus, 20),
     }
     
     # Update the type_annotation_map with enum mappings
     Base.type_annotation_map.update(enum_mappings)
+    ArchiveBase.type_annotation_map.update(enum_mappings)
 
 # Create async engine for SQLite
 engine = create_async_engine(
@@ -114,6 +128,70 @@ AsyncSessionLocal = sessionmaker(  # type: ignore
     expire_on_commit=False
 )
 
+# Create async engine for the archive database (kept out of the hot file)
+archive_engine = create_async_engine(
+    settings.ARCHIVE_DATABASE_URI,
+    echo=settings.is_dev(),
+    connect_args={
+        "check_same_thread": False,
+        "detect_types": 3
+    }
+)
+
+ArchiveSessionLocal = sessionmaker(  # type: ignore
+    bind=archive_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+def observe_query_durations(async_engine: AsyncEngine, database: str) -> None:
+    """
+    Record the duration of every statement the engine executes in the query histogram.
+    
+    Args:
+        async_engine: Engine to instrument
+        database: Label of the database, e.g. "main" or "archive"
+    """
+    from src.service.core.service_metrics import db_query_duration
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def start_timer(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        conn.info["query_started_at"] = time.perf_counter()
+
+    @event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+    def observe(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        started_at = conn.info.pop("query_started_at", None)
+        if started_at is not None:
+            operation = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "other"
+            db_query_duration.labels(database, operation).observe(time.perf_counter() - started_at)
+
+
+if settings.METRICS_ENABLED:
+    observe_query_durations(engine, "main")
+    observe_query_durations(archive_engine, "archive")
+
+def add_missing_columns(connection: Connection, metadata: MetaData) -> None:
+    """
+    Add columns that the models gained since their tables were created.
+    
+    ``create_all`` only creates missing tables. New columns must be nullable or
+    have a server default so SQLite can fill the existing rows.
+    
+    Args:
+        connection: Synchronous connection inside the init transaction
+        metadata: Metadata of the models stored on the connection's database
+    """
+    inspector = inspect(connection)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                definition = CreateColumn(column).compile(dialect=connection.dialect)
+                connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {definition}")
+                logger.info(f"Added column {table.name}.{column.name}")
+
 # Create all tables in the database
 async def init_db() -> None:
     """Create all tables defined in the models."""
@@ -121,11 +199,22 @@ async def init_db() -> None:
     configure_type_mapping()
     
     # Import all models to register them with SQLAlchemy
-    from src.service.models.database.models import Thread, Message
+    from src.service.models.database.models import (
+        Thread, Message, ArchivedThread, AgentJob, ThreadLock, AgentRun, UserVersion
+    )
+    
+    from src.service.db.search import create_search_index
     
     async with engine.begin() as conn:
+        await conn.run_sync(add_missing_columns, Base.metadata)
         await conn.run_sync(Base.metadata.create_all)
+        await create_search_index(conn)
         logger.info("Database tables created or verified")
+
+    async with archive_engine.begin() as conn:
+        await conn.run_sync(add_missing_columns, ArchiveBase.metadata)
+        await conn.run_sync(ArchiveBase.metadata.create_all)
+        logger.info("Archive database tables created or verified")
         
     logger.info("Database initialization complete")
  
\ No newline at end of file
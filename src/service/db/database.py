@@ -1,21 +1,32 @@
 """Database access functions for the API."""
 
-from typing import List, Sequence, cast
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple, cast
 from uuid import UUID, uuid4
 
-from sqlalchemy import select, insert
+from sqlalchemy import select, insert, literal_column, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.elements import ColumnClause
 
 from pydantic_ai.messages import ModelMessage, ModelMessagesTypeAdapter
 
+from src.service.core.timing import PhaseTimer
 from src.service.models.api import MessageCreate, ThreadCreate
 from src.service.models.database.errors import RecordCreationError, ThreadNotFoundError
-from src.service.models.database.models import Thread, Message
+from src.service.models.database.models import Thread, Message, UserVersion
 from src.service.models.api.internal import AgentType
 import logging
 
 logger = logging.getLogger(__name__)
 
+# The messages of one turn share a created_at second; SQLite's rowid keeps their insertion order.
+# Ordering by both keeps the replayed history byte-identical, so provider prefix caches keep matching.
+MESSAGE_ORDER: Tuple[InstrumentedAttribute[datetime], ColumnClause[Any]] = (
+    Message.created_at, literal_column("messages.rowid")
+)
+
 # Database access functions
 async def create_thread(
     db: AsyncSession,
@@ -57,6 +68,7 @@ async def create_thread(
         )
         
         await db.execute(insert_stmt)
+        await bump_user_version(db, thread_data.user_id)
         
         # Fetch the newly inserted thread by ID
         query = select(Thread).where(Thread.id == thread_id)
@@ -71,6 +83,43 @@ async def create_thread(
         logger.error(f"Error creating thread: {str(e)}")
         raise RecordCreationError(f"Failed to create thread: {str(e)}")
 
+async def _holds_write_lock(db: AsyncSession) -> bool:
+    """Whether the session has written in its open transaction, so SQLite holds the write lock for it."""
+    if not db.in_transaction():
+        return False
+    driver_connection = (await (await db.connection()).get_raw_connection()).driver_connection
+    # SQLite only begins its transaction with the first write
+    return driver_connection is not None and bool(driver_connection.in_transaction)
+
+async def _restore_archived_thread(
+    db: AsyncSession,
+    thread_id: UUID
+) -> bool:
+    """
+    Restore a thread missing from the hot tables if it is in the archive.
+
+    The restore commits on its own sessions, on the engine of the caller's
+    session, so it does not depend on the caller's transaction. If the caller
+    has already written in its transaction, another session could not write
+    until it commits, so the thread is restored in the caller's transaction.
+
+    Args:
+        db: The caller's database session
+        thread_id: ID of the thread to restore
+
+    Returns:
+        True if the thread was restored
+    """
+    from src.service.db.archive import restore_archived_thread
+    from src.service.db.session import create_archive_session_factory, session_factory_for
+
+    return await restore_archived_thread(
+        session_factory_for(db),
+        create_archive_session_factory(),
+        thread_id,
+        db=db if await _holds_write_lock(db) else None
+    )
+
 async def get_thread(
     db: AsyncSession,
     thread_id: UUID
@@ -90,6 +139,12 @@ async def get_thread(
     
     thread = result.scalars().first()
     
+    if not thread:
+        # The thread may have been moved to the cold archive; restore it on access
+        if await _restore_archived_thread(db, thread_id):
+            result = await db.execute(query)
+            thread = result.scalars().first()
+    
     if not thread:
         raise ThreadNotFoundError(f"Thread with ID {thread_id} not found")
     
@@ -117,6 +172,71 @@ async def get_threads_by_user(
     
     return result.scalars().all()
 
+async def bump_user_version(
+    db: AsyncSession,
+    user_id: UUID
+) -> None:
+    """
+    Count a write to one of the user's threads in the version of their thread list.
+    
+    Args:
+        db: Database session with the active write transaction
+        user_id: Owner of the written thread
+    """
+    statement = sqlite_insert(UserVersion).values(user_id=user_id, version=1)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[UserVersion.user_id],
+        set_={"version": UserVersion.version + 1},
+    ))
+
+async def _bump_thread_version(
+    db: AsyncSession,
+    thread_id: UUID
+) -> UUID:
+    """
+    Count a write to a thread in its version and in its owner's list version.
+    
+    Also moves the thread's updated_at to the time of the write.
+    
+    Args:
+        db: Database session with the active write transaction
+        thread_id: ID of the written thread
+        
+    Returns:
+        ID of the thread's owner
+        
+    Raises:
+        RecordCreationError: If the thread does not exist
+    """
+    result = await db.execute(
+        update(Thread)
+        .where(Thread.id == thread_id)
+        .values(version=Thread.version + 1)
+        .returning(Thread.user_id)
+    )
+    user_id = result.scalar()
+    if user_id is None:
+        raise RecordCreationError(f"Thread with ID {thread_id} not found")
+    await bump_user_version(db, user_id)
+    return user_id
+
+async def get_user_version(
+    db: AsyncSession,
+    user_id: UUID
+) -> int:
+    """
+    Get the version of a user's thread list.
+    
+    Args:
+        db: Database session
+        user_id: ID of the user
+        
+    Returns:
+        Number of writes to the user's threads, 0 if there were none
+    """
+    result = await db.execute(select(UserVersion.version).where(UserVersion.user_id == user_id))
+    return result.scalar() or 0
+
 async def create_message(
     db: AsyncSession, 
     message_data: MessageCreate, 
@@ -163,12 +283,37 @@ async def create_message(
         
         if not message:
             raise RecordCreationError("Failed to create message")
+
+        # Keep the versions and the search index in step within the same transaction
+        user_id = await _bump_thread_version(db, message_data.thread_id)
+        await _index_thread_messages(
+            db, message_data.thread_id, [(values["id"], values["raw_json_text"])], user_id=user_id
+        )
         
         return cast(Message, message)
     except Exception as e:
         logger.error(f"Error creating message: {str(e)}")
         raise RecordCreationError(f"Failed to create message: {str(e)}")
 
+async def _index_thread_messages(
+    db: AsyncSession,
+    thread_id: UUID,
+    messages: List[Tuple[Any, Any]],
+    user_id: UUID
+) -> None:
+    """
+    Add newly inserted messages of a thread to the full-text search index.
+    
+    Args:
+        db: Database session with the active insert transaction
+        thread_id: ID of the thread the messages belong to
+        messages: (message_id, raw_json_text) pairs
+        user_id: Owner of the thread
+    """
+    from src.service.db.search import index_messages
+
+    await index_messages(db, user_id, thread_id, messages)
+
 async def get_messages_by_thread(
     db: AsyncSession,
     thread_id: UUID
@@ -185,7 +330,7 @@ async def get_messages_by_thread(
     """
     query = select(Message) \
         .where(Message.thread_id == thread_id) \
-        .order_by(Message.created_at)
+        .order_by(*MESSAGE_ORDER)
     result = await db.execute(query)
     
     return result.scalars().all()
@@ -193,7 +338,8 @@ async def get_messages_by_thread(
 
 async def get_model_messages_by_thread(
     db: AsyncSession,
-    thread_id: UUID
+    thread_id: UUID,
+    timer: Optional[PhaseTimer] = None
 ) -> Sequence[ModelMessage]:
     """
     Get all messages for a thread as Pydantic-AI ModelMessage objects.
@@ -203,20 +349,27 @@ async def get_model_messages_by_thread(
     Args:
         db: Database session
         thread_id: ID of the thread
+        timer: Optional timer receiving the history_decode phase
         
     Returns:
         List of ModelMessage objects parsed from raw JSON
     """
     messages: Sequence[Message] = await get_messages_by_thread(db, thread_id)
+    if not messages:
+        # An empty history may belong to an archived thread; a new thread still has its row
+        thread_exists = await db.scalar(select(Thread.id).where(Thread.id == thread_id))
+        if thread_exists is None and await _restore_archived_thread(db, thread_id):
+            messages = await get_messages_by_thread(db, thread_id)
 
-    model_messages: List[ModelMessage] = []
-    for message in messages:
-        try:
-            model_messages.extend(ModelMessagesTypeAdapter.validate_json(message.raw_json_text))
-        except Exception as e:
-            # Skip invalid messages but log the error
-            logger.warning(f"Failed to parse raw_json for message {message.id}: {str(e)}")
-            continue
+    with (timer or PhaseTimer()).phase("history_decode"):
+        model_messages: List[ModelMessage] = []
+        for message in messages:
+            try:
+                model_messages.extend(ModelMessagesTypeAdapter.validate_json(message.raw_json_text))
+            except Exception as e:
+                # Skip invalid messages but log the error
+                logger.warning(f"Failed to parse raw_json for message {message.id}: {str(e)}")
+                continue
 
     return model_messages
 
@@ -270,10 +423,16 @@ async def create_messages_batch(
         )
         
         await db.execute(insert_stmt)
+
+        # Keep the versions and the search index in step within the same transaction
+        user_id = await _bump_thread_version(db, thread_id)
+        await _index_thread_messages(
+            db, thread_id, [(values["id"], values["raw_json_text"]) for values in values_list], user_id=user_id
+        )
         
         # Now fetch the messages we just inserted using their IDs
         if message_ids:
-            query = select(Message).where(Message.id.in_([str(id) for id in message_ids])).order_by(Message.created_at)
+            query = select(Message).where(Message.id.in_([str(id) for id in message_ids])).order_by(*MESSAGE_ORDER)
             result = await db.execute(query)
             messages = result.scalars().all()
             
@@ -0,0 +1,312 @@
+"""Durable queue of agent jobs in the ``agent_jobs`` table.
+
+Workers in any process claim jobs with a single ``UPDATE ... RETURNING``
+statement, which SQLite executes atomically, so a job is never handed to two
+workers at once. A claim is a lease: the job stays invisible to other workers
+until ``available_at``, and the worker extends the lease while the turn runs.
+If the worker dies, the lease expires and another worker picks the job up.
+
+Delivery is at least once. A worker that dies after saving the turn but
+before marking the job finished causes the turn to run again.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.service.models.api.job_models import JobStatus
+from src.service.models.database.errors import JobNotFoundError
+from src.service.models.database.models import AgentJob
+
+
+def _utcnow() -> datetime:
+    """Current time as naive UTC, the format SQLite stores."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    user_id: UUID,
+    thread_id: UUID,
+    query: str,
+    max_attempts: int
+) -> AgentJob:
+    """
+    Add a job to the queue.
+
+    Args:
+        db: Database session
+        user_id: ID of the user enqueuing the job
+        thread_id: ID of the thread the turn runs on
+        query: The user's query
+        max_attempts: Attempts after which the job fails for good
+
+    Returns:
+        The queued job
+    """
+    now = _utcnow()
+    job = AgentJob(
+        user_id=user_id,
+        thread_id=thread_id,
+        query=query,
+        status=JobStatus.QUEUED,
+        attempts=0,
+        max_attempts=max_attempts,
+        available_at=now,
+        created_at=now,
+        updated_at=now,
+    )
+    db.add(job)
+    await db.flush()
+    return job
+
+
+async def get_job(
+    db: AsyncSession,
+    job_id: UUID,
+    user_id: Optional[UUID] = None
+) -> AgentJob:
+    """
+    Get a job by ID.
+
+    Args:
+        db: Database session
+        job_id: ID of the job to retrieve
+        user_id: If given, only a job enqueued by this user is returned
+
+    Returns:
+        The job
+
+    Raises:
+        JobNotFoundError: If the job doesn't exist or belongs to another user
+    """
+    query = select(AgentJob).where(AgentJob.id == job_id)
+    if user_id is not None:
+        query = query.where(AgentJob.user_id == user_id)
+    result = await db.execute(query.execution_options(populate_existing=True))
+    job = result.scalars().first()
+    if not job:
+        raise JobNotFoundError(f"Job with ID {job_id} not found")
+    return job
+
+
+async def has_due_jobs(db: AsyncSession) -> bool:
+    """
+    Check without taking the write lock whether a job can be claimed or expired.
+
+    Args:
+        db: Database session
+
+    Returns:
+        True if a queued job or a running job with an expired lease is due
+    """
+    result = await db.execute(
+        select(AgentJob.id)
+        .where(AgentJob.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]))
+        .where(AgentJob.available_at <= _utcnow())
+        .limit(1)
+    )
+    return result.first() is not None
+
+
+async def claim_job(
+    db: AsyncSession,
+    worker_id: str,
+    visibility_timeout: float
+) -> Optional[AgentJob]:
+    """
+    Claim the oldest job that is queued or whose lease has expired.
+
+    Args:
+        db: Database session; the caller commits
+        worker_id: ID of the claiming worker
+        visibility_timeout: Seconds the job stays invisible to other workers
+
+    Returns:
+        The claimed job with its attempt counted, or None if no job is available
+    """
+    now = _utcnow()
+    candidate = select(AgentJob.id) \
+        .where(AgentJob.status.in_([JobStatus.QUEUED, JobStatus.RUNNING])) \
+        .where(AgentJob.available_at <= now) \
+        .where(AgentJob.attempts < AgentJob.max_attempts) \
+        .order_by(AgentJob.available_at, AgentJob.created_at) \
+        .limit(1) \
+        .scalar_subquery()
+    statement = update(AgentJob) \
+        .where(AgentJob.id == candidate) \
+        .values(
+            status=JobStatus.RUNNING,
+            worker_id=worker_id,
+            attempts=AgentJob.attempts + 1,
+            available_at=now + timedelta(seconds=visibility_timeout),
+            updated_at=now,
+        ) \
+        .returning(AgentJob)
+    result = await db.execute(statement.execution_options(synchronize_session=False))
+    return result.scalars().first()
+
+
+async def extend_job_lease(
+    db: AsyncSession,
+    job_id: UUID,
+    worker_id: str,
+    visibility_timeout: float
+) -> bool:
+    """
+    Push the lease of a running job further into the future.
+
+    Args:
+        db: Database session; the caller commits
+        job_id: ID of the job
+        worker_id: ID of the worker holding the lease
+        visibility_timeout: Seconds from now until the lease expires
+
+    Returns:
+        False if the worker no longer holds the lease
+    """
+    result = await db.execute(
+        update(AgentJob)
+        .where(AgentJob.id == job_id, AgentJob.worker_id == worker_id, AgentJob.status == JobStatus.RUNNING)
+        .values(available_at=_utcnow() + timedelta(seconds=visibility_timeout))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+
+async def complete_job(
+    db: AsyncSession,
+    job_id: UUID,
+    worker_id: str,
+    result_json: str
+) -> bool:
+    """
+    Mark a job as succeeded and store its result.
+
+    Args:
+        db: Database session; the caller commits
+        job_id: ID of the job
+        worker_id: ID of the worker holding the lease
+        result_json: Serialized AgentResponse
+
+    Returns:
+        False if the worker no longer holds the lease
+    """
+    now = _utcnow()
+    result = await db.execute(
+        update(AgentJob)
+        .where(AgentJob.id == job_id, AgentJob.worker_id == worker_id, AgentJob.status == JobStatus.RUNNING)
+        .values(status=JobStatus.SUCCEEDED, result=result_json, error=None, available_at=now, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+
+async def fail_job(
+    db: AsyncSession,
+    job_id: UUID,
+    worker_id: str,
+    error: str,
+    retry_delay: Optional[float],
+    deferred: bool = False
+) -> Optional[JobStatus]:
+    """
+    Record a failed attempt and queue the job for a retry if it has attempts left.
+
+    Args:
+        db: Database session; the caller commits
+        job_id: ID of the job
+        worker_id: ID of the worker holding the lease
+        error: Error of the attempt
+        retry_delay: Seconds before the retry, or None to fail without retrying
+        deferred: The job could not start for lack of capacity; it is queued
+            again after retry_delay and the claim does not count as an attempt
+
+    Returns:
+        The job's new status, or None if the worker no longer holds the lease
+    """
+    now = _utcnow()
+    job_filter = and_(AgentJob.id == job_id, AgentJob.worker_id == worker_id, AgentJob.status == JobStatus.RUNNING)
+    if deferred:
+        requeue = await db.execute(
+            update(AgentJob)
+            .where(job_filter)
+            .values(
+                status=JobStatus.QUEUED,
+                error=error,
+                worker_id=None,
+                attempts=AgentJob.attempts - 1,
+                available_at=now + timedelta(seconds=retry_delay or 0),
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return JobStatus.QUEUED if requeue.rowcount else None
+
+    if retry_delay is not None:
+        retry = await db.execute(
+            update(AgentJob)
+            .where(job_filter, AgentJob.attempts < AgentJob.max_attempts)
+            .values(
+                status=JobStatus.QUEUED,
+                error=error,
+                worker_id=None,
+                available_at=now + timedelta(seconds=retry_delay),
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if retry.rowcount:
+            return JobStatus.QUEUED
+
+    failed = await db.execute(
+        update(AgentJob)
+        .where(job_filter)
+        .values(status=JobStatus.FAILED, error=error, available_at=now, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    return JobStatus.FAILED if failed.rowcount else None
+
+
+async def expire_jobs(db: AsyncSession) -> int:
+    """
+    Fail running jobs whose lease expired on their last attempt.
+
+    Args:
+        db: Database session; the caller commits
+
+    Returns:
+        Number of jobs failed
+    """
+    now = _utcnow()
+    result = await db.execute(
+        update(AgentJob)
+        .where(
+            AgentJob.status == JobStatus.RUNNING,
+            AgentJob.available_at <= now,
+            AgentJob.attempts >= AgentJob.max_attempts,
+        )
+        .values(status=JobStatus.FAILED, error="Worker lease expired on the last attempt", updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def count_jobs_by_status(db: AsyncSession) -> Dict[str, int]:
+    """
+    Count jobs per status.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Mapping of status value to number of jobs
+    """
+    result = await db.execute(select(AgentJob.status, func.count()).group_by(AgentJob.status))
+    counts = {status.value: 0 for status in JobStatus}
+    for status, count in result.all():
+        counts[str(status)] = count
+    return counts
@@ -0,0 +1,98 @@
+"""Per-thread turn locks in the ``thread_locks`` table.
+
+A lock is a row keyed by thread ID. It is taken with an upsert that only
+overwrites an expired row, which SQLite applies atomically, so every process
+sharing the database sees the same owner. Holders extend the lease while their
+turn runs and delete the row when it ends.
+"""
+
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.service.models.database.models import ThreadLock
+
+
+def _utcnow() -> datetime:
+    """Current time as naive UTC, the format SQLite stores."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def try_acquire_thread_lock(
+    db: AsyncSession,
+    thread_id: UUID,
+    owner: str,
+    ttl: float
+) -> bool:
+    """
+    Take the lock of a thread unless another owner holds an unexpired lease.
+
+    Args:
+        db: Database session; the caller commits
+        thread_id: ID of the thread
+        owner: Identifier of the lock holder
+        ttl: Seconds until the lease expires
+
+    Returns:
+        True if the lock was taken
+    """
+    now = _utcnow()
+    insert = sqlite_insert(ThreadLock).values(
+        thread_id=thread_id,
+        owner=owner,
+        expires_at=now + timedelta(seconds=ttl),
+    )
+    statement = insert.on_conflict_do_update(
+        index_elements=[ThreadLock.thread_id],
+        set_={"owner": insert.excluded.owner, "expires_at": insert.excluded.expires_at},
+        where=ThreadLock.expires_at <= now,
+    ).returning(ThreadLock.owner)
+    result = await db.execute(statement)
+    return result.scalar() == owner
+
+
+async def extend_thread_lock(
+    db: AsyncSession,
+    thread_id: UUID,
+    owner: str,
+    ttl: float
+) -> bool:
+    """
+    Push the lease of a held lock further into the future.
+
+    Args:
+        db: Database session; the caller commits
+        thread_id: ID of the thread
+        owner: Identifier of the lock holder
+        ttl: Seconds from now until the lease expires
+
+    Returns:
+        False if the lock is no longer held by the owner
+    """
+    result = await db.execute(
+        update(ThreadLock)
+        .where(ThreadLock.thread_id == thread_id, ThreadLock.owner == owner)
+        .values(expires_at=_utcnow() + timedelta(seconds=ttl))
+    )
+    return result.rowcount > 0
+
+
+async def release_thread_lock(
+    db: AsyncSession,
+    thread_id: UUID,
+    owner: str
+) -> None:
+    """
+    Release a lock if the owner still holds it.
+
+    Args:
+        db: Database session; the caller commits
+        thread_id: ID of the thread
+        owner: Identifier of the lock holder
+    """
+    await db.execute(
+        delete(ThreadLock).where(ThreadLock.thread_id == thread_id, ThreadLock.owner == owner)
+    )
@@ -0,0 +1,225 @@
+"""Full-text search over conversation history.
+
+Message text is extracted once at write time and stored in a SQLite FTS5 index.
+The index is maintained incrementally in the same transaction that inserts the
+messages, so search results never lag behind the conversation.
+
+Besides the searchable ``content`` column, every row carries ``user_key`` and
+``thread_key`` tokens. Scoping a query to a user (or removing a thread from the
+index) is then an FTS posting-list lookup instead of a scan over all rows.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = "messages_fts"
+
+_CREATE_SEARCH_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    content,
+    user_key,
+    thread_key,
+    message_id UNINDEXED,
+    thread_id UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+_INSERT_DOCUMENT = text(
+    f"INSERT INTO {SEARCH_TABLE} (content, user_key, thread_key, message_id, thread_id) "
+    "VALUES (:content, :user_key, :thread_key, :message_id, :thread_id)"
+)
+
+_DELETE_THREAD = text(
+    f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN "
+    f"(SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match)"
+)
+
+# bm25 weights: only the content column contributes to the rank
+_SEARCH = text(
+    f"SELECT thread_id, message_id, "
+    f"snippet({SEARCH_TABLE}, 0, '[', ']', '...', :snippet_tokens) AS snippet, "
+    f"bm25({SEARCH_TABLE}, 1.0, 0.0, 0.0) AS rank "
+    f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match "
+    "ORDER BY rank LIMIT :limit"
+)
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class SearchHit:
+    """
+    A single full-text search match.
+
+    Attributes:
+        thread_id: ID of the thread containing the match
+        message_id: ID of the matching message
+        snippet: Excerpt of the message with matched terms in brackets
+        rank: bm25 rank (lower is more relevant)
+    """
+    thread_id: str
+    message_id: str
+    snippet: str
+    rank: float
+
+
+def _scope_key(prefix: str, value: Any) -> str:
+    """Build a single-token scope key such as ``u0123abcd...`` from a UUID."""
+    return prefix + str(value).replace("-", "").lower()
+
+
+def build_match_expression(query: str, user_id: UUID) -> str:
+    """
+    Turn free text into a safe FTS5 match expression scoped to a user.
+
+    Every word is quoted, so FTS5 operators in user input are treated as plain
+    text; all words must match and the last one also matches as a prefix.
+
+    Args:
+        query: Free-text query
+        user_id: ID of the user whose messages are searched
+
+    Returns:
+        FTS5 match expression, or an empty string if the query has no words
+    """
+    terms = _TERM_PATTERN.findall(query)
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return f'user_key:{_scope_key("u", user_id)} AND content:({" ".join(quoted)})'
+
+
+async def create_search_index(conn: AsyncConnection) -> None:
+    """
+    Create the FTS5 index if needed and backfill it from existing messages.
+
+    Args:
+        conn: Connection inside an active transaction
+    """
+    await conn.execute(text(_CREATE_SEARCH_TABLE))
+
+    indexed = (await conn.execute(text(f"SELECT count(*) FROM {SEARCH_TABLE}"))).scalar()
+    if indexed:
+        return
+
+    result = await conn.execute(text(
+        "SELECT messages.id, messages.thread_id, messages.raw_json_text, threads.user_id "
+        "FROM messages JOIN threads ON threads.id = messages.thread_id"
+    ))
+    rows = result.all()
+    if not rows:
+        return
+
+    documents = [
+        _document(row.user_id, row.thread_id, row.id, row.raw_json_text)
+        for row in rows
+    ]
+    documents = [document for document in documents if document["content"]]
+    if documents:
+        await conn.execute(_INSERT_DOCUMENT, documents)
+    logger.info(f"Backfilled search index with {len(documents)} messages")
+
+
+def _document(user_id: Any, thread_id: Any, message_id: Any, raw_json_text: str) -> Dict[str, str]:
+    """Build the index row for a single message."""
+    from src.service.core.utils import _raw_json_to_content
+
+    try:
+        content = _raw_json_to_content(raw_json_text)
+    except Exception as e:
+        logger.warning(f"Failed to extract searchable text for message {message_id}: {str(e)}")
+        content = ""
+
+    return {
+        "content": content,
+        "user_key": _scope_key("u", user_id),
+        "thread_key": _scope_key("t", thread_id),
+        "message_id": str(message_id),
+        "thread_id": str(thread_id),
+    }
+
+
+async def index_messages(
+    db: AsyncSession,
+    user_id: Any,
+    thread_id: Any,
+    messages: Iterable[Tuple[Any, str]]
+) -> int:
+    """
+    Add messages to the search index within the caller's transaction.
+
+    Args:
+        db: Database session with an active transaction
+        user_id: ID of the user owning the thread
+        thread_id: ID of the thread the messages belong to
+        messages: (message_id, raw_json_text) pairs
+
+    Returns:
+        Number of indexed messages (messages without text are skipped)
+    """
+    documents = [
+        _document(user_id, thread_id, message_id, raw_json_text)
+        for message_id, raw_json_text in messages
+    ]
+    documents = [document for document in documents if document["content"]]
+    if documents:
+        await db.execute(_INSERT_DOCUMENT, documents)
+    return len(documents)
+
+
+async def remove_thread_from_index(
+    db: AsyncSession,
+    thread_id: Any
+) -> None:
+    """
+    Remove all messages of a thread from the search index.
+
+    Args:
+        db: Database session with an active transaction
+        thread_id: ID of the thread to remove
+    """
+    await db.execute(_DELETE_THREAD, {"match": f'thread_key:{_scope_key("t", thread_id)}'})
+
+
+async def search_messages(
+    db: AsyncSession,
+    user_id: UUID,
+    query: str,
+    limit: int = 20,
+    snippet_tokens: int = 12
+) -> List[SearchHit]:
+    """
+    Search a user's messages by content.
+
+    Args:
+        db: Database session
+        user_id: ID of the user whose messages are searched
+        query: Free-text query
+        limit: Maximum number of hits
+        snippet_tokens: Approximate snippet length in tokens
+
+    Returns:
+        Matching messages, most relevant first
+    """
+    match = build_match_expression(query, user_id)
+    if not match:
+        return []
+
+    result = await db.execute(
+        _SEARCH,
+        {"match": match, "limit": limit, "snippet_tokens": snippet_tokens}
+    )
+    return [
+        SearchHit(thread_id=row.thread_id, message_id=row.message_id, snippet=row.snippet, rank=row.rank)
+        for row in result.all()
+    ]
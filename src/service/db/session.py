@@ -5,7 +5,7 @@ from contextlib import asynccontextmanager
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.service.db.base import AsyncSessionLocal
+from src.service.db.base import AsyncSessionLocal, ArchiveSessionLocal
 
 # Type alias for better readability
 SessionFactory: TypeAlias = Callable[[], AsyncContextManager[AsyncSession]]
@@ -32,9 +32,59 @@ async def get_session_factory() -> AsyncGenerator[SessionFactory, None]:
             async with session.begin():
                 # do database operations
     """
+    yield create_session_factory()
+
+
+async def get_archive_session_factory() -> AsyncGenerator[SessionFactory, None]:
+    """Get a factory function that creates archive database sessions."""
+    yield create_archive_session_factory()
+
+
+def create_session_factory() -> SessionFactory:
+    """
+    Create a session factory for code running outside a request, such as background workers.
+    
+    Returns:
+        Factory function returning an async context manager that yields a new session
+    """
     @asynccontextmanager
     async def create_session() -> AsyncGenerator[AsyncSession, None]:
         async with AsyncSessionLocal() as session:
             yield session
     
-    yield create_session
\ No newline at end of file
+    return create_session
+
+
+def create_archive_session_factory() -> SessionFactory:
+    """
+    Create a session factory for the archive database.
+    
+    Returns:
+        Factory function returning an async context manager that yields a new archive session
+    """
+    @asynccontextmanager
+    async def create_session() -> AsyncGenerator[AsyncSession, None]:
+        async with ArchiveSessionLocal() as session:
+            yield session
+    
+    return create_session
+
+
+def session_factory_for(db: AsyncSession) -> SessionFactory:
+    """
+    Create a session factory for the database of an existing session.
+    
+    For work that must commit independently of the session's own transaction.
+    
+    Args:
+        db: Session whose engine the new sessions use
+    
+    Returns:
+        Factory function returning an async context manager that yields a new session
+    """
+    @asynccontextmanager
+    async def create_session() -> AsyncGenerator[AsyncSession, None]:
+        async with AsyncSession(bind=db.bind, expire_on_commit=False) as session:
+            yield session
+    
+    return create_session
@@ -0,0 +1,158 @@
+"""Token usage and latency accounting in the ``agent_runs`` table.
+
+Every agent turn records one row next to its messages. Aggregates are
+computed in SQL over a time range, grouped by time bucket, user and agent
+type, so reports stay cheap as the table grows.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+from uuid import UUID
+
+from sqlalchemy import Select, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.service.models.api import AgentRunCreate, AgentType, ThreadUsage, UsageAggregate, UsageBucket
+from src.service.models.database.models import AgentRun
+
+# strftime formats truncating a timestamp to the start of its bucket
+BUCKET_FORMATS = {
+    UsageBucket.HOUR: "%Y-%m-%d %H:00:00",
+    UsageBucket.DAY: "%Y-%m-%d 00:00:00",
+}
+
+
+def _utcnow() -> datetime:
+    """Current time as naive UTC, the format SQLite stores."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def create_agent_run(
+    db: AsyncSession,
+    run: AgentRunCreate,
+    message_id: Optional[UUID] = None
+) -> AgentRun:
+    """
+    Record the usage and latency of an agent run.
+
+    Args:
+        db: Database session; the caller commits
+        run: Usage and latency of the run
+        message_id: ID of the last message the turn saved
+
+    Returns:
+        The recorded run
+    """
+    agent_run = AgentRun(**run.model_dump(), message_id=message_id, created_at=_utcnow())
+    db.add(agent_run)
+    await db.flush()
+    return agent_run
+
+
+def _filter_runs(
+    query: Select[Any],
+    start: datetime,
+    end: datetime,
+    user_id: Optional[UUID],
+    agent_type: Optional[AgentType]
+) -> Select[Any]:
+    """Restrict a query to runs in a time range and, optionally, of one user or agent type."""
+    query = query.where(AgentRun.created_at >= start, AgentRun.created_at < end)
+    if user_id is not None:
+        query = query.where(AgentRun.user_id == user_id)
+    if agent_type is not None:
+        query = query.where(AgentRun.agent_type == agent_type)
+    return query
+
+
+async def get_usage_aggregates(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    bucket: UsageBucket,
+    user_id: Optional[UUID] = None,
+    agent_type: Optional[AgentType] = None
+) -> List[UsageAggregate]:
+    """
+    Aggregate runs per time bucket, user and agent type.
+
+    Args:
+        db: Database session
+        start: Start of the range (inclusive, naive UTC)
+        end: End of the range (exclusive, naive UTC)
+        bucket: Size of the time buckets
+        user_id: Only include runs of this user
+        agent_type: Only include runs of this agent type
+
+    Returns:
+        One aggregate per bucket, user and agent type with runs, ordered by bucket
+    """
+    bucket_start = func.strftime(BUCKET_FORMATS[bucket], AgentRun.created_at).label("bucket_start")
+    query = select(
+        bucket_start,
+        AgentRun.user_id,
+        AgentRun.agent_type,
+        func.count().label("runs"),
+        func.sum(case((AgentRun.cached_response, 1), else_=0)).label("cached_responses"),
+        func.sum(AgentRun.request_tokens).label("request_tokens"),
+        func.sum(AgentRun.response_tokens).label("response_tokens"),
+        func.sum(AgentRun.total_tokens).label("total_tokens"),
+        func.sum(AgentRun.cached_tokens).label("cached_tokens"),
+        func.sum(AgentRun.tool_calls).label("tool_calls"),
+        func.avg(AgentRun.model_seconds).label("avg_model_seconds"),
+        func.avg(AgentRun.total_seconds).label("avg_total_seconds"),
+        func.max(AgentRun.total_seconds).label("max_total_seconds"),
+    )
+    query = _filter_runs(query, start, end, user_id, agent_type) \
+        .group_by(bucket_start, AgentRun.user_id, AgentRun.agent_type) \
+        .order_by(bucket_start, AgentRun.user_id, AgentRun.agent_type)
+
+    result = await db.execute(query)
+    return [
+        UsageAggregate(
+            **{**row._asdict(), "bucket_start": datetime.strptime(row.bucket_start, "%Y-%m-%d %H:%M:%S")}
+        )
+        for row in result.all()
+    ]
+
+
+async def get_top_threads(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    limit: int,
+    user_id: Optional[UUID] = None,
+    agent_type: Optional[AgentType] = None
+) -> List[ThreadUsage]:
+    """
+    Find the threads that used the most tokens in a time range.
+
+    Args:
+        db: Database session
+        start: Start of the range (inclusive, naive UTC)
+        end: End of the range (exclusive, naive UTC)
+        limit: Maximum number of threads
+        user_id: Only include runs of this user
+        agent_type: Only include runs of this agent type
+
+    Returns:
+        Threads ordered by total tokens, most expensive first
+    """
+    total_tokens = func.sum(AgentRun.total_tokens).label("total_tokens")
+    query = select(
+        AgentRun.thread_id,
+        func.min(AgentRun.user_id).label("user_id"),
+        func.min(AgentRun.agent_type).label("agent_type"),
+        func.count().label("runs"),
+        func.sum(AgentRun.request_tokens).label("request_tokens"),
+        func.sum(AgentRun.response_tokens).label("response_tokens"),
+        total_tokens,
+        func.sum(AgentRun.total_seconds).label("total_seconds"),
+    )
+    query = _filter_runs(query, start, end, user_id, agent_type) \
+        .group_by(AgentRun.thread_id) \
+        .order_by(total_tokens.desc()) \
+        .limit(limit)
+
+    result = await db.execute(query)
+    return [ThreadUsage(**row._asdict()) for row in result.all()]
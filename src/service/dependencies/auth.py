@@ -1,11 +1,15 @@
 """API authentication dependencies."""
 
+import secrets
+from typing import Optional
+
 from fastapi import Security, HTTPException, status
 from fastapi.security.api_key import APIKeyHeader
 
 from src.service.core.settings import settings
 
 api_key_header = APIKeyHeader(name=settings.API_KEY_NAME, auto_error=False)
+admin_api_key_header = APIKeyHeader(name=settings.ADMIN_API_KEY_NAME, auto_error=False)
 
 
 async def get_api_key(api_key: str = Security(api_key_header)) -> str:
@@ -20,4 +24,23 @@ async def get_api_key(api_key: str = Security(api_key_header)) -> str:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid API Key",
         )
-    return api_key 
\ No newline at end of file
+    return api_key 
+
+def is_admin_api_key(admin_api_key: Optional[str]) -> bool:
+    """Check an operations key; always False while no ADMIN_API_KEY is configured."""
+    return bool(settings.ADMIN_API_KEY) and secrets.compare_digest(admin_api_key or "", settings.ADMIN_API_KEY)
+
+
+async def get_admin_api_key(admin_api_key: str = Security(admin_api_key_header)) -> str:
+    """
+    Validate the operations API key from its header.
+    
+    Operations endpoints act on all users' data or run heavy maintenance, so
+    they need this key in addition to the client API key.
+    """
+    if not is_admin_api_key(admin_api_key):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or missing admin API key",
+        )
+    return admin_api_key
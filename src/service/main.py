@@ -1,5 +1,6 @@
 """FastAPI application factory."""
 
+import asyncio
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,6 +10,7 @@ from logging import basicConfig
 from src.service.core.settings import settings
 from src.service.api import api_router
 from src.service.middleware.auth import ApiKeyMiddleware
+from src.service.middleware.metrics import RequestMetricsMiddleware
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +61,10 @@ app.add_middleware(
     ]
 )
 
+# Request duration per route, outside authentication so rejected requests count too
+if settings.METRICS_ENABLED:
+    app.add_middleware(RequestMetricsMiddleware)
+
 # CORS middleware (should be last in middleware chain)
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -82,8 +88,42 @@ async def startup() -> None:
     from src.service.db.base import init_db
     await init_db()
 
+    # Build agents and open provider connections before the first request arrives
+    if settings.AGENT_PRELOAD:
+        from uuid import uuid4
+        from src.service.core.agent_registry import agent_registry
+        from src.service.api.agent.operations import create_agent_dependencies
+        await agent_registry.warm_up_all(
+            deps_factory=lambda agent_type: create_agent_dependencies(uuid4(), agent_type),
+            connect=settings.AGENT_WARMUP_CONNECT
+        )
+
+    # Start the agent job workers of this process
+    if settings.JOB_WORKERS > 0:
+        from src.service.api.jobs.operations import job_worker_pool
+        await job_worker_pool.start()
+
+    # Start the periodic cold-thread archival job if enabled
+    if settings.ARCHIVE_INTERVAL_SECONDS > 0:
+        from src.service.db.archive import run_archive_scheduler
+        app.state.archive_task = asyncio.create_task(
+            run_archive_scheduler(settings.ARCHIVE_INTERVAL_SECONDS)
+        )
+
 # Create shutdown event
 @app.on_event("shutdown")
 async def shutdown() -> None:
     """Close connections on shutdown."""
-    logfire.info("Shutting down application")
\ No newline at end of file
+    logfire.info("Shutting down application")
+
+    archive_task = getattr(app.state, "archive_task", None)
+    if archive_task:
+        archive_task.cancel()
+
+    from src.service.api.jobs.operations import job_worker_pool
+    await job_worker_pool.stop()
+
+    # Release pooled database connections
+    from src.service.db.base import engine, archive_engine
+    await engine.dispose()
+    await archive_engine.dispose()
\ No newline at end of file
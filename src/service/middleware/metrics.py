@@ -0,0 +1,52 @@
+"""Request metrics middleware."""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.service.core.service_metrics import http_request_duration
+
+# Route label of requests no route matched, so unknown paths cannot grow the label set
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """
+    Middleware recording the duration of every HTTP request per route.
+    
+    Written as plain ASGI middleware so it adds no task or buffering to
+    streamed responses. The duration runs until the last body chunk has
+    been sent, so a stream counts until it ends. Routes are labelled with
+    their path template, e.g. ``/api/v1/threads/{thread_id}``.
+    """
+    
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initialize the metrics middleware.
+        
+        Args:
+            app: The ASGI application
+        """
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Time an HTTP request and record it under its method, route and status."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        status_code = 500
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            http_request_duration.labels(scope["method"], route, status_code).observe(time.perf_counter() - start)
@@ -8,7 +8,8 @@ maintainability and separation of concerns.
 from src.service.models.api.thread_models import (
     ThreadCreateRequest,
     ThreadResponse,
-    ThreadDetailResponse
+    ThreadDetailResponse,
+    ThreadSearchResult
 )
 
 # Message domain models
@@ -21,7 +22,23 @@ from src.service.models.api.message_models import (
 # Agent domain models
 from src.service.models.api.agent_models import (
     AgentRequest,
-    AgentResponse
+    AgentResponse,
+    AgentBatchRequest,
+    AgentBatchItemResult
+)
+
+# Agent job models
+from src.service.models.api.job_models import (
+    JobStatus,
+    AgentJobResponse
+)
+
+# Usage reporting models
+from src.service.models.api.usage_models import (
+    UsageBucket,
+    UsageAggregate,
+    ThreadUsage,
+    UsageReport
 )
 
 # Streaming models
@@ -31,8 +48,11 @@ from src.service.models.api.stream_models import (
     MessageCreatedChunk,
     MessageStartedChunk,
     TextDeltaChunk,
+    ToolStartedChunk,
+    ToolFinishedChunk,
     MessageCompleteChunk,
     ContentChunk,
+    TimingChunk,
     ErrorChunk,
     DoneChunk,
     AgentResponseChunk
@@ -45,6 +65,7 @@ from src.service.models.api.internal import (
     # Internal model types
     ThreadCreate,
     MessageCreate,
+    AgentRunCreate,
     AgentType
 )
 
@@ -53,7 +74,9 @@ from src.service.models.api.errors import (
     ThreadPermissionError,
     AgentTypeError,
     EmptyResponseError,
-    ModelResponseFormatError
+    ModelResponseFormatError,
+    AdmissionRejectedError,
+    ThreadBusyError
 )
 
 __all__ = [
@@ -61,6 +84,7 @@ __all__ = [
     "ThreadCreateRequest",
     "ThreadResponse",
     "ThreadDetailResponse",
+    "ThreadSearchResult",
     
     # Message domain models
     "MessageRole",
@@ -71,6 +95,18 @@ __all__ = [
     "AgentType",
     "AgentRequest",
     "AgentResponse",
+    "AgentBatchRequest",
+    "AgentBatchItemResult",
+    
+    # Agent job models
+    "JobStatus",
+    "AgentJobResponse",
+    
+    # Usage reporting models
+    "UsageBucket",
+    "UsageAggregate",
+    "ThreadUsage",
+    "UsageReport",
     
     # Streaming models
     "StreamMessageInfo",
@@ -78,8 +114,11 @@ __all__ = [
     "MessageCreatedChunk",
     "MessageStartedChunk",
     "TextDeltaChunk",
+    "ToolStartedChunk",
+    "ToolFinishedChunk",
     "MessageCompleteChunk",
     "ContentChunk",
+    "TimingChunk",
     "ErrorChunk",
     "DoneChunk",
     "AgentResponseChunk",
@@ -89,10 +128,13 @@ __all__ = [
     "ModelConversionError",
     "ThreadCreate",
     "MessageCreate",
+    "AgentRunCreate",
     
     # Error exception classes
     "ThreadPermissionError",
     "AgentTypeError",
     "EmptyResponseError",
-    "ModelResponseFormatError"
+    "ModelResponseFormatError",
+    "AdmissionRejectedError",
+    "ThreadBusyError"
 ] 
\ No newline at end of file
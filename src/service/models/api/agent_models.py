@@ -4,9 +4,10 @@ This module contains Pydantic models that define the structure and validation
 rules for Agent-related API requests and responses.
 """
 
+from typing import List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, field_serializer
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class AgentRequest(BaseModel):
@@ -44,8 +45,43 @@ class AgentResponse(BaseModel):
     response: str
     
     model_config = ConfigDict(from_attributes=True)
+
+
+class AgentBatchRequest(BaseModel):
+    """
+    Batch agent request schema for API endpoints.
+    
+    Each item is an ordinary agent request; items may target the same or
+    different threads.
+    
+    Attributes:
+        items: Queries to run
+        concurrency: Maximum number of items running at once, capped by the server
+    """
+    
+    items: List[AgentRequest] = Field(min_length=1)
+    concurrency: Optional[int] = Field(default=None, ge=1)
+
+
+class AgentBatchItemResult(BaseModel):
+    """
+    Result of one item of a batch agent request.
+    
+    Results are streamed in completion order; ``index`` refers to the item's
+    position in the request.
     
-    @field_serializer('thread_id', 'message_id')
-    def serialize_uuid(self, uuid_value: UUID) -> str:
-        """Serialize UUID fields to strings."""
-        return str(uuid_value) 
\ No newline at end of file
+    Attributes:
+        index: Position of the item in the request
+        thread_id: ID of the thread the item was sent to
+        status_code: HTTP status the item would have had as a single query
+        response: The agent's response if the item succeeded
+        error: Error detail if the item failed
+        duration_ms: Time from the item's start to its result in milliseconds
+    """
+    
+    index: int
+    thread_id: UUID
+    status_code: int
+    response: Optional[AgentResponse] = None
+    error: Optional[str] = None
+    duration_ms: float
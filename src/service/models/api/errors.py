@@ -29,6 +29,25 @@ class AgentTypeError(Exception):
         super().__init__(self.message)
 
 
+# Capacity errors
+class AdmissionRejectedError(Exception):
+    """Raised when an agent request cannot be admitted because the service is at capacity."""
+    
+    def __init__(self, message: str = "The service is at capacity", retry_after: int = 1):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+
+class ThreadBusyError(Exception):
+    """Raised when another turn holds a thread for longer than a request may wait."""
+    
+    def __init__(self, message: str = "Another turn is running on this thread", retry_after: int = 1):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+
 # Model response errors
 class EmptyResponseError(Exception):
     """Raised when a model produces an empty response."""
@@ -45,6 +45,31 @@ class MessageCreate(BaseModel):
     raw_json: bytes
 
 
+class AgentRunCreate(BaseModel):
+    """Usage and latency of one agent run, for internal use."""
+    
+    thread_id: UUID
+    user_id: UUID
+    agent_type: AgentType
+    model_name: Optional[str] = None
+    streamed: bool = False
+    
+    # Answered from the response cache without calling the model
+    cached_response: bool = False
+    
+    # Token counts as reported by the provider, summed over the run's model requests
+    requests: int = 0
+    request_tokens: int = 0
+    response_tokens: int = 0
+    total_tokens: int = 0
+    cached_tokens: int = 0
+    tool_calls: int = 0
+    
+    # Time spent in the model, and from the start of the request until the answer was ready
+    model_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+
 class InternalError(Exception):
     """
     Base class for internal errors in the service.
@@ -0,0 +1,62 @@
+"""Agent job API models for request/response validation.
+
+This module contains Pydantic models that define the structure and validation
+rules for asynchronous agent job requests and responses.
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+from src.service.models.api.agent_models import AgentResponse
+
+
+class JobStatus(str, Enum):
+    """
+    Lifecycle states of an agent job.
+    
+    Attributes:
+        QUEUED: Waiting for a worker, including jobs waiting to be retried
+        RUNNING: Claimed by a worker whose lease has not expired
+        SUCCEEDED: Finished; the result is stored with the job
+        FAILED: Gave up after the last attempt; the error is stored with the job
+    """
+    
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+# States a job never leaves
+FINISHED_JOB_STATUSES = frozenset({JobStatus.SUCCEEDED, JobStatus.FAILED})
+
+
+class AgentJobResponse(BaseModel):
+    """
+    Model for API response representing an agent job.
+    
+    Attributes:
+        id: Unique identifier for the job
+        thread_id: ID of the thread the job's turn runs on
+        status: Current state of the job
+        attempts: Number of times a worker has started the job
+        result: The agent's response once the job succeeded
+        error: Last error of the job, if any
+        created_at: When the job was enqueued
+        updated_at: When the job last changed state
+    """
+    
+    id: UUID
+    thread_id: UUID
+    status: JobStatus
+    attempts: int
+    result: Optional[AgentResponse] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
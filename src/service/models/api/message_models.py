@@ -8,7 +8,7 @@ from datetime import datetime
 from enum import Enum
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, field_serializer
+from pydantic import BaseModel, ConfigDict
 
 class MessageRole(str, Enum):
     """
@@ -69,13 +69,3 @@ class MessageResponse(BaseModel):
     created_at: datetime
     
     model_config = ConfigDict(from_attributes=True)
-    
-    @field_serializer('id', 'thread_id')
-    def serialize_uuid(self, uuid_value: UUID) -> str:
-        """Serialize UUID fields to strings."""
-        return str(uuid_value)
-    
-    @field_serializer('created_at')
-    def serialize_datetime(self, dt: datetime) -> str:
-        """Serialize datetime fields to ISO format strings."""
-        return dt.isoformat()
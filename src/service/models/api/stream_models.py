@@ -5,7 +5,7 @@ rules for streaming API responses, particularly for real-time agent interactions
 """
 
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -24,8 +24,11 @@ class EventType(Enum):
     MESSAGE_STARTED = "message_started"
     MESSAGE_CHUNK = "message_chunk"
     TOKEN = "token"
+    TOOL_STARTED = "tool_started"
+    TOOL_FINISHED = "tool_finished"
     MESSAGE_COMPLETE = "message_complete"
     CONTENT = "content"
+    TIMING = "timing"
     ERROR = "error"
     DONE = "done"
 
@@ -125,6 +128,48 @@ class TextDeltaChunk(BaseModel):
     token: str
 
 
+class ToolStartedChunk(BaseModel):
+    """
+    Signal that the agent started one of its tools.
+    
+    Sent while the model's answer is on hold, so clients can show what the
+    agent is doing. Tools started together run concurrently.
+    
+    Attributes:
+        event: Event type identifier, always "tool_started"
+        message_id: ID of the message being generated
+        tool_call_id: ID pairing this event with its tool_finished event
+        tool_name: Name of the tool
+    """
+    
+    event: EventType = EventType.TOOL_STARTED
+    message_id: UUID
+    tool_call_id: str
+    tool_name: str
+
+
+class ToolFinishedChunk(BaseModel):
+    """
+    Signal that a tool of the agent finished.
+    
+    Attributes:
+        event: Event type identifier, always "tool_finished"
+        message_id: ID of the message being generated
+        tool_call_id: ID of the call, as in its tool_started event
+        tool_name: Name of the tool
+        duration_ms: Time from the tool's start until its result, in milliseconds,
+            or None if the start of the call was not seen
+        succeeded: False if the tool asked the model to retry the call
+    """
+    
+    event: EventType = EventType.TOOL_FINISHED
+    message_id: UUID
+    tool_call_id: str
+    tool_name: str
+    duration_ms: Optional[float] = None
+    succeeded: bool = True
+
+
 class MessageCompleteChunk(BaseModel):
     """
     Stream chunk for message completion events.
@@ -155,6 +200,22 @@ class ContentChunk(BaseModel):
     delta: str
 
 
+class TimingChunk(BaseModel):
+    """
+    Per-phase latency breakdown of a streamed agent turn.
+    
+    Sent after the message is complete, once its messages have been saved.
+    
+    Attributes:
+        event: Event type identifier, always "timing"
+        phases: Milliseconds spent in each phase, plus milestones such as
+            first_token and the running total
+    """
+    
+    event: EventType = EventType.TIMING
+    phases: Dict[str, float]
+
+
 class ErrorChunk(BaseModel):
     """
     Error response for streaming endpoints.
@@ -186,7 +247,7 @@ class DoneChunk(BaseModel):
 
 
 # Type union of all streaming chunk types
-AgentResponseChunk = ThreadCreatedChunk | MessageCreatedChunk | MessageStartedChunk | TextDeltaChunk | MessageChunk | MessageCompleteChunk | ContentChunk | ErrorChunk | DoneChunk 
+AgentResponseChunk = ThreadCreatedChunk | MessageCreatedChunk | MessageStartedChunk | TextDeltaChunk | MessageChunk | ToolStartedChunk | ToolFinishedChunk | MessageCompleteChunk | ContentChunk | TimingChunk | ErrorChunk | DoneChunk
 
 
 def parse_event_chunk(data: Dict[str, Any]) -> AgentResponseChunk:
@@ -217,10 +278,16 @@ def parse_event_chunk(data: Dict[str, Any]) -> AgentResponseChunk:
         return MessageChunk.model_validate(data)
     elif event_type == EventType.TOKEN.value:
         return TextDeltaChunk.model_validate(data)
+    elif event_type == EventType.TOOL_STARTED.value:
+        return ToolStartedChunk.model_validate(data)
+    elif event_type == EventType.TOOL_FINISHED.value:
+        return ToolFinishedChunk.model_validate(data)
     elif event_type == EventType.MESSAGE_COMPLETE.value:
         return MessageCompleteChunk.model_validate(data)
     elif event_type == EventType.CONTENT.value:
         return ContentChunk.model_validate(data)
+    elif event_type == EventType.TIMING.value:
+        return TimingChunk.model_validate(data)
     elif event_type == EventType.ERROR.value:
         return ErrorChunk.model_validate(data)
     elif event_type == EventType.DONE.value:
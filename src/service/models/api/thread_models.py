@@ -8,7 +8,7 @@ from datetime import datetime
 from typing import List
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field, field_serializer
+from pydantic import BaseModel, ConfigDict, Field
 
 from src.service.models.api.message_models import MessageResponse
 from src.service.models.api.internal import AgentType
@@ -57,16 +57,6 @@ class ThreadResponse(BaseModel):
     updated_at: datetime
     
     model_config = ConfigDict(from_attributes=True)
-    
-    @field_serializer('id', 'user_id')
-    def serialize_uuid(self, uuid_value: UUID) -> str:
-        """Serialize UUID fields to strings."""
-        return str(uuid_value)
-    
-    @field_serializer('created_at', 'updated_at')
-    def serialize_datetime(self, dt: datetime) -> str:
-        """Serialize datetime fields to ISO format strings."""
-        return dt.isoformat()
 
 
 class ThreadDetailResponse(ThreadResponse):
@@ -80,3 +70,20 @@ class ThreadDetailResponse(ThreadResponse):
     messages: List[MessageResponse] = Field(default_factory=list)
     
     model_config = ConfigDict(from_attributes=True)
+
+
+class ThreadSearchResult(BaseModel):
+    """
+    Model for API response representing a full-text search match.
+    
+    Attributes:
+        thread_id: ID of the thread containing the match
+        message_id: ID of the matching message
+        snippet: Excerpt of the message with matched terms in brackets
+        rank: Relevance rank (lower is more relevant)
+    """
+    
+    thread_id: UUID
+    message_id: UUID
+    snippet: str
+    rank: float
@@ -0,0 +1,106 @@
+"""Usage reporting API models for response validation.
+
+This module contains Pydantic models that define the structure of the token
+usage and latency aggregates returned by the usage endpoint.
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import List
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from src.service.models.api.internal import AgentType
+
+
+class UsageBucket(str, Enum):
+    """
+    Time bucket sizes for usage aggregates.
+
+    Attributes:
+        HOUR: One aggregate per hour (UTC)
+        DAY: One aggregate per day (UTC)
+    """
+
+    HOUR = "hour"
+    DAY = "day"
+
+
+class UsageAggregate(BaseModel):
+    """
+    Model for the usage of one user and agent type within one time bucket.
+
+    Attributes:
+        bucket_start: Start of the time bucket (UTC)
+        user_id: ID of the user
+        agent_type: Type of agent
+        runs: Agent runs in the bucket
+        cached_responses: Runs answered from the response cache
+        request_tokens: Input tokens
+        response_tokens: Output tokens
+        total_tokens: Input and output tokens
+        cached_tokens: Input tokens served from the provider's prompt cache
+        tool_calls: Calls to the agent's tools
+        avg_model_seconds: Average time spent running the agent
+        avg_total_seconds: Average time until the answer was ready
+        max_total_seconds: Slowest run
+    """
+
+    bucket_start: datetime
+    user_id: UUID
+    agent_type: AgentType
+    runs: int
+    cached_responses: int
+    request_tokens: int
+    response_tokens: int
+    total_tokens: int
+    cached_tokens: int
+    tool_calls: int
+    avg_model_seconds: float
+    avg_total_seconds: float
+    max_total_seconds: float
+
+
+class ThreadUsage(BaseModel):
+    """
+    Model for the total usage of one thread.
+
+    Attributes:
+        thread_id: ID of the thread
+        user_id: ID of the user who owns the thread
+        agent_type: Type of agent
+        runs: Agent runs on the thread
+        request_tokens: Input tokens
+        response_tokens: Output tokens
+        total_tokens: Input and output tokens
+        total_seconds: Summed time until the answers were ready
+    """
+
+    thread_id: UUID
+    user_id: UUID
+    agent_type: AgentType
+    runs: int
+    request_tokens: int
+    response_tokens: int
+    total_tokens: int
+    total_seconds: float
+
+
+class UsageReport(BaseModel):
+    """
+    Model for API response with usage aggregates over a time range.
+
+    Attributes:
+        start: Start of the range (inclusive, UTC)
+        end: End of the range (exclusive, UTC)
+        bucket: Size of the time buckets
+        aggregates: Usage per time bucket, user and agent type
+        top_threads: Threads with the most tokens in the range
+    """
+
+    start: datetime
+    end: datetime
+    bucket: UsageBucket
+    aggregates: List[UsageAggregate]
+    top_threads: List[ThreadUsage]
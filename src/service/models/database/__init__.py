@@ -8,22 +8,29 @@ These database models are directly converted to API models when needed
 without intermediate layers.
 """
 
-from src.service.models.database.models import Thread, Message
+from src.service.models.database.models import Thread, Message, ArchivedThread, AgentJob, ThreadLock, AgentRun, UserVersion
 from src.service.models.database.errors import (
     DatabaseError,
     RecordNotFoundError,
     RecordCreationError,
-    ThreadNotFoundError
+    ThreadNotFoundError,
+    JobNotFoundError
 )
 
 __all__ = [
     # Database models
     "Thread", 
     "Message",
+    "ArchivedThread",
+    "AgentJob",
+    "ThreadLock",
+    "AgentRun",
+    "UserVersion",
     
     # Database errors
     "DatabaseError",
     "RecordNotFoundError",
     "RecordCreationError",
-    "ThreadNotFoundError"
+    "ThreadNotFoundError",
+    "JobNotFoundError"
 ] 
\ No newline at end of file
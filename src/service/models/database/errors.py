@@ -27,4 +27,11 @@ class ThreadNotFoundError(DatabaseError):
     
     def __init__(self, message: str = "The requested thread was not found"):
         self.message = message
-        super().__init__(self.message) 
\ No newline at end of file
+        super().__init__(self.message)
+
+class JobNotFoundError(DatabaseError):
+    """Raised when a requested agent job is not found in the database."""
+    
+    def __init__(self, message: str = "The requested job was not found"):
+        self.message = message
+        super().__init__(self.message)
@@ -6,18 +6,24 @@ All database models are defined in this single file to avoid circular dependenci
 Models:
 - Thread: Represents a conversation container between a user and the agent
 - Message: Represents individual messages within a thread
+- ArchivedThread: Represents a cold thread moved to the archive database
+- AgentJob: Represents an agent turn queued for a background worker
+- ThreadLock: Represents the lease of the process running a turn on a thread
+- AgentRun: Represents the token usage and latency of one agent turn
+- UserVersion: Represents the version of a user's thread list
 """
 
 from uuid import uuid4, UUID
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, func, Text
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, func, Text, LargeBinary, String
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
-from src.service.db.base import Base
+from src.service.db.base import Base, ArchiveBase
 from src.service.models.api.message_models import MessageRole
 from src.service.models.api.internal import AgentType
+from src.service.models.api.job_models import JobStatus
 
 
 class Thread(Base):
@@ -33,6 +39,7 @@ class Thread(Base):
         agent_type: Type of agent associated with this thread
         created_at: Timestamp when the thread was created
         updated_at: Timestamp when the thread was last updated
+        version: Write counter of the thread and its messages, used for ETags
         messages: Relationship to associated Message objects
     """
     
@@ -43,6 +50,7 @@ class Thread(Base):
     agent_type: Mapped[AgentType] = mapped_column(nullable=False)    
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    version: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
     
     # Define relationship to messages
     messages: Mapped[List["Message"]] = relationship(
@@ -80,4 +88,174 @@ class Message(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
     
     # Define relationship to parent thread
-    thread: Mapped[Thread] = relationship("Thread", back_populates="messages") 
\ No newline at end of file
+    thread: Mapped[Thread] = relationship("Thread", back_populates="messages")
+
+
+class ArchivedThread(ArchiveBase):
+    """
+    Archived thread database model.
+    
+    Lives in the separate archive database. Holds the thread metadata as plain
+    columns and all of its messages as a single compressed payload so cold
+    threads no longer occupy pages or index entries in the hot database.
+    
+    Attributes:
+        id: Unique identifier of the original thread
+        user_id: ID of the user who owns this thread
+        agent_type: Type of agent associated with this thread
+        created_at: Timestamp when the original thread was created
+        updated_at: Timestamp when the original thread was last updated
+        archived_at: Timestamp when the thread was moved to the archive
+        version: Version of the thread when it was archived
+        message_count: Number of messages stored in the payload
+        codec: Compression codec used for the payload
+        payload: Compressed JSON document with the thread's messages
+    """
+    
+    __tablename__ = "archived_threads"
+
+    id: Mapped[UUID] = mapped_column(primary_key=True)
+    user_id: Mapped[UUID] = mapped_column(nullable=False, index=True)
+    agent_type: Mapped[AgentType] = mapped_column(nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    version: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
+    message_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    codec: Mapped[str] = mapped_column(String(16), nullable=False)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
+class AgentJob(Base):
+    """
+    Agent job database model.
+    
+    An agent turn queued for a background worker. The table is the queue:
+    workers claim a job by moving it to ``running`` and pushing
+    ``available_at`` one visibility timeout into the future. If the worker
+    does not finish or extend its lease in time, the job becomes claimable
+    again. Failed attempts are retried until ``max_attempts`` is reached.
+    
+    The thread is referenced without a foreign key so archiving an idle
+    thread does not touch its finished jobs.
+    
+    Attributes:
+        id: Unique identifier for the job
+        user_id: ID of the user who enqueued the job
+        thread_id: ID of the thread the turn runs on
+        query: The user's query
+        status: Current state of the job
+        attempts: Number of times a worker has started the job
+        max_attempts: Attempts after which the job fails for good
+        available_at: When the job may next be claimed (lease expiry while running)
+        worker_id: Worker holding the current lease
+        result: Serialized AgentResponse once the job succeeded
+        error: Last error of the job
+        created_at: Timestamp when the job was enqueued
+        updated_at: Timestamp when the job last changed state
+    """
+    
+    __tablename__ = "agent_jobs"
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    user_id: Mapped[UUID] = mapped_column(nullable=False, index=True)
+    thread_id: Mapped[UUID] = mapped_column(nullable=False, index=True)
+    query: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[JobStatus] = mapped_column(nullable=False, index=True)
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(nullable=False)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    worker_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    result: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+
+class ThreadLock(Base):
+    """
+    Thread lock database model.
+    
+    One row per thread with a turn in progress. The row is a lease: it
+    belongs to ``owner`` until ``expires_at``, after which another process may
+    take it over, so a crashed worker cannot block a thread for good.
+    
+    Attributes:
+        thread_id: ID of the locked thread
+        owner: Process and request holding the lock
+        expires_at: When the lease ends unless it is extended
+    """
+    
+    __tablename__ = "thread_locks"
+
+    thread_id: Mapped[UUID] = mapped_column(primary_key=True)
+    owner: Mapped[str] = mapped_column(String(64), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class AgentRun(Base):
+    """
+    Agent run database model.
+    
+    Token usage and latency of one agent turn, written in the same
+    transaction as the turn's messages. Like jobs, runs reference their
+    thread without a foreign key, so usage history survives archiving.
+    
+    Attributes:
+        id: Unique identifier for the run
+        thread_id: ID of the thread the turn ran on
+        user_id: ID of the user who owns the thread
+        agent_type: Type of agent that answered
+        message_id: ID of the last message the turn saved
+        model_name: Name of the model that produced the last response
+        streamed: Whether the turn was streamed to the client
+        cached_response: Whether the answer came from the response cache
+        requests: Model requests made during the run
+        request_tokens: Input tokens over all model requests
+        response_tokens: Output tokens over all model requests
+        total_tokens: Input and output tokens over all model requests
+        cached_tokens: Input tokens the provider served from its prompt cache
+        tool_calls: Calls to the agent's tools
+        model_seconds: Time spent running the agent
+        total_seconds: Time from the start of the request until the answer was ready
+        created_at: Timestamp when the run was recorded
+    """
+    
+    __tablename__ = "agent_runs"
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    thread_id: Mapped[UUID] = mapped_column(nullable=False, index=True)
+    user_id: Mapped[UUID] = mapped_column(nullable=False, index=True)
+    agent_type: Mapped[AgentType] = mapped_column(nullable=False)
+    message_id: Mapped[Optional[UUID]] = mapped_column(nullable=True)
+    model_name: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    streamed: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    cached_response: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    requests: Mapped[int] = mapped_column(nullable=False, default=0)
+    request_tokens: Mapped[int] = mapped_column(nullable=False, default=0)
+    response_tokens: Mapped[int] = mapped_column(nullable=False, default=0)
+    total_tokens: Mapped[int] = mapped_column(nullable=False, default=0)
+    cached_tokens: Mapped[int] = mapped_column(nullable=False, default=0)
+    tool_calls: Mapped[int] = mapped_column(nullable=False, default=0)
+    model_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    total_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True, server_default=func.now())
+
+
+class UserVersion(Base):
+    """
+    User version database model.
+    
+    Write counter of a user's thread list. It grows whenever a thread of the
+    user is created or written to, so the list can be revalidated without
+    loading it. Users without a row are at version 0.
+    
+    Attributes:
+        user_id: ID of the user
+        version: Number of writes to the user's threads
+    """
+    
+    __tablename__ = "user_versions"
+
+    user_id: Mapped[UUID] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
@@ -0,0 +1,23 @@
+"""Shared pytest configuration.
+
+Points the service at throwaway SQLite files before any service module is
+imported, so tests never touch a developer's local databases.
+"""
+import os
+import tempfile
+
+import pytest_asyncio
+
+_test_dir = tempfile.mkdtemp(prefix="pydantic-ai-agent-tests-")
+os.environ["DB_PATH"] = os.path.join(_test_dir, "test.db")
+os.environ["ARCHIVE_DB_PATH"] = os.path.join(_test_dir, "test_archive.db")
+os.environ["MODE"] = "test"
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def dispose_engines():
+    """Close pooled connections after each test so they never outlive its event loop."""
+    yield
+    from src.service.db.base import engine, archive_engine
+    await engine.dispose()
+    await archive_engine.dispose()
@@ -0,0 +1,34 @@
+"""
+Tests for the admin API key guarding the operations endpoints.
+"""
+import os
+
+import pytest
+from fastapi import HTTPException
+
+# The agent module builds its OpenAI model at import time
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from src.service.api import api_router
+from src.service.core.settings import settings
+from src.service.dependencies.auth import get_admin_api_key
+
+
+@pytest.mark.asyncio
+async def test_admin_key_is_required_and_disabled_when_unset(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "")
+    with pytest.raises(HTTPException) as error:
+        await get_admin_api_key("")
+    assert error.value.status_code == 403
+
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "ops-secret")
+    with pytest.raises(HTTPException):
+        await get_admin_api_key("wrong")
+    assert await get_admin_api_key("ops-secret") == "ops-secret"
+
+
+def test_archive_routes_need_the_admin_key():
+    archive_routes = [route for route in api_router.routes if route.path.startswith("/archive")]
+    assert archive_routes
+    for route in archive_routes:
+        assert get_admin_api_key in [dependency.call for dependency in route.dependant.dependencies]
@@ -0,0 +1,67 @@
+"""
+Tests for agent request admission control.
+"""
+import asyncio
+
+import pytest
+
+from src.service.core.admission import AdmissionController, Priority
+from src.service.models.api import AdmissionRejectedError
+
+
+@pytest.mark.asyncio
+async def test_priority_order_and_per_user_limit():
+    """Interactive requests are admitted before batch ones, and no user exceeds their limit."""
+    controller = AdmissionController(max_concurrent=2, max_per_user=1, max_queue=10, queue_timeout_seconds=5)
+    first = await controller.acquire("a")
+    second = await controller.acquire("b")
+
+    order = []
+
+    async def request(user_id, priority):
+        ticket = await controller.acquire(user_id, priority)
+        order.append(user_id)
+        return ticket
+
+    batch = asyncio.create_task(request("c", Priority.BATCH))
+    interactive = asyncio.create_task(request("d", Priority.INTERACTIVE))
+    same_user = asyncio.create_task(request("a", Priority.INTERACTIVE))
+    await asyncio.sleep(0)
+    assert controller.status()["queued"] == 3
+
+    # User "a" still holds a slot, so the next eligible waiter is "d"
+    second.release()
+    await asyncio.sleep(0.01)
+    assert order == ["d"]
+
+    first.release()
+    await asyncio.sleep(0.01)
+    assert order == ["d", "a"]
+
+    for task in (interactive, same_user):
+        (await task).release()
+    (await batch).release()
+    assert order == ["d", "a", "c"]
+    assert controller.status()["active"] == 0
+    assert controller.stats.queue_time.count == 5
+
+
+@pytest.mark.asyncio
+async def test_full_queue_and_timeout_are_rejected():
+    controller = AdmissionController(max_concurrent=1, max_per_user=0, max_queue=1, queue_timeout_seconds=0.05)
+    ticket = await controller.acquire("a")
+
+    waiting = asyncio.create_task(controller.acquire("b"))
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        await controller.acquire("c")
+    assert rejected.value.retry_after >= 1
+
+    with pytest.raises(AdmissionRejectedError):
+        await waiting
+    assert controller.stats.rejected_queue_full == 1
+    assert controller.stats.rejected_timeout == 1
+
+    ticket.release()
+    ticket.release()
+    assert controller.status()["active"] == 0
@@ -0,0 +1,86 @@
+"""
+Tests for batch agent queries.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+
+# The agent module builds its OpenAI model at import time; the test model below replaces it
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import FunctionModel
+
+from src.agents.bank_support import support_agent
+from src.service.api.agent.handlers import run_agent_batch
+from src.service.db.base import AsyncSessionLocal, init_db
+from src.service.db.database import create_thread, get_messages_by_thread
+from src.service.models.api import AgentRequest, AgentType, ThreadCreate
+
+
+@asynccontextmanager
+async def session_factory():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_concurrently_and_reports_item_errors():
+    await init_db()
+    user_id = uuid4()
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            threads = [
+                await create_thread(db, ThreadCreate(user_id=user_id, agent_type=AgentType.BANK_SUPPORT))
+                for _ in range(4)
+            ]
+
+    running = 0
+    peak = 0
+
+    async def answer(messages, info):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        args = {"support_advice": "ok", "block_card": False, "risk_level": 1}
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+    items = [AgentRequest(thread_id=thread.id, query=f"question {i}") for i, thread in enumerate(threads)]
+    items.insert(2, AgentRequest(thread_id=uuid4(), query="missing thread"))
+
+    with support_agent.override(model=FunctionModel(answer)):
+        results = [result async for result in run_agent_batch(session_factory, items, user_id, concurrency=2)]
+
+    assert sorted(result.index for result in results) == list(range(5))
+    assert peak == 2
+    by_index = {result.index: result for result in results}
+    assert by_index[2].status_code == 404 and by_index[2].response is None
+    for index in (0, 1, 3, 4):
+        assert by_index[index].status_code == 200
+        assert str(by_index[index].response.thread_id) == str(items[index].thread_id)
+
+    # Every successful item was saved to its thread
+    async with AsyncSessionLocal() as db:
+        for thread in threads:
+            assert len(await get_messages_by_thread(db, thread.id)) >= 2
+
+
+def test_batch_concurrency_is_capped_at_the_per_user_admission_limit(monkeypatch):
+    from src.service.api.agent.handlers import validate_agent_batch
+    from src.service.core.settings import settings
+    from src.service.models.api import AgentBatchRequest
+
+    monkeypatch.setattr(settings, "BATCH_MAX_CONCURRENCY", 8)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_PER_USER", 2)
+    items = [AgentRequest(thread_id=uuid4(), query="question")]
+    assert validate_agent_batch(AgentBatchRequest(items=items)) == 2
+    assert validate_agent_batch(AgentBatchRequest(items=items, concurrency=1)) == 1
+
+    # Without a per-user limit only BATCH_MAX_CONCURRENCY applies
+    monkeypatch.setattr(settings, "ADMISSION_MAX_PER_USER", 0)
+    assert validate_agent_batch(AgentBatchRequest(items=items)) == 8
@@ -0,0 +1,83 @@
+"""
+Tests for the request-scoped agent context.
+"""
+import os
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+
+# The agent module builds its OpenAI model at import time; the test model below replaces it
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from pydantic_ai.models.test import TestModel
+
+from src.agents.bank_support import support_agent
+from src.service.api.agent.operations import deps_cache_stats, load_agent_context, run_agent_query
+from src.service.db.base import AsyncSessionLocal, init_db
+from src.service.db.database import create_thread, get_messages_by_thread
+from src.service.models.api import AgentType, ThreadCreate
+
+
+@pytest.mark.asyncio
+async def test_context_loads_once_and_feeds_the_run():
+    """Validation and history share one session; the run reuses them and writes once."""
+    await init_db()
+    user_id = uuid4()
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            thread = await create_thread(db, ThreadCreate(user_id=user_id, agent_type=AgentType.BANK_SUPPORT))
+
+    opened = []
+
+    @asynccontextmanager
+    async def session_factory():
+        opened.append(1)
+        async with AsyncSessionLocal() as session:
+            yield session
+
+    context = await load_agent_context(session_factory, thread.id, user_id)
+    assert len(opened) == 1
+    assert str(context.thread.id) == str(thread.id)
+    assert context.message_history == []
+
+    with support_agent.override(model=TestModel(call_tools=[])):
+        await run_agent_query(session_factory, "hello", context.thread, context.message_history)
+    # Only the write transaction needed a new session
+    assert len(opened) == 2
+
+    async with AsyncSessionLocal() as db:
+        stored = await get_messages_by_thread(db, thread.id)
+    assert len(stored) >= 2
+
+    context = await load_agent_context(session_factory, thread.id, user_id)
+    assert len(context.message_history) == len(stored)
+
+
+@pytest.mark.asyncio
+async def test_context_prefetches_profile_and_times_phases():
+    """The customer profile is cached before the run, so the system prompt lookup is a hit."""
+    await init_db()
+    user_id = uuid4()
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            thread = await create_thread(db, ThreadCreate(user_id=user_id, agent_type=AgentType.BANK_SUPPORT))
+
+    @asynccontextmanager
+    async def session_factory():
+        async with AsyncSessionLocal() as session:
+            yield session
+
+    stats = deps_cache_stats
+    misses, hits = stats.misses, stats.hits
+    context = await load_agent_context(session_factory, thread.id, user_id)
+    assert {"validate", "history", "deps"} <= set(context.timer.phases)
+    assert (stats.misses, stats.hits) == (misses + 3, hits)
+
+    with support_agent.override(model=TestModel(call_tools=[])):
+        await run_agent_query(
+            session_factory, "hello", context.thread, context.message_history,
+            agent_deps=context.agent_deps, timer=context.timer
+        )
+    assert stats.hits > hits
+    assert {"model", "persist"} <= set(context.timer.phases)
@@ -0,0 +1,59 @@
+"""
+Tests for the agent registry.
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from pydantic_ai.models.test import TestModel
+
+from src.service.core.agent_registry import AGENT_IMPORT_PATHS, AgentRegistry
+from src.service.api.agent.operations import create_agent_dependencies
+from src.service.models.api import AgentType, AgentTypeError
+
+
+@pytest.mark.asyncio
+async def test_agents_load_lazily_and_warm_up_offline():
+    """Agents are imported on first use and warm up without calling the provider."""
+    registry = AgentRegistry({AgentType.BANK_SUPPORT: "src.agents.bank_support:support_agent"})
+    assert registry.status()["bank_support"]["loaded"] is False
+
+    from src.agents.bank_support import support_agent
+    assert registry.get(AgentType.BANK_SUPPORT) is support_agent
+
+    await registry.warm_up_all(
+        deps_factory=lambda agent_type: create_agent_dependencies(
+            "123e4567-e89b-12d3-a456-426614174000", agent_type
+        ),
+        connect=False,
+    )
+    status = registry.status()["bank_support"]
+    assert status["loaded"] is True
+    assert status["warmup_seconds"] is not None
+
+
+def test_unregistered_agent_type_is_rejected():
+    """Asking for an agent type without an import path raises AgentTypeError."""
+    with pytest.raises(AgentTypeError):
+        AgentRegistry({}).get(AgentType.BANK_SUPPORT)
+
+
+def test_import_path_must_name_an_agent():
+    """An import path that resolves to something other than an agent is rejected."""
+    registry = AgentRegistry({AgentType.BANK_SUPPORT: "src.service.core.settings:settings"})
+    with pytest.raises(AgentTypeError):
+        registry.get(AgentType.BANK_SUPPORT)
+
+
+@pytest.mark.asyncio
+async def test_registered_tool_names_match_the_agents_tools():
+    """The registry lists exactly the function tools each agent offers the model."""
+    registry = AgentRegistry(AGENT_IMPORT_PATHS)
+    for agent_type in AGENT_IMPORT_PATHS:
+        model = TestModel(call_tools=[])
+        deps = create_agent_dependencies("123e4567-e89b-12d3-a456-426614174000", agent_type)
+        await registry.get(agent_type).run("hello", deps=deps, model=model)
+        offered = {tool.name for tool in model.last_model_request_parameters.function_tools}
+        assert registry.tool_names(agent_type) == offered
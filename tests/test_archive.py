@@ -0,0 +1,154 @@
+"""
+Tests for the cold-thread archival tier.
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from pydantic_ai.messages import ModelMessagesTypeAdapter, ModelRequest, UserPromptPart
+
+from src.service.api.thread.handlers import get_threads_by_user
+from src.service.db import archive
+from src.service.db.archive import archive_idle_threads, archive_stats, archive_thread, get_archive_report
+from src.service.db.base import AsyncSessionLocal, ArchiveSessionLocal, init_db
+from src.service.db.database import (
+    create_messages_batch,
+    create_thread,
+    get_model_messages_by_thread,
+    get_thread,
+)
+from src.service.models.api import AgentType, MessageCreate, MessageRole, ThreadCreate
+from src.service.models.database.models import ArchivedThread
+
+
+@asynccontextmanager
+async def session_factory():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def _create_thread_with_messages(texts):
+    """Create a thread holding one user message per text."""
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            thread = await create_thread(db, ThreadCreate(user_id=uuid4(), agent_type=AgentType.BANK_SUPPORT))
+            messages = [
+                MessageCreate(
+                    thread_id=thread.id,
+                    role=MessageRole.USER,
+                    raw_json=ModelMessagesTypeAdapter.dump_json([ModelRequest(parts=[UserPromptPart(content=text)])]),
+                )
+                for text in texts
+            ]
+            await create_messages_batch(db, thread.id, messages)
+    return thread
+
+
+@pytest.mark.asyncio
+async def test_archive_and_restore_on_get_thread():
+    """Idle threads leave the hot set and come back when read."""
+    await init_db()
+    thread = await _create_thread_with_messages(["first", "second"])
+
+    assert await archive_idle_threads(idle_days=0) >= 1
+    report = await get_archive_report()
+    assert report["hot_threads"] == 0
+    assert report["archived_threads"] >= 1
+
+    restored_before = archive_stats.threads_restored
+    async with AsyncSessionLocal() as db:
+        restored = await get_thread(db, thread.id)
+        history = await get_model_messages_by_thread(db, thread.id)
+
+    assert str(restored.id) == str(thread.id)
+    assert [part.content for message in history for part in message.parts] == ["first", "second"]
+    assert archive_stats.threads_restored == restored_before + 1
+    assert archive_stats.restore_latency.count >= 1
+
+
+@pytest.mark.asyncio
+async def test_restore_on_history_load():
+    """Loading the history of an archived thread restores it."""
+    await init_db()
+    thread = await _create_thread_with_messages(["hello"])
+    assert await archive_idle_threads(idle_days=0) >= 1
+
+    async with AsyncSessionLocal() as db:
+        history = await get_model_messages_by_thread(db, thread.id)
+
+    assert len(history) == 1
+    report = await get_archive_report()
+    assert report["hot_threads"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_failed_hot_delete_leaves_one_listed_copy(monkeypatch):
+    """A thread whose hot delete did not commit is kept hot and listed once."""
+    await init_db()
+    thread = await _create_thread_with_messages(["hello"])
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=1)
+
+    def fail(thread_ids):
+        raise RuntimeError("database is locked")
+
+    # Fails after the archive row committed, before the hot delete does
+    monkeypatch.setattr(archive.thread_owner_cache, "invalidate", fail)
+    async with AsyncSessionLocal() as db, ArchiveSessionLocal() as archive_db:
+        with pytest.raises(RuntimeError):
+            await archive_thread(db, archive_db, str(thread.id), cutoff)
+        assert await archive_db.get(ArchivedThread, str(thread.id)) is None
+        await archive_db.commit()
+
+        # Should removing the archive copy fail too, the hot copy is listed alone
+        async with archive_db.begin():
+            await archive_db.merge(ArchivedThread(
+                id=str(thread.id), user_id=str(thread.user_id), agent_type=AgentType.BANK_SUPPORT,
+                created_at=thread.created_at, updated_at=thread.created_at, version=0,
+                message_count=0, codec=archive.ARCHIVE_CODEC, payload=archive._pack_messages([]),
+            ))
+
+    _, threads = await get_threads_by_user(session_factory, thread.user_id)
+    assert [str(item.id) for item in threads] == [str(thread.id)]
+    async with AsyncSessionLocal() as db:
+        history = await get_model_messages_by_thread(db, thread.id)
+    assert len(history) == 1
+
+
+@pytest.mark.asyncio
+async def test_empty_thread_history_does_not_probe_the_archive(monkeypatch):
+    """A new thread without messages is not looked up in the archive."""
+    await init_db()
+
+    async def probe(*args):
+        raise AssertionError("archive probed")
+
+    monkeypatch.setattr(archive, "restore_archived_thread", probe)
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            thread = await create_thread(db, ThreadCreate(user_id=uuid4(), agent_type=AgentType.BANK_SUPPORT))
+    async with AsyncSessionLocal() as db:
+        assert await get_model_messages_by_thread(db, thread.id) == []
+
+
+@pytest.mark.asyncio
+async def test_restore_joins_a_transaction_that_already_wrote():
+    """A session holding the write lock restores the thread itself instead of waiting for the lock."""
+    await init_db()
+    thread = await _create_thread_with_messages(["hello"])
+    assert await archive_idle_threads(idle_days=0) >= 1
+
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            await create_thread(db, ThreadCreate(user_id=uuid4(), agent_type=AgentType.BANK_SUPPORT))
+            restored = await get_thread(db, thread.id)
+            assert str(restored.id) == str(thread.id)
+
+    async with AsyncSessionLocal() as db:
+        assert len(await get_model_messages_by_thread(db, thread.id)) == 1
+    # Kept until the thread is archived again, since the transaction could have rolled back
+    async with ArchiveSessionLocal() as archive_db:
+        assert await archive_db.get(ArchivedThread, str(thread.id)) is not None
+    _, threads = await get_threads_by_user(session_factory, thread.user_id)
+    assert [str(item.id) for item in threads] == [str(thread.id)]
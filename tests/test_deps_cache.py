@@ -0,0 +1,59 @@
+"""
+Tests for the caching wrapper around the bank database connection.
+"""
+import pytest
+
+from src.agents.deps import CachingDatabaseConn, DatabaseCache, DatabaseConn
+
+
+class CountingConn(DatabaseConn):
+    """Backend that counts calls per method."""
+
+    def __init__(self):
+        self.calls = {}
+
+    def _count(self, method):
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+    async def customer_balance(self, id, include_pending=True):
+        self._count("customer_balance")
+        return await super().customer_balance(id, include_pending)
+
+    async def recent_transactions(self, id, limit=5):
+        self._count("recent_transactions")
+        return await super().recent_transactions(id, limit)
+
+
+@pytest.mark.asyncio
+async def test_reads_are_memoized_per_customer_and_arguments():
+    backend = CountingConn()
+    db = CachingDatabaseConn(backend)
+
+    assert await db.customer_balance(1) == await db.customer_balance(1)
+    await db.customer_balance(1, include_pending=False)
+    await db.customer_balance(2)
+
+    assert backend.calls["customer_balance"] == 3
+    assert db.cache.stats.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_block_card_invalidates_and_ttl_expires():
+    backend = CountingConn()
+    cache = DatabaseCache()
+    db = CachingDatabaseConn(backend, cache=cache, ttls={"recent_transactions": 60, "customer_balance": 0.0})
+
+    transactions = await db.recent_transactions(1)
+    transactions.clear()
+    assert len(await db.recent_transactions(1)) == 5
+    assert backend.calls["recent_transactions"] == 1
+
+    await db.block_card(1)
+    await db.recent_transactions(1)
+    assert backend.calls["recent_transactions"] == 2
+    assert cache.stats.invalidations == 1
+
+    # A zero TTL disables caching for the method
+    await db.customer_balance(1)
+    await db.customer_balance(1)
+    assert backend.calls["customer_balance"] == 2
@@ -0,0 +1,70 @@
+"""
+Tests for thread versions and conditional GETs of threads.
+"""
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+
+from pydantic_ai.messages import ModelMessagesTypeAdapter, ModelRequest, UserPromptPart
+
+from src.service.api.thread.handlers import get_thread_by_id, get_threads_by_user
+from src.service.core.etags import etag_matches
+from src.service.db.archive import archive_idle_threads
+from src.service.db.base import AsyncSessionLocal, init_db
+from src.service.db.database import create_messages_batch, create_thread
+from src.service.models.api import AgentType, MessageCreate, MessageRole, ThreadCreate
+
+
+@asynccontextmanager
+async def session_factory():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def _add_message(thread_id, text):
+    """Store one user message on the thread."""
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            await create_messages_batch(db, thread_id, [
+                MessageCreate(
+                    thread_id=thread_id,
+                    role=MessageRole.USER,
+                    raw_json=ModelMessagesTypeAdapter.dump_json([ModelRequest(parts=[UserPromptPart(content=text)])]),
+                )
+            ])
+
+
+def test_if_none_match_accepts_lists_weak_tags_and_wildcard():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+@pytest.mark.asyncio
+async def test_writes_change_the_etags_and_unchanged_copies_get_no_body():
+    await init_db()
+    user_id = uuid4()
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            thread = await create_thread(db, ThreadCreate(user_id=user_id, agent_type=AgentType.BANK_SUPPORT))
+
+    list_etag, threads = await get_threads_by_user(session_factory, user_id)
+    thread_etag, detail = await get_thread_by_id(session_factory, thread.id, user_id)
+    assert [str(item.id) for item in threads] == [str(thread.id)] and detail.messages == []
+
+    # Unchanged: the tags repeat and no body is built
+    assert await get_threads_by_user(session_factory, user_id, list_etag) == (list_etag, None)
+    assert await get_thread_by_id(session_factory, thread.id, user_id, thread_etag) == (thread_etag, None)
+
+    # A new message moves both the thread's and the list's version
+    await _add_message(thread.id, "hello")
+    new_list_etag, threads = await get_threads_by_user(session_factory, user_id, list_etag)
+    new_thread_etag, detail = await get_thread_by_id(session_factory, thread.id, user_id, thread_etag)
+    assert new_list_etag != list_etag and threads is not None
+    assert new_thread_etag != thread_etag and len(detail.messages) == 1
+
+    # Archiving and restoring keep the version, so the client's copy stays valid
+    assert await archive_idle_threads(idle_days=0) >= 1
+    assert await get_thread_by_id(session_factory, thread.id, user_id, new_thread_etag) == (new_thread_etag, None)
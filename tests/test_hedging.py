@@ -0,0 +1,147 @@
+"""
+Tests for hedged model requests.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, TextPart
+from pydantic_ai.models.function import FunctionModel
+
+from src.service.core.hedging import HedgedModel, Hedger
+
+
+def delayed_model(seconds: float, text: str, calls: list) -> FunctionModel:
+    async def respond(messages, info):
+        calls.append(text)
+        await asyncio.sleep(seconds)
+        return ModelResponse(parts=[TextPart(text)])
+
+    async def stream(messages, info):
+        calls.append(text)
+        await asyncio.sleep(seconds)
+        yield text
+
+    return FunctionModel(respond, stream_function=stream)
+
+
+def make_hedger() -> Hedger:
+    return Hedger(percentile=95, min_samples=5, initial_delay_seconds=0.05, min_delay_seconds=0.01)
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_backup_wins():
+    calls = []
+    hedger = make_hedger()
+    model = HedgedModel(delayed_model(2.0, "primary", calls), delayed_model(0.01, "backup", calls), hedger, "test:primary")
+
+    start = time.perf_counter()
+    result = await Agent(model).run("hello")
+
+    assert result.output == "backup"
+    assert time.perf_counter() - start < 1.0
+    assert calls == ["primary", "backup"]
+    status = hedger.status()["test:primary:request"]
+    assert status["hedged"] == 1 and status["backup_wins"] == 1
+    assert status["trigger_rate"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    calls = []
+    hedger = make_hedger()
+    model = HedgedModel(delayed_model(0, "primary", calls), delayed_model(0, "backup", calls), hedger, "test:primary")
+
+    for _ in range(5):
+        result = await Agent(model).run("hello")
+        assert result.output == "primary"
+
+    assert calls == ["primary"] * 5
+    status = hedger.status()["test:primary:request"]
+    assert status["requests"] == 5 and status["hedged"] == 0
+    # Enough samples: the budget follows the primary latencies, bounded below
+    assert status["budget_seconds"] == 0.01
+
+
+@pytest.mark.asyncio
+async def test_streams_race_on_first_chunk():
+    calls = []
+    hedger = make_hedger()
+    model = HedgedModel(delayed_model(2.0, "primary", calls), delayed_model(0.01, "backup", calls), hedger, "test:primary")
+
+    async with Agent(model).run_stream("hello") as result:
+        output = await result.get_output()
+
+    assert output == "backup"
+    # Streams keep their own latency window, apart from full responses
+    assert set(hedger.status()) == {"test:primary:stream"}
+    assert hedger.status()["test:primary:stream"]["backup_wins"] == 1
+
+
+class TaskCheckingModel(FunctionModel):
+    """Records the tasks its stream contexts are entered and exited in."""
+
+    def __init__(self, seconds: float, text: str, tasks: list):
+        delayed = delayed_model(seconds, text, [])
+        super().__init__(delayed.function, stream_function=delayed.stream_function)
+        self.tasks = tasks
+
+    @asynccontextmanager
+    async def request_stream(self, *args, **kwargs):
+        entered = asyncio.current_task()
+        try:
+            async with super().request_stream(*args, **kwargs) as stream:
+                yield stream
+        finally:
+            self.tasks.append(entered is asyncio.current_task())
+
+
+@pytest.mark.asyncio
+async def test_stream_contexts_are_entered_and_exited_in_one_task():
+    tasks = []
+    hedger = make_hedger()
+    model = HedgedModel(TaskCheckingModel(2.0, "primary", tasks), TaskCheckingModel(0.01, "backup", tasks), hedger, "test")
+
+    async with Agent(model).run_stream("hello") as result:
+        assert await result.get_output() == "backup"
+
+    # Both the cancelled primary and the winning backup
+    assert tasks == [True, True]
+
+
+@pytest.mark.asyncio
+async def test_primary_failing_within_budget_fails_over_to_backup():
+    calls = []
+
+    async def fail(messages, info):
+        calls.append("primary")
+        raise RuntimeError("provider error")
+
+    hedger = Hedger(percentile=95, min_samples=5, initial_delay_seconds=5.0, min_delay_seconds=0.01)
+    model = HedgedModel(FunctionModel(fail), delayed_model(0, "backup", calls), hedger, "test:primary")
+
+    start = time.perf_counter()
+    result = await Agent(model).run("hello")
+
+    assert result.output == "backup"
+    # The backup did not wait for the budget
+    assert time.perf_counter() - start < 1.0
+    status = hedger.status()["test:primary:request"]
+    assert status["failovers"] == 1 and status["hedged"] == 0 and status["backup_wins"] == 1
+    # A failed primary says nothing about its latency
+    assert status["primary_latency"]["count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_primary_that_loses_the_race_still_counts_towards_the_budget():
+    hedger = make_hedger()
+    model = HedgedModel(delayed_model(2.0, "primary", []), delayed_model(0.01, "backup", []), hedger, "test:primary")
+
+    await Agent(model).run("hello")
+
+    primary = hedger.status()["test:primary:request"]["primary_latency"]
+    # Counted at the time it was cancelled: past the budget, short of its real latency
+    assert primary["count"] == 1
+    assert 0.05 <= primary["p99_seconds"] < 2.0
@@ -0,0 +1,159 @@
+"""
+Tests for asynchronous agent jobs.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+
+# The agent module builds its OpenAI model at import time; the test model below replaces it
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from pydantic_ai.models.test import TestModel
+from sqlalchemy.exc import OperationalError
+
+from src.agents.bank_support import support_agent
+from src.service.api.jobs.handlers import enqueue_agent_job, get_agent_job, stream_agent_job
+from src.service.api.jobs import operations
+from src.service.api.jobs.operations import JobWorkerPool
+from src.service.db.base import AsyncSessionLocal, init_db
+from src.service.db.database import create_thread, get_messages_by_thread
+from src.service.db.jobs import claim_job, enqueue_job, fail_job
+from src.service.models.api import AdmissionRejectedError, AgentRequest, AgentType, JobStatus, ThreadBusyError, ThreadCreate
+
+
+@asynccontextmanager
+async def session_factory():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def make_thread(user_id):
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            return await create_thread(db, ThreadCreate(user_id=user_id, agent_type=AgentType.BANK_SUPPORT))
+
+
+@pytest.mark.asyncio
+async def test_job_runs_in_a_worker_and_saves_the_turn():
+    await init_db()
+    user_id = uuid4()
+    thread = await make_thread(user_id)
+
+    job = await enqueue_agent_job(session_factory, AgentRequest(thread_id=thread.id, query="hello"), user_id)
+    assert job.status == JobStatus.QUEUED
+
+    pool = JobWorkerPool(session_factory, workers=1, visibility_timeout=30, retry_backoff=0, poll_interval=0.1)
+    with support_agent.override(model=TestModel(call_tools=[])):
+        assert await pool.run_once("worker-1")
+
+    finished = await get_agent_job(session_factory, job.id, user_id)
+    assert finished.status == JobStatus.SUCCEEDED and finished.attempts == 1
+    assert str(finished.result.thread_id) == str(thread.id)
+    async with AsyncSessionLocal() as db:
+        assert len(await get_messages_by_thread(db, thread.id)) >= 2
+
+    updates = [update async for update in stream_agent_job(session_factory, job.id, user_id)]
+    assert [update.status for update in updates] == [JobStatus.SUCCEEDED]
+
+    # Other users cannot see the job
+    with pytest.raises(Exception) as not_found:
+        await get_agent_job(session_factory, job.id, uuid4())
+    assert not_found.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_expired_leases_are_reclaimed_and_retries_are_bounded():
+    await init_db()
+    user_id = uuid4()
+    thread = await make_thread(user_id)
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            queued = await enqueue_job(db, user_id, thread.id, "hello", max_attempts=2)
+            job_id = queued.id
+
+    async def claim(worker_id, visibility_timeout):
+        async with AsyncSessionLocal() as db:
+            async with db.begin():
+                return await claim_job(db, worker_id, visibility_timeout)
+
+    # A crashed worker's lease expires and the job goes to the next worker
+    first = await claim("crashed", visibility_timeout=0)
+    assert str(first.id) == str(job_id) and first.attempts == 1
+    second = await claim("healthy", visibility_timeout=30)
+    assert str(second.id) == str(job_id) and second.attempts == 2
+    assert await claim("idle", visibility_timeout=30) is None
+
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            # The crashed worker no longer holds the lease
+            assert await fail_job(db, job_id, "crashed", "boom", retry_delay=0) is None
+            # Attempts are used up, so the job fails instead of being retried
+            assert await fail_job(db, job_id, "healthy", "boom", retry_delay=0) == JobStatus.FAILED
+
+    job = await get_agent_job(session_factory, job_id, user_id)
+    assert job.status == JobStatus.FAILED and job.error == "boom"
+
+
+@pytest.mark.asyncio
+async def test_capacity_deferrals_do_not_use_up_attempts(monkeypatch):
+    await init_db()
+    user_id = uuid4()
+    thread = await make_thread(user_id)
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            job_id = (await enqueue_job(db, user_id, thread.id, "hello", max_attempts=1)).id
+
+    deferrals = [AdmissionRejectedError(retry_after=0), ThreadBusyError(retry_after=0)]
+    execute = operations.execute_agent_job
+
+    async def crowded(session_factory, job):
+        if deferrals:
+            raise deferrals.pop(0)
+        return await execute(session_factory, job)
+
+    monkeypatch.setattr(operations, "execute_agent_job", crowded)
+    pool = JobWorkerPool(session_factory, workers=1, visibility_timeout=30, retry_backoff=0, poll_interval=0.1)
+    with support_agent.override(model=TestModel(call_tools=[])):
+        for _ in range(3):
+            assert await pool.run_once("worker-1")
+
+    job = await get_agent_job(session_factory, job_id, user_id)
+    assert job.status == JobStatus.SUCCEEDED and job.attempts == 1
+    assert pool.stats.deferred == 2 and pool.stats.retried == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_poll_only_reads(monkeypatch):
+    await init_db()
+
+    async def nothing_due(db):
+        return False
+
+    async def write(*args, **kwargs):
+        raise AssertionError("write transaction on an idle poll")
+
+    monkeypatch.setattr(operations, "has_due_jobs", nothing_due)
+    monkeypatch.setattr(operations, "expire_jobs", write)
+    pool = JobWorkerPool(session_factory, workers=1, visibility_timeout=30, retry_backoff=0, poll_interval=0.1)
+    assert not await pool.run_once("idle-worker")
+
+
+@pytest.mark.asyncio
+async def test_job_lease_heartbeat_survives_a_failed_extension(monkeypatch):
+    calls = []
+
+    async def flaky_extend(db, job_id, worker_id, visibility_timeout):
+        calls.append(job_id)
+        if len(calls) == 1:
+            raise OperationalError("UPDATE agent_jobs", {}, Exception("database is locked"))
+        return len(calls) < 3
+
+    monkeypatch.setattr(operations, "extend_job_lease", flaky_extend)
+    pool = JobWorkerPool(session_factory, workers=1, visibility_timeout=0.03, retry_backoff=0, poll_interval=0.1)
+
+    # Keeps going after the error and stops once the lease is gone
+    await asyncio.wait_for(pool._keep_lease(uuid4(), "worker-1"), timeout=1)
+    assert len(calls) == 3
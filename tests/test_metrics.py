@@ -0,0 +1,79 @@
+"""
+Tests for the in-process Prometheus metrics.
+"""
+import os
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+
+# The agent module builds its OpenAI model at import time; the test model below replaces it
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from pydantic_ai.models.test import TestModel
+
+from src.agents.bank_support import support_agent
+from src.service.api.agent.operations import run_agent_query
+from src.service.api.metrics.handlers import render_metrics
+from src.service.core.metrics import MetricsRegistry
+from src.service.db.base import AsyncSessionLocal, init_db
+from src.service.db.database import create_thread
+from src.service.models.api import AgentType, ThreadCreate
+
+
+@asynccontextmanager
+async def session_factory():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def samples(text):
+    """Parse exposition text into a mapping of sample name with labels to value."""
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines() if line and not line.startswith("#")
+    }
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests", "Requests", ("route",))
+    streams = registry.gauge("streams", "Open streams")
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+
+    requests.labels('/a"b').inc(2)
+    streams.labels().inc()
+    for seconds in (0.05, 0.5, 5.0):
+        latency.labels("/a").observe(seconds)
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    values = samples(text)
+    assert values['requests_total{route="/a\\"b"}'] == 2
+    assert values["streams"] == 1
+    assert values['latency_seconds_bucket{route="/a",le="0.1"}'] == 1
+    assert values['latency_seconds_bucket{route="/a",le="1"}'] == 2
+    assert values['latency_seconds_bucket{route="/a",le="+Inf"}'] == 3
+    assert values['latency_seconds_count{route="/a"}'] == 3
+    assert values['latency_seconds_sum{route="/a"}'] == pytest.approx(5.55)
+
+
+@pytest.mark.asyncio
+async def test_agent_runs_and_queries_are_measured():
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            thread = await create_thread(db, ThreadCreate(user_id=uuid4(), agent_type=AgentType.BANK_SUPPORT))
+
+    before = samples(await render_metrics(session_factory))
+    with support_agent.override(model=TestModel(call_tools=[])):
+        await run_agent_query(session_factory, "hello", thread)
+    after = samples(await render_metrics(session_factory))
+
+    run = 'agent_run_duration_seconds_count{agent_type="bank_support",streamed="false"}'
+    tokens = 'agent_run_tokens_count{agent_type="bank_support",kind="input"}'
+    inserts = 'db_query_duration_seconds_count{database="main",operation="insert"}'
+    for name in (run, tokens, inserts):
+        assert after[name] > before.get(name, 0)
+    assert after['queue_depth{queue="admission"}'] == 0
+    assert 0 <= after['cache_hit_ratio{cache="agent_data"}'] <= 1
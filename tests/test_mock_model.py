@@ -0,0 +1,82 @@
+"""
+Tests for the local mock model.
+"""
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+
+# The agent module builds its OpenAI model at import time; the mock model below replaces it
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from src.agents.bank_support import SupportOutput, support_agent
+from src.agents.deps import DatabaseConn, SupportDependencies
+from src.service.api.agent import operations
+from src.service.core.agent_registry import AGENT_IMPORT_PATHS, AgentRegistry
+from src.service.core.mock_model import MockModelConfig, build_mock_model, parse_tool_pattern
+from src.service.core.settings import settings
+from src.service.db.base import AsyncSessionLocal, init_db
+from src.service.db.database import create_thread
+from src.service.models.api import AgentType, TextDeltaChunk, ThreadCreate
+
+
+@asynccontextmanager
+async def session_factory():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def test_tool_pattern_lists_tools_per_request():
+    assert parse_tool_pattern("") == []
+    assert parse_tool_pattern("get_balance+get_recent_transactions, block_customer_card") == [
+        ["get_balance", "get_recent_transactions"], ["block_customer_card"]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_mock_model_calls_tools_then_answers_with_valid_output():
+    config = MockModelConfig(
+        first_token_seconds=0.05,
+        inter_token_seconds=0.001,
+        output_words=12,
+        tool_pattern=parse_tool_pattern("get_balance+get_recent_transactions,block_customer_card"),
+    )
+    deps = SupportDependencies(customer_id=123, db=DatabaseConn())
+
+    start = time.perf_counter()
+    result = await support_agent.run("My card was stolen", deps=deps, model=build_mock_model(config))
+
+    # Three requests, each waiting for its first token
+    assert time.perf_counter() - start >= 3 * config.first_token_seconds
+    assert result.usage().requests == 3
+    called = [part.tool_name for message in result.new_messages() for part in getattr(message, "parts", [])
+              if part.part_kind == "tool-call"]
+    assert called[:3] == ["get_balance", "get_recent_transactions", "block_customer_card"]
+    assert set(result.output) >= set(SupportOutput.__required_keys__)
+    assert result.output["block_card"] is True and 0 <= result.output["risk_level"] <= 10
+    assert len(result.output["support_advice"].split()) == 12
+
+
+@pytest.mark.asyncio
+async def test_service_streams_from_the_mock_model(monkeypatch):
+    monkeypatch.setattr(settings, "MOCK_MODEL_ENABLED", True)
+    monkeypatch.setattr(settings, "MOCK_MODEL_FIRST_TOKEN_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "MOCK_MODEL_INTER_TOKEN_SECONDS", 0.001)
+    monkeypatch.setattr(settings, "MOCK_MODEL_TOOL_PATTERN", "get_balance")
+    monkeypatch.setattr(operations, "agent_registry", AgentRegistry(AGENT_IMPORT_PATHS))
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            thread = await create_thread(db, ThreadCreate(user_id=uuid4(), agent_type=AgentType.BANK_SUPPORT))
+
+    chunks = [chunk async for chunk in operations.stream_agent_query(session_factory, "What is my balance?", thread)]
+    deltas = [chunk for chunk in chunks if isinstance(chunk, TextDeltaChunk)]
+
+    # The answer arrives in many chunks and ends as a complete output
+    assert len(deltas) > 5
+    final = json.loads(deltas[-1].token)
+    assert final["block_card"] is False and final["support_advice"]
@@ -0,0 +1,86 @@
+"""
+Tests for the stable prompt layout and prompt cache accounting.
+"""
+import json
+import os
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+
+# The agent module builds its OpenAI model at import time; the test model below replaces it
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from pydantic_ai.messages import ModelRequest, ModelResponse, SystemPromptPart, ToolCallPart, UserPromptPart
+from pydantic_ai.models.function import FunctionModel
+from pydantic_ai.models.openai import OpenAIModel
+from pydantic_ai.providers.openai import OpenAIProvider
+from pydantic_ai.usage import Usage
+
+from src.agents.bank_support import support_agent
+from src.service.api.agent.operations import run_agent_query
+from src.service.core.prompt_layout import PromptCacheStats, StablePromptModel, stable_messages
+from src.service.db.base import AsyncSessionLocal, init_db
+from src.service.db.database import create_thread
+from src.service.models.api import AgentType, ThreadCreate
+
+
+@asynccontextmanager
+async def session_factory():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+@pytest.mark.asyncio
+async def test_each_turn_starts_with_the_previous_prompt():
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            thread = await create_thread(db, ThreadCreate(user_id=uuid4(), agent_type=AgentType.BANK_SUPPORT))
+
+    requests = []
+
+    async def answer(messages, info):
+        requests.append((messages, [tool.name for tool in info.function_tools]))
+        args = {"support_advice": "ok", "block_card": False, "risk_level": 1}
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+    with support_agent.override(model=StablePromptModel(FunctionModel(answer))):
+        await run_agent_query(session_factory, "What is my balance?", thread)
+        await run_agent_query(session_factory, "And my recent transactions?", thread)
+
+    # Serialize the prompts the way they are sent to the provider
+    openai = OpenAIModel("gpt-4o", provider=OpenAIProvider(api_key="test-key"))
+    first = [json.dumps(message, default=str) for message in await openai._map_messages(requests[0][0])]
+    second = [json.dumps(message, default=str) for message in await openai._map_messages(requests[1][0])]
+
+    assert second[:len(first)] == first
+    assert json.loads(first[0])["content"].startswith("You are a support agent")
+    assert "customer's name" in json.loads(first[1])["content"]
+    assert requests[0][1] == sorted(requests[0][1])
+
+
+def test_static_system_prompts_move_before_per_customer_ones():
+    request = ModelRequest(parts=[
+        SystemPromptPart("The customer's name is Ann.", dynamic_ref="add_customer_info"),
+        SystemPromptPart("You are a support agent."),
+        UserPromptPart("hi"),
+    ])
+
+    ordered = stable_messages([request])
+
+    assert [part.content for part in ordered[0].parts] == [
+        "You are a support agent.", "The customer's name is Ann.", "hi"
+    ]
+    # The agent's own messages are left untouched
+    assert request.parts[0].dynamic_ref == "add_customer_info"
+
+
+def test_prompt_cache_hit_rate_counts_cached_input_tokens():
+    stats = PromptCacheStats()
+    stats.observe(Usage(request_tokens=1000, details={"cached_tokens": 768}))
+    stats.observe(Usage(request_tokens=1000))
+
+    assert stats.runs == 2 and stats.runs_with_hits == 1
+    assert stats.hit_rate == pytest.approx(0.384)
+    assert stats.last_cached_tokens == 0
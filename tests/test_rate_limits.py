@@ -0,0 +1,50 @@
+"""
+Tests for the provider rate scheduler.
+"""
+import time
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.models.test import TestModel
+
+from src.service.core.rate_limits import RateLimitedModel, RateScheduler, TokenBucket, model_key
+
+
+def test_bucket_waits_for_refill_and_accepts_refunds():
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.wait_seconds(60) == 0
+    bucket.take(60)
+    assert bucket.wait_seconds(1) == pytest.approx(1.0, abs=0.05)
+
+    bucket.take(-30)
+    assert bucket.wait_seconds(30) == 0
+    # More than a minute's capacity waits for a full bucket rather than forever
+    assert bucket.wait_seconds(1_000) <= 31
+
+
+@pytest.mark.asyncio
+async def test_model_requests_are_scheduled_and_settled_with_actual_usage():
+    base = TestModel(call_tools=[])
+    key = model_key(base)
+    scheduler = RateScheduler({key: {"rpm": 600, "tpm": 100_000}})
+    agent = Agent(RateLimitedModel(base, scheduler, output_tokens=100))
+
+    await agent.run("hello there")
+
+    status = scheduler.status()[key]
+    assert status["requests"] == 1
+    assert status["estimated_tokens"] >= 100
+    assert 0 < status["actual_tokens"] < status["estimated_tokens"]
+    # The unused part of the estimate went back into the bucket
+    assert status["tokens_available"] > 100_000 - status["estimated_tokens"]
+
+
+@pytest.mark.asyncio
+async def test_requests_over_the_rpm_limit_wait():
+    scheduler = RateScheduler({"test:test": {"rpm": 60, "tpm": 100_000}})
+    scheduler._limiters["test:test"].requests.take(60)
+
+    start = time.perf_counter()
+    await scheduler.acquire("test:test", 10)
+    assert time.perf_counter() - start >= 0.9
+    assert scheduler.status()["test:test"]["wait"]["count"] == 1
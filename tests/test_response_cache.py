@@ -0,0 +1,95 @@
+"""
+Tests for the agent response cache.
+"""
+import os
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from pydantic_ai.models.test import TestModel
+
+from src.agents.bank_support import support_agent
+from src.service.api.agent.operations import run_agent_query
+from src.service.core.response_cache import normalize_query, response_cache
+from src.service.core.settings import settings
+from src.service.db.base import AsyncSessionLocal, init_db
+from src.service.db.database import create_thread, get_messages_by_thread
+from src.service.models.api import AgentType, ThreadCreate
+
+
+@asynccontextmanager
+async def _session_factory():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def _new_thread(user_id=None):
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            return await create_thread(db, ThreadCreate(user_id=user_id or uuid4(), agent_type=AgentType.BANK_SUPPORT))
+
+
+@pytest.fixture
+def cache_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+def test_normalize_query():
+    assert normalize_query("  What's my current   BALANCE? ") == "what's my current balance"
+
+
+@pytest.mark.asyncio
+async def test_repeated_query_is_answered_from_cache_and_persisted(cache_enabled):
+    """The second identical query in a fresh thread hits the cache and is stored like a normal turn."""
+    await init_db()
+    user_id = uuid4()
+    first, second = await _new_thread(user_id), await _new_thread(user_id)
+    hits = response_cache.stats.hits
+
+    with support_agent.override(model=TestModel(call_tools=["get_balance"])):
+        answer = await run_agent_query(_session_factory, "What's my balance?", first, [])
+        cached = await run_agent_query(_session_factory, "what's my balance", second, [])
+
+    assert response_cache.stats.hits == hits + 1
+    assert cached.response == answer.response
+
+    async with AsyncSessionLocal() as db:
+        original = await get_messages_by_thread(db, first.id)
+        replayed = await get_messages_by_thread(db, second.id)
+    assert len(replayed) == len(original)
+    assert {message.id for message in replayed}.isdisjoint({message.id for message in original})
+    assert "what's my balance" in replayed[0].raw_json_text
+
+
+@pytest.mark.asyncio
+async def test_runs_with_side_effects_are_not_cached(cache_enabled):
+    """Blocking a card must happen on every request, so such runs are never stored."""
+    await init_db()
+    uncacheable = response_cache.stats.uncacheable
+
+    with support_agent.override(model=TestModel(call_tools=["block_customer_card"])):
+        await run_agent_query(_session_factory, "My card was stolen", await _new_thread(), [])
+
+    assert response_cache.stats.uncacheable == uncacheable + 1
+    assert len(response_cache) == 0
+
+
+def test_cacheable_tools_come_from_the_agents_read_only_marks():
+    from pydantic_ai.messages import ModelResponse, ToolCallPart
+
+    from src.service.core.agent_registry import agent_registry
+
+    def calling(*tool_names):
+        return [ModelResponse(parts=[ToolCallPart(tool_name, {}) for tool_name in tool_names])]
+
+    assert agent_registry.read_only_tool_names(AgentType.BANK_SUPPORT) == {"get_balance", "get_recent_transactions"}
+    output_tools = agent_registry.output_tool_names(AgentType.BANK_SUPPORT)
+    assert output_tools
+    assert response_cache.is_cacheable(AgentType.BANK_SUPPORT, calling("get_balance", *output_tools))
+    assert not response_cache.is_cacheable(AgentType.BANK_SUPPORT, calling("block_customer_card"))
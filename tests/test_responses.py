@@ -0,0 +1,58 @@
+"""
+Tests for JSON responses encoded by pydantic-core.
+"""
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from pydantic_core import ErrorDetails
+from pydantic_ai.messages import (
+    ImageUrl, ModelMessagesTypeAdapter, ModelRequest, ModelResponse, RetryPromptPart, TextPart, ToolCallPart,
+    ToolReturnPart, UserPromptPart
+)
+
+from src.service.core.responses import THREAD, THREAD_DETAIL, json_response
+from src.service.core.utils import _raw_json_to_content, _validated_raw_json_to_content, db_to_api_thread
+from src.service.models.api import MessageResponse, MessageRole, ThreadDetailResponse
+from src.service.models.database import Thread
+
+
+def test_stored_messages_read_like_validated_ones():
+    samples = [
+        [ModelRequest(parts=[UserPromptPart(content="What is my balance?")])],
+        [ModelResponse(parts=[ToolCallPart("get_balance", {"include_pending": True})])],
+        [ModelRequest(parts=[ToolReturnPart("get_balance", 123.45, "call-1"), RetryPromptPart("try again")])],
+        [ModelResponse(parts=[TextPart("Your balance is $123.45")])],
+        [ModelRequest(parts=[UserPromptPart(content=["Look", ImageUrl(url="https://example.com/a.png")])])],
+        [ModelRequest(parts=[RetryPromptPart([ErrorDetails(type="missing", loc=("x",), msg="Field required", input={})])])],
+    ]
+    for messages in samples:
+        raw_json = ModelMessagesTypeAdapter.dump_json(messages).decode()
+        assert _raw_json_to_content(raw_json) == _validated_raw_json_to_content(raw_json)
+
+
+def test_encoded_body_matches_fastapi_encoding():
+    # Stored timestamps are naive, and encode exactly like isoformat()
+    now = datetime.now()
+    thread_id = uuid4()
+    detail = ThreadDetailResponse(
+        id=thread_id,
+        user_id=uuid4(),
+        agent_type="bank_support",
+        created_at=now,
+        updated_at=now,
+        messages=[
+            MessageResponse(id=uuid4(), thread_id=thread_id, role=MessageRole.USER, content="hi", created_at=now)
+        ],
+    )
+    response = json_response(THREAD_DETAIL, detail, headers={"ETag": '"thread-1"'})
+
+    assert response.media_type == "application/json" and response.headers["ETag"] == '"thread-1"'
+    assert json.loads(response.body) == jsonable_encoder(detail)
+
+    # Aware timestamps from the database are stored as naive UTC before encoding
+    aware = datetime.now(timezone(timedelta(hours=2)))
+    thread = Thread(id=str(thread_id), user_id=str(uuid4()), agent_type="bank_support", created_at=aware, updated_at=aware)
+    created_at = json.loads(THREAD.dump_json(db_to_api_thread(thread)))["created_at"]
+    assert datetime.fromisoformat(created_at) == aware.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,38 @@
+"""
+Tests for the batch mode of the run_agent CLI.
+"""
+import json
+import os
+
+import pytest
+
+# The agent module builds its OpenAI model at import time; the test model below replaces it
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from pydantic_ai.models.test import TestModel
+
+from src.agents.bank_support import support_agent
+from src.run_agent import run_batch
+
+
+@pytest.mark.asyncio
+async def test_batch_writes_results_usage_and_summary(tmp_path):
+    input_path = tmp_path / "queries.jsonl"
+    output_path = tmp_path / "results.jsonl"
+    queries = [{"id": f"q{i}", "query": f"question {i}", "customer_id": i} for i in range(5)]
+    input_path.write_text("\n".join(json.dumps(query) for query in queries) + "\n\n")
+
+    with support_agent.override(model=TestModel(call_tools=["get_balance"])):
+        summary = await run_batch(str(input_path), str(output_path), concurrency=3)
+
+    records = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert sorted(record["id"] for record in records) == [f"q{i}" for i in range(5)]
+    for record in records:
+        assert "error" not in record
+        assert record["usage"]["requests"] == 2
+        assert record["latency_ms"] > 0
+
+    assert summary["items"] == summary["succeeded"] == 5
+    assert summary["requests"] == 10
+    assert summary["total_tokens"] > 0
+    assert 0 < summary["p50_seconds"] <= summary["p99_seconds"]
@@ -0,0 +1,74 @@
+"""
+Tests for full-text search over conversation history.
+"""
+from uuid import uuid4
+
+import pytest
+
+from pydantic_ai.messages import ModelMessagesTypeAdapter, ModelRequest, UserPromptPart
+
+from src.service.db.archive import archive_idle_threads
+from src.service.db.base import AsyncSessionLocal, init_db
+from src.service.db.database import create_messages_batch, create_thread, get_thread
+from src.service.db.search import search_messages
+from src.service.models.api import AgentType, MessageCreate, MessageRole, ThreadCreate
+
+
+async def _create_thread(user_id, texts):
+    """Create a thread for the user holding one user message per text."""
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            thread = await create_thread(db, ThreadCreate(user_id=user_id, agent_type=AgentType.BANK_SUPPORT))
+            await create_messages_batch(db, thread.id, [
+                MessageCreate(
+                    thread_id=thread.id,
+                    role=MessageRole.USER,
+                    raw_json=ModelMessagesTypeAdapter.dump_json([ModelRequest(parts=[UserPromptPart(content=text)])]),
+                )
+                for text in texts
+            ])
+    return thread
+
+
+@pytest.mark.asyncio
+async def test_search_is_scoped_to_user_and_ranked():
+    """Only the requesting user's messages match, with highlighted snippets."""
+    await init_db()
+    alice, bob = uuid4(), uuid4()
+    thread = await _create_thread(alice, ["My card was stolen in Lisbon", "What is my balance?"])
+    await _create_thread(bob, ["Stolen card reported yesterday"])
+
+    async with AsyncSessionLocal() as db:
+        hits = await search_messages(db, alice, "stolen card")
+
+    assert len(hits) == 1
+    assert hits[0].thread_id == str(thread.id)
+    assert "[stolen]" in hits[0].snippet
+
+
+@pytest.mark.asyncio
+async def test_search_treats_operators_as_text_and_matches_prefix():
+    """FTS5 syntax in user input cannot break or widen the query."""
+    await init_db()
+    user_id = uuid4()
+    await _create_thread(user_id, ["Please notify the bank about travel"])
+
+    async with AsyncSessionLocal() as db:
+        assert await search_messages(db, user_id, 'trav') != []
+        assert await search_messages(db, user_id, 'notify "bank') != []
+        assert await search_messages(db, user_id, 'travel OR loans') == []
+        assert await search_messages(db, user_id, '*:()') == []
+
+
+@pytest.mark.asyncio
+async def test_archived_threads_leave_and_rejoin_the_index():
+    """Archiving removes a thread's messages from the index and restoring adds them back."""
+    await init_db()
+    user_id = uuid4()
+    thread = await _create_thread(user_id, ["mortgage refinancing question"])
+    await archive_idle_threads(idle_days=0)
+
+    async with AsyncSessionLocal() as db:
+        assert await search_messages(db, user_id, "mortgage") == []
+        await get_thread(db, thread.id)
+        assert len(await search_messages(db, user_id, "mortgage")) == 1
@@ -0,0 +1,177 @@
+"""
+Tests for per-thread turn locks and coalescing of duplicate submissions.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import OperationalError
+
+# The agent module builds its OpenAI model at import time; the test model below replaces it
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import FunctionModel
+
+from src.agents.bank_support import support_agent
+from src.service.api.agent.handlers import run_agent_turn
+from src.service.core.admission import Priority
+from src.service.core.timing import PhaseTimer
+from src.service.core import thread_locks
+from src.service.core.thread_locks import SingleFlight, ThreadLockManager, thread_lock_manager, turn_single_flight
+from src.service.db.base import AsyncSessionLocal, init_db
+from src.service.db.database import create_thread
+from src.service.models.api import AgentRequest, AgentType, ThreadBusyError, ThreadCreate
+
+
+@asynccontextmanager
+async def session_factory():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def make_thread(user_id):
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            return await create_thread(db, ThreadCreate(user_id=user_id, agent_type=AgentType.BANK_SUPPORT))
+
+
+def slow_model(calls):
+    """Model answering after a short pause and recording the history length of each call."""
+    async def answer(messages, info):
+        calls.append(len(messages))
+        await asyncio.sleep(0.05)
+        args = {"support_advice": "ok", "block_card": False, "risk_level": 1}
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+    return FunctionModel(answer)
+
+
+@pytest.mark.asyncio
+async def test_turns_on_one_thread_run_one_after_another():
+    await init_db()
+    user_id = uuid4()
+    thread = await make_thread(user_id)
+    calls = []
+
+    with support_agent.override(model=slow_model(calls)):
+        first, second = await asyncio.gather(
+            run_agent_turn(session_factory, AgentRequest(thread_id=thread.id, query="first"), user_id, Priority.STANDARD),
+            run_agent_turn(session_factory, AgentRequest(thread_id=thread.id, query="second"), user_id, Priority.STANDARD),
+        )
+
+    assert first.message_id != second.message_id
+    # The second turn saw the first turn's request and response in its history
+    assert calls[0] == 1 and calls[1] > 1
+
+
+@pytest.mark.asyncio
+async def test_identical_submissions_share_one_turn():
+    await init_db()
+    user_id = uuid4()
+    thread = await make_thread(user_id)
+    calls = []
+
+    coalesced = turn_single_flight.stats.coalesced
+    request = AgentRequest(thread_id=thread.id, query="block my card")
+    with support_agent.override(model=slow_model(calls)):
+        responses = await asyncio.gather(*[
+            run_agent_turn(session_factory, request, user_id, Priority.STANDARD) for _ in range(3)
+        ])
+
+    assert len(calls) == 1
+    assert turn_single_flight.stats.coalesced == coalesced + 2
+    assert len({response.message_id for response in responses}) == 1
+
+
+@pytest.mark.asyncio
+async def test_duplicate_submissions_report_the_shared_turns_phases():
+    await init_db()
+    user_id = uuid4()
+    thread = await make_thread(user_id)
+    request = AgentRequest(thread_id=thread.id, query="what is my balance")
+    leader, follower = PhaseTimer(), PhaseTimer()
+
+    with support_agent.override(model=slow_model([])):
+        await asyncio.gather(
+            run_agent_turn(session_factory, request, user_id, Priority.STANDARD, leader),
+            run_agent_turn(session_factory, request, user_id, Priority.STANDARD, follower),
+        )
+
+    assert {"lock", "model", "persist"} <= set(follower.phases)
+    assert follower.phases == leader.phases
+
+
+@pytest.mark.asyncio
+async def test_other_users_cannot_take_a_threads_lock():
+    await init_db()
+    thread = await make_thread(uuid4())
+    acquired = thread_lock_manager.stats.acquired
+
+    with pytest.raises(HTTPException) as denied:
+        await run_agent_turn(session_factory, AgentRequest(thread_id=thread.id, query="hi"), uuid4(), Priority.STANDARD)
+
+    assert denied.value.status_code == 403
+    assert thread_lock_manager.stats.acquired == acquired
+
+
+@pytest.mark.asyncio
+async def test_busy_thread_times_out_and_expired_locks_are_taken_over():
+    await init_db()
+    thread_id = uuid4()
+    holder = ThreadLockManager(session_factory, ttl=30, wait_timeout=1, poll_interval=0.01)
+    other_process = ThreadLockManager(session_factory, ttl=30, wait_timeout=0.1, poll_interval=0.01)
+
+    lease = await holder.acquire(thread_id)
+    with pytest.raises(ThreadBusyError):
+        await other_process.acquire(thread_id)
+    assert other_process.stats.timeouts == 1
+
+    # Turns of the same process queue in memory and get the lock once it is released
+    waiting = asyncio.ensure_future(holder.acquire(thread_id))
+    await asyncio.sleep(0.05)
+    assert not waiting.done()
+    await lease.release()
+    await (await waiting).release()
+
+    # A lease that was never released stops blocking the thread once it expires
+    crashed = ThreadLockManager(session_factory, ttl=0, wait_timeout=1, poll_interval=0.01)
+    await crashed.acquire(thread_id)
+    async with await other_process.acquire(thread_id):
+        assert other_process.stats.acquired == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_errors_and_forgets_finished_calls():
+    flight = SingleFlight(ThreadLockManager(session_factory, ttl=1, wait_timeout=1, poll_interval=0.01).stats)
+    started = 0
+
+    async def fail():
+        nonlocal started
+        started += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+    assert started == 1 and all(isinstance(result, ValueError) for result in results)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_lock_heartbeat_survives_a_failed_extension(monkeypatch):
+    calls = []
+
+    async def flaky_extend(db, thread_id, owner, ttl):
+        calls.append(thread_id)
+        if len(calls) == 1:
+            raise OperationalError("UPDATE thread_locks", {}, Exception("database is locked"))
+        return len(calls) < 3
+
+    monkeypatch.setattr(thread_locks, "extend_thread_lock", flaky_extend)
+    manager = ThreadLockManager(session_factory, ttl=0.03, wait_timeout=1, poll_interval=0.01)
+
+    # Keeps going after the error and stops once the lease is gone
+    await asyncio.wait_for(manager._keep_lease(uuid4(), "owner"), timeout=1)
+    assert len(calls) == 3 and manager.stats.lost == 1
@@ -0,0 +1,61 @@
+"""
+Tests for the thread owner cache behind thread access checks.
+"""
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from src.service.api.thread.handlers import create_thread
+from src.service.core.thread_owners import ThreadOwnerCache, thread_owner_cache
+from src.service.core.utils import verify_thread_access
+from src.service.db.archive import archive_idle_threads
+from src.service.db.base import AsyncSessionLocal, init_db
+from src.service.models.api import AgentType, ThreadCreateRequest
+from src.service.models.api.errors import ThreadPermissionError
+
+
+@asynccontextmanager
+async def session_factory():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def test_entries_expire_before_the_thread_could_be_archived():
+    cache = ThreadOwnerCache(max_entries=2, ttl_seconds=300, idle_days=30)
+    now = datetime.now(timezone.utc)
+
+    assert not cache.put("idle", "user", "bank_support", now - timedelta(days=30))
+    assert cache.put("nearly-idle", "user", "bank_support", now - timedelta(days=30) + timedelta(minutes=2))
+    # Two minutes before the thread turns idle, less the one-minute margin
+    assert cache.get("nearly-idle").expires_at - time.monotonic() <= 60
+    assert cache.put("fresh", "user", "bank_support", now)
+    assert cache.put("newest", "user", "bank_support", now)
+
+    # The least recently used entry is evicted
+    assert cache.get("nearly-idle") is None and cache.get("fresh") is not None
+    assert cache.stats.uncacheable == 1 and cache.stats.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_access_checks_skip_the_database_until_the_thread_is_archived():
+    await init_db()
+    user_id = uuid4()
+    created = await create_thread(session_factory, ThreadCreateRequest(agent_type=AgentType.BANK_SUPPORT), user_id)
+    hits = thread_owner_cache.stats.hits
+
+    # Filled on create: no session is needed to answer
+    thread = await verify_thread_access(None, created.id, user_id, cached=True)
+    assert str(thread.id) == str(created.id) and thread.agent_type == AgentType.BANK_SUPPORT
+    with pytest.raises(ThreadPermissionError):
+        await verify_thread_access(None, created.id, uuid4(), cached=True)
+    assert thread_owner_cache.stats.hits == hits + 2
+
+    # Archiving drops the entry, so the next check reads and restores the thread
+    assert await archive_idle_threads(idle_days=0) >= 1
+    assert thread_owner_cache.get(created.id) is None
+    async with AsyncSessionLocal() as db:
+        thread = await verify_thread_access(db, created.id, user_id, cached=True)
+    assert thread.created_at is not None
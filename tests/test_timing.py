@@ -0,0 +1,73 @@
+"""
+Tests for per-phase timing, Server-Timing values and timing spans.
+"""
+import os
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+
+# The agent module builds its OpenAI model at import time; the mock model below replaces it
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from src.service.api.agent import operations
+from src.service.core.agent_registry import AGENT_IMPORT_PATHS, AgentRegistry
+from src.service.core.settings import settings
+from src.service.core.timing import PhaseTimer
+from src.service.db.base import AsyncSessionLocal, init_db
+from src.service.db.database import create_thread
+from src.service.models.api import AgentType, MessageCompleteChunk, ThreadCreate, TimingChunk
+from src.service.models.api.stream_models import parse_event_chunk
+
+
+@asynccontextmanager
+async def session_factory():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def test_phases_become_spans_and_server_timing(capfire):
+    timer = PhaseTimer()
+    with timer.phase("validate"):
+        timer.mark("first_token")
+    timer.record("model", 0.25)
+
+    spans = {span["name"]: span for span in capfire.exporter.exported_spans_as_dict()}
+    assert spans["phase validate"]["attributes"]["phase"] == "validate"
+    assert spans["phase validate"]["events"][0]["name"] == "first_token"
+    model = spans["phase model"]
+    assert model["end_time"] - model["start_time"] == 250_000_000
+
+    entries = [entry.split(";dur=") for entry in timer.server_timing().split(", ")]
+    assert [name for name, _ in entries] == ["first_token", "validate", "model", "total"]
+    assert float(dict(entries)["model"]) == 250.0
+
+
+@pytest.mark.asyncio
+async def test_stream_ends_with_a_timing_chunk(monkeypatch):
+    monkeypatch.setattr(settings, "MOCK_MODEL_ENABLED", True)
+    monkeypatch.setattr(settings, "MOCK_MODEL_FIRST_TOKEN_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "MOCK_MODEL_INTER_TOKEN_SECONDS", 0.0)
+    monkeypatch.setattr(operations, "agent_registry", AgentRegistry(AGENT_IMPORT_PATHS))
+
+    await init_db()
+    user_id = uuid4()
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            thread = await create_thread(db, ThreadCreate(user_id=user_id, agent_type=AgentType.BANK_SUPPORT))
+
+    timer = PhaseTimer()
+    context = await operations.load_agent_context(session_factory, thread.id, user_id, timer)
+    chunks = [
+        chunk async for chunk in operations.stream_agent_query(
+            session_factory, "Hello", context.thread, context.message_history, context.agent_deps, timer
+        )
+    ]
+
+    assert isinstance(chunks[-2], MessageCompleteChunk)
+    timing = chunks[-1]
+    assert isinstance(timing, TimingChunk)
+    assert {"validate", "history", "history_decode", "deps", "system_prompt", "model",
+            "first_token", "persist", "total"} <= set(timing.phases)
+    assert timing.phases["model"] >= 10
+    assert parse_event_chunk(timing.model_dump(mode="json")) == timing
@@ -0,0 +1,111 @@
+"""
+Tests for tool progress events in the agent stream.
+"""
+import json
+import os
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+from pydantic_ai.messages import FunctionToolResultEvent, RetryPromptPart
+from pydantic_ai.models.function import DeltaToolCall, FunctionModel
+
+# The agent module builds its OpenAI model at import time; the mock model below replaces it
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from src.agents.bank_support import support_agent
+from src.service.api.agent import operations
+from src.service.core.agent_registry import AGENT_IMPORT_PATHS, AgentRegistry
+from src.service.core.service_metrics import metrics_registry
+from src.service.core.settings import settings
+from src.service.core.timing import PhaseTimer
+from src.service.db.base import AsyncSessionLocal, init_db
+from src.service.db.database import create_thread
+from src.service.models.api import (
+    AgentType, MessageCompleteChunk, TextDeltaChunk, ThreadCreate, ToolFinishedChunk, ToolStartedChunk
+)
+from src.service.models.api.stream_models import parse_event_chunk
+
+
+@asynccontextmanager
+async def session_factory():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_tool_calls_before_the_answer(monkeypatch):
+    monkeypatch.setattr(settings, "MOCK_MODEL_ENABLED", True)
+    monkeypatch.setattr(settings, "MOCK_MODEL_FIRST_TOKEN_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "MOCK_MODEL_INTER_TOKEN_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "MOCK_MODEL_TOOL_PATTERN", "get_balance+get_recent_transactions")
+    monkeypatch.setattr(operations, "agent_registry", AgentRegistry(AGENT_IMPORT_PATHS))
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            thread = await create_thread(db, ThreadCreate(user_id=uuid4(), agent_type=AgentType.BANK_SUPPORT))
+
+    timer = PhaseTimer()
+    chunks = [
+        chunk async for chunk in operations.stream_agent_query(
+            session_factory, "What is my balance?", thread, timer=timer
+        )
+    ]
+    kinds = [type(chunk) for chunk in chunks]
+    started = [chunk for chunk in chunks if isinstance(chunk, ToolStartedChunk)]
+    finished = [chunk for chunk in chunks if isinstance(chunk, ToolFinishedChunk)]
+
+    # Both tools are reported, and finish before the first token of the answer
+    assert [chunk.tool_name for chunk in started] == ["get_balance", "get_recent_transactions"]
+    assert {chunk.tool_call_id for chunk in finished} == {chunk.tool_call_id for chunk in started}
+    assert all(chunk.succeeded and chunk.duration_ms >= 0 for chunk in finished)
+    tool_positions = [i for i, chunk in enumerate(chunks) if isinstance(chunk, (ToolStartedChunk, ToolFinishedChunk))]
+    assert max(tool_positions) < kinds.index(TextDeltaChunk) < kinds.index(MessageCompleteChunk)
+    assert parse_event_chunk(finished[0].model_dump(mode="json")) == finished[0]
+
+    assert {"tool.get_balance", "tool.get_recent_transactions", "model"} <= set(timer.phases)
+    assert timer.phases["model"] >= 0.02
+    assert 'agent_tool_duration_seconds_count{agent_type="bank_support",tool="get_balance",outcome="ok"}' in (
+        metrics_registry.render()
+    )
+
+
+def test_result_without_a_seen_call_has_no_duration():
+    timer = PhaseTimer()
+    event = FunctionToolResultEvent(RetryPromptPart("Unknown tool", tool_name="lookup"), tool_call_id="call-1")
+
+    chunk = operations._tool_event_chunk(event, {}, uuid4(), AgentType.BANK_SUPPORT, timer)
+
+    assert isinstance(chunk, ToolFinishedChunk)
+    assert chunk.tool_call_id == "call-1" and chunk.tool_name == "lookup"
+    assert chunk.duration_ms is None and not chunk.succeeded
+    assert not any(name.startswith("tool.") for name in timer.phases)
+    assert parse_event_chunk(chunk.model_dump(mode="json")) == chunk
+
+
+@pytest.mark.asyncio
+async def test_output_that_fails_validation_is_retried_and_sent_once_valid():
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            thread = await create_thread(db, ThreadCreate(user_id=uuid4(), agent_type=AgentType.BANK_SUPPORT))
+    attempts = []
+
+    async def stream_answer(messages, info):
+        # The first answer is out of range, the retry is valid
+        attempts.append(info)
+        risk_level = 42 if len(attempts) == 1 else 3
+        name = info.output_tools[0].name
+        yield {0: DeltaToolCall(name=name, json_args='{"support_advice": "Call us", ')}
+        yield {0: DeltaToolCall(json_args=f'"block_card": false, "risk_level": {risk_level}}}')}
+
+    with support_agent.override(model=FunctionModel(stream_function=stream_answer)):
+        chunks = [
+            chunk async for chunk in operations.stream_agent_query(session_factory, "Help", thread)
+        ]
+
+    tokens = [json.loads(chunk.token) for chunk in chunks if isinstance(chunk, TextDeltaChunk)]
+    assert len(attempts) == 2
+    assert tokens[-1] == {"support_advice": "Call us", "block_card": False, "risk_level": 3}
+    assert isinstance(chunks[-2], MessageCompleteChunk)
@@ -0,0 +1,104 @@
+"""
+Tests for persisted run usage and the usage report.
+"""
+import os
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+# The agent module builds its OpenAI model at import time; the test model below replaces it
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from pydantic_ai.messages import ModelResponse, ToolCallPart, ToolReturnPart
+from pydantic_ai.models.function import FunctionModel
+from sqlalchemy import select
+
+from src.agents.bank_support import support_agent
+from src.service.api.agent.operations import run_agent_query
+from src.service.api.usage.endpoints import usage_report
+from src.service.api.usage.handlers import get_usage_report
+from src.service.core.settings import settings
+from src.service.db.base import AsyncSessionLocal, init_db
+from src.service.db.database import create_thread
+from src.service.models.api import AgentType, ThreadCreate, UsageBucket
+from src.service.models.database import AgentRun
+
+
+@asynccontextmanager
+async def session_factory():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def answer(messages, info):
+    # Look up the balance once, then answer
+    if not any(isinstance(part, ToolReturnPart) for part in messages[-1].parts):
+        return ModelResponse(parts=[ToolCallPart("get_balance", {})])
+    args = {"support_advice": "ok", "block_card": False, "risk_level": 1}
+    return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+
+@pytest.mark.asyncio
+async def test_runs_are_recorded_and_aggregated():
+    await init_db()
+    user_id = uuid4()
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            thread = await create_thread(db, ThreadCreate(user_id=user_id, agent_type=AgentType.BANK_SUPPORT))
+
+    with support_agent.override(model=FunctionModel(answer)):
+        first = await run_agent_query(session_factory, "What is my balance?", thread)
+        await run_agent_query(session_factory, "And now?", thread)
+
+    async with AsyncSessionLocal() as db:
+        runs = (await db.execute(select(AgentRun).where(AgentRun.thread_id == thread.id))).scalars().all()
+    assert len(runs) == 2
+    assert {str(run.message_id) for run in runs} >= {str(first.message_id)}
+    for run in runs:
+        assert run.requests == 2 and run.tool_calls == 1
+        assert run.request_tokens > 0 and run.total_tokens == run.request_tokens + run.response_tokens
+        assert run.total_seconds >= run.model_seconds > 0
+        assert run.model_name and not run.streamed and not run.cached_response
+
+    report = await get_usage_report(session_factory, bucket=UsageBucket.HOUR, user_id=user_id)
+    assert len(report.aggregates) == 1
+    aggregate = report.aggregates[0]
+    assert aggregate.runs == 2 and aggregate.tool_calls == 2
+    assert aggregate.total_tokens == sum(run.total_tokens for run in runs)
+    assert aggregate.bucket_start.minute == 0
+    assert [str(usage.thread_id) for usage in report.top_threads] == [str(thread.id)]
+
+    # Other users and empty ranges report nothing
+    other = await get_usage_report(session_factory, user_id=uuid4())
+    assert other.aggregates == [] and other.top_threads == []
+    with pytest.raises(Exception) as empty_range:
+        await get_usage_report(session_factory, start=report.end, end=report.start)
+    assert empty_range.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_report_is_scoped_to_the_caller_without_the_admin_key(monkeypatch):
+    await init_db()
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "ops-secret")
+    caller_id, other_id = uuid4(), uuid4()
+
+    async def report(user_id, admin_api_key=None):
+        response = await usage_report(
+            start=None, end=None, bucket=UsageBucket.DAY, user_id=user_id, agent_type=None, top_threads=10,
+            caller_id=caller_id, admin_api_key=admin_api_key, session_factory=session_factory
+        )
+        return response.status_code
+
+    # The caller's own report needs no admin key, with or without the filter
+    assert await report(None) == 200 and await report(caller_id) == 200
+    with pytest.raises(HTTPException) as forbidden:
+        await report(other_id)
+    assert forbidden.value.status_code == 403
+    with pytest.raises(HTTPException):
+        await report(other_id, admin_api_key="wrong")
+
+    # The admin key reports on any user or on all of them
+    assert await report(other_id, admin_api_key="ops-secret") == 200
+    assert await report(None, admin_api_key="ops-secret") == 200